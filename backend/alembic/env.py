@@ -11,7 +11,7 @@ from alembic import context
 
 from app.core.config import settings
 from app.db.base import Base
-from app.models import role, user, record, system_log  # noqa: F401
+from app.models import role, user, record, system_log, rollup, sketch, detector_state, rescore_job, anomaly_event  # noqa: F401
 
 config = context.config
 fileConfig(config.config_file_name)
@@ -12,7 +12,7 @@ from passlib.context import CryptContext
 
 revision = "0001_init_tables"
 down_revision = None
-branch_labels = None
+branch_labels = ("main",)
 depends_on = None
 
 
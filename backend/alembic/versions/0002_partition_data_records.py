@@ -0,0 +1,61 @@
+"""partition data_records by timestamp (opt-in)
+
+Revision ID: 0002_partition_data_records
+Revises:
+Create Date: 2026-10-19
+
+Opt-in branch. Apply with:
+    alembic upgrade partitioning@head
+
+Granularity and pre-created periods come from PARTITION_GRANULARITY and
+PARTITION_PRECREATE; the runtime maintenance task keeps future partitions
+ahead of the data and drops expired ones.
+"""
+
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+from app.db.partitioning import initial_partitioning_sql
+
+revision = "0002_partition_data_records"
+down_revision = None
+branch_labels = ("partitioning",)
+depends_on = "0001_init_tables"
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    # NOTE:
+    # - InnoDB does not support foreign keys on partitioned tables. Dropping the constraint keeps
+    #   the index MariaDB created for it, so created_by stays indexed.
+    # - Every unique key must include the partitioning column, so the primary key becomes (id, timestamp).
+    # - Partitioning an existing table copies it once; run during a maintenance window on large tables.
+    for fk in sa.inspect(bind).get_foreign_keys("data_records"):
+        op.drop_constraint(fk["name"], "data_records", type_="foreignkey")
+
+    op.execute(
+        "ALTER TABLE data_records "
+        "MODIFY id INT NOT NULL AUTO_INCREMENT, "
+        "DROP PRIMARY KEY, "
+        "ADD PRIMARY KEY (id, `timestamp`)"
+    )
+
+    today = datetime.now(timezone.utc).date()
+    op.execute(
+        initial_partitioning_sql(today, settings.PARTITION_GRANULARITY, int(settings.PARTITION_PRECREATE))
+    )
+
+
+def downgrade():
+    op.execute("ALTER TABLE data_records REMOVE PARTITIONING")
+    op.execute(
+        "ALTER TABLE data_records "
+        "MODIFY id INT NOT NULL AUTO_INCREMENT, "
+        "DROP PRIMARY KEY, "
+        "ADD PRIMARY KEY (id)"
+    )
+    op.create_foreign_key(None, "data_records", "users", ["created_by"], ["id"])
@@ -0,0 +1,74 @@
+"""rollup tables + data_records timestamp index
+
+Revision ID: 0003_rollup_tables
+Revises: 0001_init_tables
+Create Date: 2026-10-19
+
+Backfills both rollup tables from existing data_records, since bucket-aligned and unbounded
+analytics ranges are answered from rollups alone.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_rollup_tables"
+down_revision = "0001_init_tables"
+branch_labels = None
+depends_on = None
+
+_STATS = "`count`, `sum`, `sum_sq`, `min`, `max`, `anomaly_count`"
+
+
+def _bucket(column: str, seconds: int) -> str:
+    # NOTE:
+    # - Same epoch-aligned flooring as app.db.timebucket.bucket_expr, inlined so this revision keeps
+    #   working whatever the application code looks like later.
+    epoch = "TIMESTAMP '2000-01-01 00:00:00'"
+    return f"TIMESTAMPADD(SECOND, FLOOR(TIMESTAMPDIFF(SECOND, {epoch}, {column}) / {seconds}) * {seconds}, {epoch})"
+
+
+def _create_rollup_table(name: str) -> None:
+    op.create_table(
+        name,
+        sa.Column("bucket_start", sa.DateTime(), primary_key=True),
+        sa.Column("category", sa.String(length=64), primary_key=True),
+        sa.Column("title", sa.String(length=128), primary_key=True),
+        sa.Column("count", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+        sa.Column("sum", sa.Double(), nullable=False, server_default=sa.text("0")),
+        sa.Column("sum_sq", sa.Double(), nullable=False, server_default=sa.text("0")),
+        sa.Column("min", sa.Float(), nullable=False),
+        sa.Column("max", sa.Float(), nullable=False),
+        sa.Column("anomaly_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+    )
+
+
+def upgrade():
+    _create_rollup_table("record_rollups_minute")
+    _create_rollup_table("record_rollups_hour")
+
+    minute = _bucket("timestamp", 60)
+    op.execute(
+        f"INSERT INTO record_rollups_minute (bucket_start, category, title, {_STATS}) "
+        f"SELECT {minute}, category, title, COUNT(*), SUM(value), SUM(value * value), MIN(value), MAX(value), "
+        "SUM(CASE WHEN is_anomaly = 1 THEN 1 ELSE 0 END) "
+        f"FROM data_records GROUP BY {minute}, category, title"
+    )
+    # NOTE:
+    # - Hours are merged from the minute buckets instead of scanning data_records a second time.
+    hour = _bucket("bucket_start", 3600)
+    op.execute(
+        f"INSERT INTO record_rollups_hour (bucket_start, category, title, {_STATS}) "
+        f"SELECT {hour}, category, title, SUM(`count`), SUM(`sum`), SUM(`sum_sq`), MIN(`min`), MAX(`max`), "
+        "SUM(`anomaly_count`) "
+        f"FROM record_rollups_minute GROUP BY {hour}, category, title"
+    )
+
+    # NOTE:
+    # - Serves the inclusive end-instant lookup of rollup queries and bucket rebuilds on update/delete.
+    op.create_index("ix_data_records_timestamp", "data_records", ["timestamp"])
+
+
+def downgrade():
+    op.drop_index("ix_data_records_timestamp", table_name="data_records")
+    op.drop_table("record_rollups_hour")
+    op.drop_table("record_rollups_minute")
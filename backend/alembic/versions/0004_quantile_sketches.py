@@ -0,0 +1,55 @@
+"""hourly quantile sketch bins
+
+Revision ID: 0004_quantile_sketches
+Revises: 0003_rollup_tables
+Create Date: 2026-10-19
+
+Backfills the sketch bins from existing data_records, since past whole hours are answered from
+sketches alone.
+"""
+
+import math
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+revision = "0004_quantile_sketches"
+down_revision = "0003_rollup_tables"
+branch_labels = None
+depends_on = None
+
+
+def _bucket(column: str, seconds: int) -> str:
+    # NOTE:
+    # - Same epoch-aligned flooring as app.db.timebucket.bucket_expr, inlined like in 0003.
+    epoch = "TIMESTAMP '2000-01-01 00:00:00'"
+    return f"TIMESTAMPADD(SECOND, FLOOR(TIMESTAMPDIFF(SECOND, {epoch}, {column}) / {seconds}) * {seconds}, {epoch})"
+
+
+def upgrade():
+    op.create_table(
+        "record_sketches_hour",
+        sa.Column("bucket_start", sa.DateTime(), primary_key=True),
+        sa.Column("category", sa.String(length=64), primary_key=True),
+        sa.Column("sign", sa.SmallInteger(), primary_key=True),
+        sa.Column("bin", sa.Integer(), primary_key=True),
+        sa.Column("count", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+    )
+
+    # NOTE:
+    # - Bin keys mirror QuantileService._sql_keys for the configured QUANTILE_RELATIVE_ACCURACY.
+    alpha = float(settings.QUANTILE_RELATIVE_ACCURACY)
+    ln_gamma = math.log((1 + alpha) / (1 - alpha))
+    hour = _bucket("timestamp", 3600)
+    index = f"CASE WHEN value = 0 THEN 0 ELSE CEIL(LN(ABS(value)) / {ln_gamma!r}) END"
+    op.execute(
+        "INSERT INTO record_sketches_hour (bucket_start, category, sign, bin, `count`) "
+        f"SELECT {hour}, category, SIGN(value), {index}, COUNT(*) "
+        f"FROM data_records GROUP BY {hour}, category, SIGN(value), {index}"
+    )
+
+
+def downgrade():
+    op.drop_table("record_sketches_hour")
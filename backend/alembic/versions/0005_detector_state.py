@@ -0,0 +1,28 @@
+"""anomaly detector state
+
+Revision ID: 0005_detector_state
+Revises: 0004_quantile_sketches
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_detector_state"
+down_revision = "0004_quantile_sketches"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "anomaly_detector_state",
+        sa.Column("detector", sa.String(length=32), primary_key=True),
+        sa.Column("key", sa.String(length=128), primary_key=True),
+        sa.Column("state", sa.JSON(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade():
+    op.drop_table("anomaly_detector_state")
@@ -0,0 +1,41 @@
+"""anomaly rescore jobs
+
+Revision ID: 0006_rescore_jobs
+Revises: 0005_detector_state
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_rescore_jobs"
+down_revision = "0005_detector_state"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "anomaly_rescore_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("detector", sa.String(length=32), nullable=False),
+        sa.Column("cursor_ts", sa.DateTime(), nullable=True),
+        sa.Column("cursor_id", sa.Integer(), nullable=True),
+        sa.Column("detector_state", sa.JSON(), nullable=True),
+        sa.Column("rows_total", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+        sa.Column("rows_scanned", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+        sa.Column("rows_changed", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+        sa.Column("chunks", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("error", sa.String(length=512), nullable=True),
+        sa.Column("created_by", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_anomaly_rescore_jobs_status", "anomaly_rescore_jobs", ["status"])
+
+
+def downgrade():
+    op.drop_index("ix_anomaly_rescore_jobs_status", table_name="anomaly_rescore_jobs")
+    op.drop_table("anomaly_rescore_jobs")
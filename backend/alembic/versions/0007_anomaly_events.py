@@ -0,0 +1,36 @@
+"""anomaly_events side table
+
+Revision ID: 0007_anomaly_events
+Revises: 0006_rescore_jobs
+Create Date: 2026-10-19
+
+Backfills the table from existing rows flagged is_anomaly.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007_anomaly_events"
+down_revision = "0006_rescore_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "anomaly_events",
+        sa.Column("record_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("category", sa.String(length=64), nullable=False),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.Column("value", sa.Float(), nullable=False),
+    )
+    op.create_index("ix_anomaly_events_timestamp", "anomaly_events", ["timestamp"])
+    op.create_index("ix_anomaly_events_category_timestamp", "anomaly_events", ["category", "timestamp"])
+    op.execute(
+        "INSERT INTO anomaly_events (record_id, category, timestamp, value) "
+        "SELECT id, category, timestamp, value FROM data_records WHERE is_anomaly = 1"
+    )
+
+
+def downgrade():
+    op.drop_table("anomaly_events")
@@ -0,0 +1,98 @@
+"""dictionary-encode data_records title/category (opt-in)
+
+Revision ID: 0008_dictionary_encoding
+Revises:
+Create Date: 2026-10-19
+
+Opt-in branch. Apply with:
+    alembic upgrade dictionary@head
+then set RECORD_DICTIONARY_ENCODING=true and restart the backend.
+
+Moves title and category into record_titles / record_categories and keeps small integer keys on
+data_records. The data_records_decoded view exposes the original columns for reads.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+revision = "0008_dictionary_encoding"
+down_revision = None
+branch_labels = ("dictionary",)
+depends_on = "0007_anomaly_events"
+
+DECODED_VIEW_SQL = (
+    "CREATE ALGORITHM=MERGE VIEW data_records_decoded AS "
+    "SELECT r.id, t.name AS title, r.value, c.name AS category, r.`timestamp`, r.is_anomaly, "
+    "r.created_by, r.created_at, r.updated_at "
+    "FROM data_records r "
+    "JOIN record_categories c ON c.id = r.category_id "
+    "JOIN record_titles t ON t.id = r.title_id"
+)
+
+
+def upgrade():
+    # NOTE:
+    # - Names keep the columns' collation, so spellings that already compared and grouped as equal
+    #   (case, trailing spaces) share one entry; the first spelling seen is the one kept.
+    # - Rewriting data_records copies the table once; run during a maintenance window on large tables.
+    # - No foreign keys to the lookup tables, so the layout also works on a partitioned data_records.
+    #   Lookup rows are never deleted.
+    op.create_table(
+        "record_categories",
+        sa.Column("id", mysql.SMALLINT(unsigned=True), primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(length=64), nullable=False),
+        sa.UniqueConstraint("name", name="uq_record_categories_name"),
+    )
+    op.create_table(
+        "record_titles",
+        sa.Column("id", mysql.MEDIUMINT(unsigned=True), primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(length=128), nullable=False),
+        sa.UniqueConstraint("name", name="uq_record_titles_name"),
+    )
+    op.execute("INSERT INTO record_categories (name) SELECT DISTINCT category FROM data_records ORDER BY category")
+    op.execute("INSERT INTO record_titles (name) SELECT DISTINCT title FROM data_records ORDER BY title")
+
+    op.execute(
+        "ALTER TABLE data_records "
+        "ADD COLUMN title_id MEDIUMINT UNSIGNED NULL AFTER id, "
+        "ADD COLUMN category_id SMALLINT UNSIGNED NULL AFTER value"
+    )
+    op.execute(
+        "UPDATE data_records r "
+        "JOIN record_categories c ON c.name = r.category "
+        "JOIN record_titles t ON t.name = r.title "
+        "SET r.category_id = c.id, r.title_id = t.id"
+    )
+    op.execute(
+        "ALTER TABLE data_records "
+        "MODIFY title_id MEDIUMINT UNSIGNED NOT NULL, "
+        "MODIFY category_id SMALLINT UNSIGNED NOT NULL, "
+        "DROP COLUMN title, "
+        "DROP COLUMN category"
+    )
+    op.execute(DECODED_VIEW_SQL)
+
+
+def downgrade():
+    op.execute("DROP VIEW data_records_decoded")
+    op.execute(
+        "ALTER TABLE data_records "
+        "ADD COLUMN title VARCHAR(128) NULL AFTER id, "
+        "ADD COLUMN category VARCHAR(64) NULL AFTER value"
+    )
+    op.execute(
+        "UPDATE data_records r "
+        "JOIN record_categories c ON c.id = r.category_id "
+        "JOIN record_titles t ON t.id = r.title_id "
+        "SET r.category = c.name, r.title = t.name"
+    )
+    op.execute(
+        "ALTER TABLE data_records "
+        "MODIFY title VARCHAR(128) NOT NULL, "
+        "MODIFY category VARCHAR(64) NOT NULL, "
+        "DROP COLUMN title_id, "
+        "DROP COLUMN category_id"
+    )
+    op.drop_table("record_titles")
+    op.drop_table("record_categories")
@@ -5,6 +5,7 @@ from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from app.db.session import AsyncSessionLocal
+from app.db.replicas import read_replicas
 from app.core.security import decode_token
 from app.models.user import User
 
@@ -14,6 +15,23 @@ async def get_db() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         yield session
 
+def token_subject(token: str | None) -> str | None:
+    try:
+        return str(decode_token(token)["sub"]) if token else None
+    except Exception:
+        return None
+
+async def get_read_db(token: str = Depends(oauth2_scheme)) -> AsyncSession:
+    """
+    Session for read-only endpoints: a healthy read replica, or the primary.
+
+    Design considerations:
+    - Authentication still runs on the primary through get_current_user; only the data queries move.
+    - The token subject drives read-your-writes stickiness (see ReadReplicaRouter).
+    """
+    async with read_replicas.session(token_subject(token)) as session:
+        yield session
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db),
@@ -1,15 +1,20 @@
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text
 
-from app.api.deps import get_db, require_roles
+from app.api.deps import get_db, get_read_db, require_roles
 from app.models.user import User
 from app.models.role import Role
 from app.models.system_log import SystemLog
-from app.schemas.admin import UserOut, UpdateUserRoleRequest
-from app.schemas.system import SystemStatusOut, DbStatusOut
+from app.schemas.admin import UserOut, UpdateUserRoleRequest, RescoreJobOut
+from app.schemas.system import SystemStatusOut, DbStatusOut, QueryStatsOut
 from app.db.session import db_ping
+from app.db.query_stats import query_stats
+from app.services.rescore_service import RescoreService
 
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -30,16 +35,20 @@ async def list_users(db: AsyncSession = Depends(get_db)):
     )
     rows = (await db.execute(stmt)).all()
 
-    return [
-        UserOut(
-            id=r[0],
-            email=r[1],
-            username=r[2],
-            role=r[3],
-            is_active=r[4],
-        )
-        for r in rows
-    ]
+    # NOTE:
+    # - Rows are trusted DB values; skipping per-row UserOut validation avoids EmailStr checks on every list.
+    return ORJSONResponse(
+        [
+            {
+                "id": r[0],
+                "email": r[1],
+                "username": r[2],
+                "role": r[3],
+                "is_active": r[4],
+            }
+            for r in rows
+        ]
+    )
 
 
 @router.patch("/users/{user_id}/role", dependencies=[Depends(require_roles("ADMIN"))])
@@ -61,21 +70,22 @@ async def update_user_role(user_id: int, req: UpdateUserRoleRequest, db: AsyncSe
 
 
 @router.get("/logs", dependencies=[Depends(require_roles("ADMIN"))])
-async def list_logs(limit: int = 200, db: AsyncSession = Depends(get_db)):
-    stmt = select(SystemLog).order_by(SystemLog.id.desc()).limit(limit)
-    logs = (await db.execute(stmt)).scalars().all()
-    return [
-        {
-            "id": l.id,
-            "level": l.level,
-            "event_type": l.event_type,
-            "message": l.message,
-            "detail": l.detail,
-            "actor_user_id": l.actor_user_id,
-            "created_at": l.created_at,
-        }
-        for l in logs
-    ]
+async def list_logs(limit: int = 200, db: AsyncSession = Depends(get_read_db)):
+    stmt = (
+        select(
+            SystemLog.id,
+            SystemLog.level,
+            SystemLog.event_type,
+            SystemLog.message,
+            SystemLog.detail,
+            SystemLog.actor_user_id,
+            SystemLog.created_at,
+        )
+        .order_by(SystemLog.id.desc())
+        .limit(limit)
+    )
+    rows = (await db.execute(stmt)).all()
+    return ORJSONResponse([r._asdict() for r in rows])
 
 
 @router.get("/system/status", response_model=SystemStatusOut, dependencies=[Depends(require_roles("ADMIN"))])
@@ -100,3 +110,67 @@ async def db_status(db: AsyncSession = Depends(get_db)):
         db_version=version,
         server_time=datetime.now(timezone.utc),
     )
+
+
+@router.get("/db/queries", response_model=QueryStatsOut, dependencies=[Depends(require_roles("ADMIN"))])
+async def db_queries(
+    limit: int = Query(20, ge=1, le=500),
+    order: Literal["total", "max", "count"] = "total",
+):
+    """Top statement fingerprints since start (or the last reset) by total time, max time or count."""
+    return {**query_stats.stats(), "top": query_stats.top(limit, order)}
+
+
+@router.post("/db/queries/reset", response_model=QueryStatsOut, dependencies=[Depends(require_roles("ADMIN"))])
+async def reset_db_queries():
+    query_stats.reset()
+    return {**query_stats.stats(), "top": []}
+
+
+@router.post(
+    "/anomaly-rescore",
+    response_model=RescoreJobOut,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def start_anomaly_rescore(
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(require_roles("ADMIN")),
+):
+    try:
+        job = await RescoreService.create(db, created_by=user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return RescoreService.to_dict(job)
+
+
+@router.get("/anomaly-rescore", response_model=list[RescoreJobOut], dependencies=[Depends(require_roles("ADMIN"))])
+async def list_anomaly_rescores(limit: int = 20, db: AsyncSession = Depends(get_db)):
+    return [RescoreService.to_dict(j) for j in await RescoreService.recent(db, limit)]
+
+
+@router.get(
+    "/anomaly-rescore/{job_id}",
+    response_model=RescoreJobOut,
+    dependencies=[Depends(require_roles("ADMIN"))],
+)
+async def get_anomaly_rescore(job_id: int, db: AsyncSession = Depends(get_db)):
+    job = await RescoreService.get(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return RescoreService.to_dict(job)
+
+
+@router.post(
+    "/anomaly-rescore/{job_id}/cancel",
+    response_model=RescoreJobOut,
+    dependencies=[Depends(require_roles("ADMIN"))],
+)
+async def cancel_anomaly_rescore(job_id: int, db: AsyncSession = Depends(get_db)):
+    job = await RescoreService.get(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    try:
+        job = await RescoreService.cancel(db, job)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return RescoreService.to_dict(job)
@@ -1,10 +1,29 @@
 from datetime import datetime
-from fastapi import APIRouter, Depends
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, get_current_user
-from app.schemas.analytics import SummaryOut, CategoryAggItem
-from app.services.analytics_service import AnalyticsService
+from app.api.deps import get_read_db, get_current_user
+from app.db.partitioning import as_db_time
+from app.schemas.analytics import (
+    SummaryOut,
+    CategoryAggItem,
+    TrendOut,
+    QuantilesOut,
+    HistogramOut,
+    AnomalySummaryOut,
+    SeriesOut,
+    LiveWindowsOut,
+    AnalyticsBatchRequest,
+    AnalyticsBatchOut,
+    QuantileParams,
+    HistogramParams,
+    TrendParams,
+)
+from app.services.analytics_service import AnalyticsService, TREND_INTERVALS
+from app.services.window_service import live_windows
 
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
@@ -15,7 +34,7 @@ async def summary(
     start_time: datetime | None = None,
     end_time: datetime | None = None,
     category: str | None = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     _=Depends(get_current_user),
 ):
     data = await AnalyticsService.summary(db, start_time, end_time, category)
@@ -26,8 +45,140 @@ async def summary(
 async def by_category(
     start_time: datetime | None = None,
     end_time: datetime | None = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     _=Depends(get_current_user),
 ):
     rows = await AnalyticsService.by_category(db, start_time, end_time)
     return [CategoryAggItem(**r) for r in rows]
+
+
+@router.get("/trend", response_model=TrendOut)
+async def trend(
+    interval: Literal["1m", "5m", "1h", "1d"] = "1m",
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
+    category: str | None = None,
+    group_by_category: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+    _=Depends(get_current_user),
+):
+    try:
+        data = await AnalyticsService.trend(
+            db, TREND_INTERVALS[interval], start_time, end_time, category, group_by_category
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return TrendOut(**data)
+
+
+@router.get("/quantiles", response_model=QuantilesOut)
+async def quantiles(
+    q: list[float] = Query(default=[0.5, 0.95, 0.99], max_length=20),
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
+    category: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    _=Depends(get_current_user),
+):
+    try:
+        data = await AnalyticsService.quantiles(db, q, start_time, end_time, category)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return QuantilesOut(**data)
+
+
+@router.get("/histogram", response_model=HistogramOut)
+async def histogram(
+    bins: int = 20,
+    lo: float | None = None,
+    hi: float | None = None,
+    edges: list[float] | None = Query(default=None),
+    approximate: bool = False,
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
+    category: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    _=Depends(get_current_user),
+):
+    try:
+        data = await AnalyticsService.histogram(
+            db, start_time, end_time, category, bins, lo, hi, edges, approximate
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return HistogramOut(**data)
+
+
+@router.get("/series", response_model=SeriesOut)
+async def series(
+    points: int = 1000,
+    method: Literal["lttb", "minmax"] = "lttb",
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
+    category: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    _=Depends(get_current_user),
+):
+    try:
+        data = await AnalyticsService.series(db, start_time, end_time, category, points, method)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # NOTE:
+    # - Up to SERIES_MAX_POINTS per category of plain floats and datetimes, so it is serialized
+    #   directly like the records listing; response_model is kept for the OpenAPI schema.
+    return ORJSONResponse(data)
+
+
+@router.get("/anomalies", response_model=AnomalySummaryOut)
+async def anomalies(
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
+    category: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    _=Depends(get_current_user),
+):
+    try:
+        data = await AnalyticsService.anomalies(db, start_time, end_time, category)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return AnomalySummaryOut(**data)
+
+
+_BATCH_PARAMS = {"quantiles": QuantileParams, "histogram": HistogramParams, "trend": TrendParams}
+
+
+@router.post("/batch", response_model=AnalyticsBatchOut)
+async def batch(
+    payload: AnalyticsBatchRequest,
+    db: AsyncSession = Depends(get_read_db),
+    _=Depends(get_current_user),
+):
+    names = [item.name for item in payload.requests]
+    if len(set(names)) != len(names):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Request names must be unique")
+
+    items = []
+    for item in payload.requests:
+        model = _BATCH_PARAMS.get(item.kind)
+        try:
+            params = model(**item.params).model_dump() if model else {}
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=f"{item.name}: {e.errors()[0]['msg']}"
+            )
+        items.append((item.name, item.kind, params))
+
+    f = payload.filter
+    # NOTE:
+    # - Bounds may mix offset and naive forms; comparing them unnormalized raises TypeError.
+    if f.start_time and f.end_time and as_db_time(f.start_time) > as_db_time(f.end_time):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start_time must be before end_time")
+    data = await AnalyticsService.batch(db, f.start_time, f.end_time, f.category, items)
+    return AnalyticsBatchOut(**data)
+
+
+@router.get("/live-windows", response_model=LiveWindowsOut)
+async def live_window_stats(_=Depends(get_current_user)):
+    # NOTE:
+    # - Served from memory; covers the generator stream of this process only.
+    return LiveWindowsOut(**live_windows.snapshot())
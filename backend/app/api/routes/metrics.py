@@ -0,0 +1,24 @@
+import hmac
+
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+
+router = APIRouter(tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics(request: Request):
+    # NOTE:
+    # - Scrapers authenticate with a static bearer token rather than a user JWT. The router is only
+    #   mounted with METRICS_BEARER_TOKEN set; an empty token still refuses every request.
+    token = str(settings.METRICS_BEARER_TOKEN)
+    supplied = request.headers.get("authorization", "")
+    if not token or not hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
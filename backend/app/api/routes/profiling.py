@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.api.deps import require_roles
+from app.core.config import settings
+from app.schemas.admin import MemoryProfileOut
+from app.services.profiling_service import profiler
+
+
+# NOTE:
+# - Only mounted when PROFILING_ENABLED is set; ADMIN role is still required on every endpoint.
+router = APIRouter(prefix="/admin/profiling", tags=["admin"], dependencies=[Depends(require_roles("ADMIN"))])
+
+
+@router.get("/cpu", response_class=PlainTextResponse)
+async def cpu_profile(
+    seconds: float = Query(10.0, gt=0, le=settings.PROFILING_MAX_SECONDS),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+    idle: bool = False,
+):
+    """
+    Samples the event loop for `seconds` and returns collapsed stacks (flamegraph.pl / speedscope input).
+
+    Idle samples (loop waiting for I/O) are counted in X-Profile-Idle-Samples and left out of the
+    stacks unless idle=true.
+    """
+    try:
+        result = await profiler.cpu(seconds, interval_ms, include_idle=idle)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    filename = f"cpu-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.collapsed"
+    return PlainTextResponse(
+        result["collapsed"],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Profile-Samples": str(result["samples"]),
+            "X-Profile-Idle-Samples": str(result["idle_samples"]),
+        },
+    )
+
+
+@router.post("/memory/start", response_model=MemoryProfileOut)
+async def start_memory_tracing(frames: int = Query(10, ge=1, le=100)):
+    """Starts tracemalloc (if needed) and takes the baseline snapshot for diffs."""
+    return profiler.memory_start(frames)
+
+
+@router.get("/memory", response_model=MemoryProfileOut)
+async def memory_snapshot(
+    group_by: Literal["lineno", "filename", "traceback"] = "lineno",
+    limit: int = Query(25, ge=1, le=500),
+    diff: bool = True,
+    rebase: bool = False,
+):
+    """
+    Top allocation sites now, or (diff=true) their growth since the baseline.
+
+    rebase=true makes this snapshot the new baseline, so repeated calls show growth per interval.
+    """
+    try:
+        return await profiler.memory_top(group_by, limit, diff, rebase)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@router.post("/memory/stop", response_model=MemoryProfileOut)
+async def stop_memory_tracing():
+    return profiler.memory_stop()
@@ -1,18 +1,28 @@
+import asyncio
 import io
-import csv
-from datetime import datetime, timezone
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, get_current_user, require_roles
-from app.schemas.record import RecordCreate, RecordUpdate, RecordOut, PaginatedRecords
+from app.api.deps import get_db, get_read_db, get_current_user, require_roles
+from app.core.config import settings
+from app.schemas.record import (
+    RecordCreate,
+    RecordUpdate,
+    RecordOut,
+    PaginatedRecords,
+    ImportJobOut,
+    RecordBulkFilter,
+    RecordBulkDeleteRequest,
+    RecordBulkUpdateRequest,
+    RecordBulkResult,
+)
 from app.services.record_service import RecordService
+from app.services.import_service import ImportService
 from app.services.log_service import LogService
 from app.models.user import User
 
-import openpyxl
-
 
 router = APIRouter(prefix="/records", tags=["records"])
 
@@ -34,18 +44,97 @@ async def list_records(
     end_time: datetime | None = None,
     sort_by: str = "timestamp",
     order: str = "desc",
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     _user: User = Depends(get_current_user),
 ):
     items, total = await RecordService.list_records(
         db, page, size, category, is_anomaly, start_time, end_time, sort_by, order, created_by=None
     )
-    return PaginatedRecords(
-        items=[RecordOut(**i.__dict__) for i in items],
-        page=page,
-        size=size,
-        total=total,
+    # NOTE:
+    # - Rows come from typed columns, so they are serialized directly instead of being re-validated.
+    # - response_model is kept for the OpenAPI schema.
+    return ORJSONResponse(
+        {
+            "items": [i._asdict() for i in items],
+            "page": page,
+            "size": size,
+            "total": total,
+        }
+    )
+
+
+def _bulk_filters(f: RecordBulkFilter, user: User) -> list:
+    """
+    Builds WHERE filters for bulk operations, including the ownership rule.
+
+    Design considerations:
+    - Rejects an empty filter so a bulk call can never silently target the whole table.
+    - Non-admins are restricted to their own records in the statement itself, matching single-record checks.
+    """
+    filters = RecordService.build_filters(
+        category=f.category,
+        is_anomaly=f.is_anomaly,
+        start_time=f.start_time,
+        end_time=f.end_time,
+        created_by=f.created_by,
+        title=f.title,
+    )
+    if not filters:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="At least one filter is required")
+
+    if user.role.name != "ADMIN":
+        filters += RecordService.build_filters(created_by=user.id)
+    return filters
+
+
+@router.post(
+    "/bulk-update",
+    response_model=RecordBulkResult,
+    dependencies=[Depends(require_roles("ADMIN", "USER"))],
+)
+async def bulk_update_records(
+    req: RecordBulkUpdateRequest,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    changes = {"title": req.title, "value": req.value, "category": req.category}
+    if all(v is None for v in changes.values()):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Nothing to update")
+
+    filters = _bulk_filters(req.filter, user)
+    affected, chunks = await RecordService.bulk_update(db, filters, changes, int(settings.BULK_CHUNK_SIZE))
+    await LogService.write(
+        db,
+        "INFO",
+        "SYSTEM",
+        "Bulk record update",
+        detail=f"affected={affected}, chunks={chunks}",
+        actor_user_id=user.id,
+    )
+    return RecordBulkResult(status="updated", affected=affected, chunks=chunks)
+
+
+@router.post(
+    "/bulk-delete",
+    response_model=RecordBulkResult,
+    dependencies=[Depends(require_roles("ADMIN", "USER"))],
+)
+async def bulk_delete_records(
+    req: RecordBulkDeleteRequest,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    filters = _bulk_filters(req.filter, user)
+    affected, chunks = await RecordService.bulk_delete(db, filters, int(settings.BULK_CHUNK_SIZE))
+    await LogService.write(
+        db,
+        "INFO",
+        "SYSTEM",
+        "Bulk record delete",
+        detail=f"affected={affected}, chunks={chunks}",
+        actor_user_id=user.id,
     )
+    return RecordBulkResult(status="deleted", affected=affected, chunks=chunks)
 
 
 @router.put("/{record_id}", response_model=RecordOut)
@@ -92,7 +181,12 @@ async def delete_record(
     return {"status": "deleted"}
 
 
-@router.post("/import", dependencies=[Depends(require_roles("ADMIN", "USER"))])
+@router.post(
+    "/import",
+    response_model=ImportJobOut,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(require_roles("ADMIN", "USER"))],
+)
 async def import_records(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
@@ -101,44 +195,34 @@ async def import_records(
     if file is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="CSV file is required")
 
-    content = await file.read()
-    text = content.decode("utf-8")
-    reader = csv.DictReader(io.StringIO(text))
-
-    rows_ok = []
-    errors = []
-    now = datetime.now(timezone.utc)
-
-    for idx, row in enumerate(reader, start=2):
-        try:
-            title = row.get("title", "").strip()
-            category = row.get("category", "").strip()
-            value = float(row.get("value", ""))
-
-            ts_raw = (row.get("timestamp") or "").strip()
-            ts = datetime.fromisoformat(ts_raw) if ts_raw else now
-
-            if not title or not category:
-                raise ValueError("title/category required")
-
-            rows_ok.append({"title": title, "value": value, "category": category, "timestamp": ts})
-        except Exception as e:
-            errors.append({"row": idx, "reason": str(e)})
-
-    inserted = 0
-    if rows_ok:
-        inserted = await RecordService.batch_insert(db, user.id, rows_ok)
+    # NOTE:
+    # - The upload is copied to local disk off the event loop; parsing and inserts run as a background job.
+    job = ImportService.create_job(user.id, file.filename or "upload.csv")
+    job.bytes_total = await asyncio.to_thread(ImportService.persist_upload, file.file, job.path)
+    ImportService.start(job)
 
     await LogService.write(
         db,
         "INFO",
         "DATA_IMPORT",
-        "CSV import completed",
-        detail=f"inserted={inserted}, errors={len(errors)}",
+        "CSV import queued",
+        detail=f"job={job.job_id}, bytes={job.bytes_total}",
         actor_user_id=user.id,
     )
 
-    return {"inserted": inserted, "errors": errors}
+    return ImportJobOut(**job.progress())
+
+
+@router.get("/import/{job_id}", response_model=ImportJobOut)
+async def import_status(job_id: str, user: User = Depends(get_current_user)):
+    job = ImportService.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import job not found")
+
+    if user.role.name != "ADMIN" and job.created_by != user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+    return ImportJobOut(**job.progress())
 
 
 @router.get("/export")
@@ -151,13 +235,17 @@ async def export_records(
     end_time: datetime | None = None,
     sort_by: str = "timestamp",
     order: str = "desc",
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     _user: User = Depends(get_current_user),
 ):
     items, _ = await RecordService.list_records(
         db, page, size, category, is_anomaly, start_time, end_time, sort_by, order, created_by=None
     )
 
+    # NOTE:
+    # - openpyxl is only needed here and costs ~80ms at import, so it loads on the first export.
+    import openpyxl
+
     wb = openpyxl.Workbook()
     ws = wb.active
     ws.title = "records"
@@ -0,0 +1,72 @@
+"""
+Rebuilds rollup tables from data_records.
+
+Usage (from backend/):
+    python -m app.commands.backfill_rollups [--start ISO] [--end ISO] [--window-hours N]
+
+Design considerations:
+- Processes hour-aligned windows, one transaction each, so progress is kept if the run is interrupted.
+- Rebuilding is idempotent; re-running a window replaces its buckets.
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func
+
+from app.core.logging import configure_logging
+from app.db.session import AsyncSessionLocal, engine
+from app.db.timebucket import floor_dt
+from app.models.record import DataRecord
+from app.services.rollup_service import RollupService
+
+
+logger = configure_logging()
+
+
+async def backfill(start: datetime | None, end: datetime | None, window_hours: int) -> int:
+    async with AsyncSessionLocal() as session:
+        if start is None or end is None:
+            lo, hi = (
+                await session.execute(select(func.min(DataRecord.timestamp), func.max(DataRecord.timestamp)))
+            ).one()
+            if lo is None:
+                logger.info("No records to backfill.")
+                return 0
+            start = start or lo
+            end = end or hi
+
+        window = timedelta(hours=window_hours)
+        cur = floor_dt(start, 3600)
+        windows = 0
+        while cur <= floor_dt(end, 3600):
+            # NOTE:
+            # - The window end is the last instant before the next window, so buckets do not overlap.
+            await RollupService.recompute(session, cur, cur + window - timedelta(microseconds=1))
+            await session.commit()
+            windows += 1
+            logger.info("Rollups rebuilt for [%s, %s)", cur.isoformat(), (cur + window).isoformat())
+            cur += window
+        return windows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild record rollups from raw data.")
+    parser.add_argument("--start", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--end", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--window-hours", type=int, default=24)
+    args = parser.parse_args()
+
+    async def run() -> None:
+        try:
+            windows = await backfill(args.start, args.end, max(args.window_hours, 1))
+            logger.info("Rollup backfill finished: windows=%s", windows)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
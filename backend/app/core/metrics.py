@@ -0,0 +1,212 @@
+import bisect
+import time
+from typing import Callable
+
+
+# NOTE:
+# - Every metric is updated from the event loop thread only, so plain int/float updates are
+#   atomic with respect to each other and no locks are taken on the hot path.
+# - Label sets are bounded by construction (route templates, fixed names), never raw paths or ids.
+# - Unlabelled series start at zero so they exist from the first scrape and rate() works at once.
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = labels
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: dict[tuple, float] = {} if labels else {(): 0.0}
+
+    def inc(self, amount: float = 1.0, *labels) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        return [f"{self.name}{_labels(self.label_names, k)} {_fmt(v)}" for k, v in self._values.items()]
+
+
+class Gauge(_Metric):
+    """A value read from a callback at scrape time, so nothing is updated on the hot path."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, read: Callable[[], float] | None = None):
+        super().__init__(name, help_text)
+        self.read = read
+
+    def render(self) -> list[str]:
+        if self.read is None:
+            return []
+        return [f"{self.name} {_fmt(self.read())}"]
+
+
+class _HistogramValues:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+
+
+class Histogram(_Metric):
+    """
+    Fixed-bucket histogram.
+
+    observe() is one bisect over the bucket bounds plus two additions; cumulative counts are only
+    built at scrape time.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: tuple[float, ...], labels: tuple[str, ...] = ()):
+        super().__init__(name, help_text, labels)
+        self.bounds = tuple(sorted(buckets))
+        self._values: dict[tuple, _HistogramValues] = {}
+        if not labels:
+            self._values[()] = _HistogramValues(len(self.bounds) + 1)
+
+    def observe(self, value: float, *labels) -> None:
+        values = self._values.get(labels)
+        if values is None:
+            values = self._values[labels] = _HistogramValues(len(self.bounds) + 1)
+        values.counts[bisect.bisect_left(self.bounds, value)] += 1
+        values.sum += value
+
+    def render(self) -> list[str]:
+        lines = []
+        for key, values in self._values.items():
+            cumulative = 0
+            for bound, count in zip((*self.bounds, float("inf")), values.counts):
+                cumulative += count
+                le = _labels((*self.label_names, "le"), (*key, _fmt(bound)))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_fmt(values.sum)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def counter(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self._add(Counter(name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], float] | None = None) -> Gauge:
+        return self._add(Gauge(name, help_text, read))
+
+    def histogram(
+        self, name: str, help_text: str, buckets: tuple[float, ...], labels: tuple[str, ...] = ()
+    ) -> Histogram:
+        return self._add(Histogram(name, help_text, buckets, labels))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format 0.0.4."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", LATENCY_BUCKETS, ("method", "route")
+)
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status")
+)
+http_db_statements = registry.histogram(
+    "http_request_db_statements", "DB statements per HTTP request by route template.", SIZE_BUCKETS, ("method", "route")
+)
+flush_duration = registry.histogram("flush_duration_seconds", "Batch flush duration.", LATENCY_BUCKETS)
+flush_batch_size = registry.histogram("flush_batch_size", "Events per batch flush.", SIZE_BUCKETS)
+flush_failures = registry.counter("flush_failures_total", "Batch flushes that failed and were re-queued.")
+flush_persisted = registry.counter("flush_persisted_events_total", "Events written by successful batch flushes.")
+flush_requeued = registry.counter("flush_requeued_events_total", "Events put back in the buffer by failed flushes.")
+buffer_depth = registry.gauge("buffer_depth", "Events waiting in the realtime buffer.")
+buffer_dropped = registry.counter("buffer_dropped_total", "Events dropped because the realtime buffer was full.")
+ws_send_duration = registry.histogram("ws_send_duration_seconds", "WebSocket send latency per message.", LATENCY_BUCKETS)
+ws_clients = registry.gauge("ws_clients", "Connected WebSocket clients.")
+ws_disconnects = registry.counter("ws_disconnects_total", "WebSocket clients removed (closed or failed sends).")
+db_pool_checked_out = registry.gauge("db_pool_checked_out", "Primary pool connections in use.")
+db_pool_overflow = registry.gauge("db_pool_overflow", "Primary pool connections open beyond pool_size.")
+db_pool_checkout_duration = registry.histogram(
+    "db_pool_checkout_seconds", "Time to obtain a pooled connection, including waits and new connects.", LATENCY_BUCKETS
+)
+generator_events = registry.counter("generator_events_total", "Events produced by the realtime generator.")
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request latency per route template.
+
+    Design considerations:
+    - Plain ASGI rather than BaseHTTPMiddleware: no extra task or response wrapping per request.
+    - The route is read from scope["route"] after routing, so /records/{record_id} is one series;
+      unmatched paths share the "unmatched" label.
+    - WebSocket and lifespan scopes pass straight through.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            http_request_duration.observe(time.perf_counter() - started, scope["method"], path)
+            http_requests.inc(1, scope["method"], path, str(status))
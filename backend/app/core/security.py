@@ -1,20 +1,31 @@
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from app.core.config import settings
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+@lru_cache(maxsize=1)
+def pwd_context():
+    """
+    Returns the bcrypt CryptContext, built on first use.
+
+    Design considerations:
+    - Only login and user creation hash passwords, so passlib and the bcrypt backend are not
+      loaded at import time and do not delay startup.
+    """
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def hash_password(password: str) -> str:
     """Hashes passwords using bcrypt."""
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
 
 
 def verify_password(password: str, password_hash: str) -> bool:
     """Verifies a password against a stored bcrypt hash."""
-    return pwd_context.verify(password, password_hash)
+    return pwd_context().verify(password, password_hash)
 
 
 def create_access_token(subject: str, role: str) -> tuple[str, int]:
@@ -0,0 +1,98 @@
+from datetime import date, datetime, timedelta, timezone
+
+
+# NOTE:
+# - data_records is RANGE-partitioned on TO_DAYS(timestamp) when the opt-in migration is applied.
+# - Partition p<start> holds rows in [start, next period); p_hist holds everything older than
+#   the first dated partition and p_future catches rows beyond the last pre-created one.
+TABLE = "data_records"
+HISTORY_PARTITION = "p_hist"
+FUTURE_PARTITION = "p_future"
+GRANULARITIES = ("day", "month")
+
+# MariaDB TO_DAYS('0001-01-01') = 366, Python date(1, 1, 1).toordinal() = 1.
+_TO_DAYS_OFFSET = 365
+
+
+def to_days(d: date) -> int:
+    return d.toordinal() + _TO_DAYS_OFFSET
+
+
+def from_days(days: int) -> date:
+    return date.fromordinal(days - _TO_DAYS_OFFSET)
+
+
+def as_db_time(dt: datetime) -> datetime:
+    """
+    Normalizes a query bound to the naive UTC form stored in DATETIME columns.
+
+    Design considerations:
+    - The MySQL drivers drop tzinfo without converting, so aware bounds are converted to UTC first.
+    - Comparing the bare column against a plain DATETIME literal keeps partition pruning effective.
+    """
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _check(granularity: str) -> None:
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unsupported partition granularity: {granularity}")
+
+
+def period_start(d: date, granularity: str) -> date:
+    _check(granularity)
+    return d if granularity == "day" else d.replace(day=1)
+
+
+def next_period(d: date, granularity: str) -> date:
+    _check(granularity)
+    if granularity == "day":
+        return d + timedelta(days=1)
+    return (d.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def partition_name(start: date, granularity: str) -> str:
+    _check(granularity)
+    return start.strftime("p%Y%m%d" if granularity == "day" else "p%Y%m")
+
+
+def partition_clause(start: date, granularity: str) -> str:
+    upper = to_days(next_period(start, granularity))
+    return f"PARTITION {partition_name(start, granularity)} VALUES LESS THAN ({upper})"
+
+
+def period_starts(first: date, count: int, granularity: str) -> list[date]:
+    starts = []
+    cur = period_start(first, granularity)
+    for _ in range(count):
+        starts.append(cur)
+        cur = next_period(cur, granularity)
+    return starts
+
+
+def initial_partitioning_sql(today: date, granularity: str, precreate: int) -> str:
+    """
+    Builds the ALTER statement that partitions an existing data_records table.
+
+    Existing rows older than the current period land in p_hist, which retention
+    drops as a whole once its upper bound falls behind the cutoff.
+    """
+    starts = period_starts(today, precreate + 1, granularity)
+    clauses = [f"PARTITION {HISTORY_PARTITION} VALUES LESS THAN ({to_days(starts[0])})"]
+    clauses += [partition_clause(s, granularity) for s in starts]
+    clauses.append(f"PARTITION {FUTURE_PARTITION} VALUES LESS THAN MAXVALUE")
+    return f"ALTER TABLE {TABLE} PARTITION BY RANGE (TO_DAYS(`timestamp`)) (\n  " + ",\n  ".join(clauses) + "\n)"
+
+
+def reorganize_future_sql(starts: list[date], granularity: str) -> str:
+    # NOTE:
+    # - Splitting p_future is a metadata-only change while it is empty, which is the normal case
+    #   because partitions are created ahead of the data.
+    clauses = [partition_clause(s, granularity) for s in starts]
+    clauses.append(f"PARTITION {FUTURE_PARTITION} VALUES LESS THAN MAXVALUE")
+    return f"ALTER TABLE {TABLE} REORGANIZE PARTITION {FUTURE_PARTITION} INTO (\n  " + ",\n  ".join(clauses) + "\n)"
+
+
+def drop_partitions_sql(names: list[str]) -> str:
+    return f"ALTER TABLE {TABLE} DROP PARTITION " + ", ".join(names)
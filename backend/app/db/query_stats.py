@@ -0,0 +1,225 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core import metrics
+from app.core.config import settings
+
+
+logger = logging.getLogger("realtime-monitoring")
+
+_LITERALS = re.compile(r"'(?:[^'\\]|\\.|'')*'|\b\d+(?:\.\d+)?\b|%s|%\(\w+\)s|\?")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_VALUE_ROWS = re.compile(r"(\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+")
+_SPACES = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """
+    Normalizes a statement so that queries differing only in values share one fingerprint.
+
+    Literals and placeholders become ?, IN lists and multi-row VALUES collapse to (...), and
+    whitespace is squeezed. Cached: bound statements repeat verbatim, so the regexes run once per shape.
+    """
+    text = _LITERALS.sub("?", statement)
+    text = _LISTS.sub("(...)", text)
+    text = _VALUE_ROWS.sub(r"\1", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+class RequestQueries:
+    """Statements seen in one scope; scopes nest (a test budget around a request) and all of them count."""
+
+    __slots__ = ("count", "seconds", "fingerprints", "parent")
+
+    def __init__(self, parent: "RequestQueries | None" = None):
+        self.count = 0
+        self.seconds = 0.0
+        self.fingerprints: Counter = Counter()
+        self.parent = parent
+
+    @property
+    def max_repeat(self) -> tuple[str | None, int]:
+        if not self.fingerprints:
+            return None, 0
+        return self.fingerprints.most_common(1)[0]
+
+
+_current: ContextVar[RequestQueries | None] = ContextVar("request_queries", default=None)
+
+
+class QueryStats:
+    """
+    Statement counts and timings from SQLAlchemy engine events.
+
+    Design considerations:
+    - Listens on the Engine class, so the primary, read replicas and script engines are all covered.
+    - Per-request totals live in a ContextVar; SQLAlchemy runs the sync layer in greenlets that
+      share the caller's context, so each statement lands on the request (or task) that issued it.
+    - Process-wide aggregation is per fingerprint (count, total, max) and bounded by max_fingerprints;
+      shapes beyond the bound are only counted under "other".
+    - Statements slower than slow_ms are logged with their fingerprint; parameters are never logged.
+    """
+
+    def __init__(self, slow_ms: float, max_fingerprints: int):
+        self.slow_ms = slow_ms
+        self.max_fingerprints = max_fingerprints
+        self._by_fingerprint: dict[str, list] = {}
+        self.other = 0
+        self.slow = 0
+        self.installed = False
+
+    def install(self) -> None:
+        if self.installed:
+            return
+        event.listen(Engine, "before_cursor_execute", self._before)
+        event.listen(Engine, "after_cursor_execute", self._after)
+        self.installed = True
+
+    # NOTE:
+    # - A connection runs one statement at a time, so one start slot per connection is enough;
+    #   a failed statement (no after event) simply has its slot overwritten by the next one.
+    @staticmethod
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info["query_started"] = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info.pop("query_started", time.perf_counter())
+        key = fingerprint(statement)
+
+        scope = _current.get()
+        while scope is not None:
+            scope.count += 1
+            scope.seconds += elapsed
+            scope.fingerprints[key] += 1
+            scope = scope.parent
+
+        entry = self._by_fingerprint.get(key)
+        if entry is None:
+            if len(self._by_fingerprint) >= self.max_fingerprints:
+                self.other += 1
+                return
+            entry = self._by_fingerprint[key] = [0, 0.0, 0.0]
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] = max(entry[2], elapsed)
+
+        if self.slow_ms and elapsed * 1000 >= self.slow_ms:
+            self.slow += 1
+            logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, key[:2000])
+
+    def top(self, limit: int, order: str = "total") -> list[dict]:
+        column = {"count": 0, "total": 1, "max": 2}[order]
+        rows = sorted(self._by_fingerprint.items(), key=lambda kv: -kv[1][column])[:limit]
+        return [
+            {
+                "fingerprint": key,
+                "count": count,
+                "total_ms": round(total * 1000, 2),
+                "avg_ms": round(total * 1000 / count, 3),
+                "max_ms": round(peak * 1000, 2),
+            }
+            for key, (count, total, peak) in rows
+        ]
+
+    def reset(self) -> None:
+        self._by_fingerprint.clear()
+        self.other = 0
+        self.slow = 0
+
+    def stats(self) -> dict:
+        return {
+            "installed": self.installed,
+            "fingerprints": len(self._by_fingerprint),
+            "statements": sum(e[0] for e in self._by_fingerprint.values()) + self.other,
+            "slow": self.slow,
+            "slow_ms": self.slow_ms,
+        }
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(max_statements: int | None = None, max_repeats: int | None = None):
+    """
+    Counts the statements issued inside the block and fails on too many or on N+1 shapes.
+
+    Usage:
+        with query_budget(max_statements=3, max_repeats=1) as queries:
+            await client.get("/records")
+
+    max_repeats bounds how often one fingerprint may run; a loop issuing the same SELECT per row
+    trips it even when the total stays small. Raises QueryBudgetExceeded (an AssertionError, so test
+    runners report it as a failure) when a bound is exceeded. Requires query_stats.install().
+    """
+    queries = RequestQueries(_current.get())
+    token = _current.set(queries)
+    try:
+        yield queries
+    finally:
+        _current.reset(token)
+    if max_statements is not None and queries.count > max_statements:
+        raise QueryBudgetExceeded(f"{queries.count} statements, budget {max_statements}")
+    key, repeats = queries.max_repeat
+    if max_repeats is not None and repeats > max_repeats:
+        raise QueryBudgetExceeded(f"Statement ran {repeats} times (N+1?), budget {max_repeats}: {key}")
+
+
+class QueryTimingMiddleware:
+    """
+    Pure ASGI middleware adding per-request DB statement count and time as a Server-Timing header.
+
+    Design considerations:
+    - The header is written with http.response.start, so statements issued while a streaming body
+      is sent afterwards are not in it (they still count in the per-fingerprint aggregates).
+    - A request that runs one fingerprint at least n_plus_one times is logged as a likely N+1.
+    """
+
+    def __init__(self, app, n_plus_one: int = 0):
+        self.app = app
+        self.n_plus_one = n_plus_one
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries(_current.get())
+        token = _current.set(queries)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                _, repeats = queries.max_repeat
+                timing = (
+                    f'db;dur={queries.seconds * 1000:.2f};desc="statements={queries.count} max_repeat={repeats}"'
+                )
+                message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            metrics.http_db_statements.observe(queries.count, scope["method"], route)
+            key, repeats = queries.max_repeat
+            if self.n_plus_one and repeats >= self.n_plus_one:
+                logger.warning(
+                    "Possible N+1: %s %s ran one statement %d times: %s", scope["method"], route, repeats, key[:500]
+                )
+
+
+query_stats = QueryStats(
+    slow_ms=float(settings.SLOW_QUERY_MS),
+    max_fingerprints=int(settings.SQL_STATS_MAX_FINGERPRINTS),
+)
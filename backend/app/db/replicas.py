@@ -0,0 +1,148 @@
+import asyncio
+import itertools
+import logging
+import time
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+
+
+logger = logging.getLogger("realtime-monitoring")
+
+PRIMARY = "primary"
+
+
+class _Replica:
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.host = make_url(url).host
+        # NOTE:
+        # - Read-only traffic only; a smaller pool per replica keeps the total connection count close
+        #   to what the primary alone used to take.
+        self.engine = create_async_engine(url, pool_pre_ping=True, pool_size=3, max_overflow=5)
+        self.sessionmaker = async_sessionmaker(bind=self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.healthy = False
+        self.lag_seconds: int | None = None
+        self.last_error: str | None = None
+        self.routed = 0
+
+
+class ReadReplicaRouter:
+    """
+    Routes read-only sessions to healthy read replicas, falling back to the primary.
+
+    Design considerations:
+    - Replicas come from DB_READ_REPLICA_URLS; with none configured every read uses the primary.
+    - Round-robin over replicas whose last health check passed (SELECT 1, and replication lag within
+      REPLICA_MAX_LAG_SECONDS when the account may read SHOW SLAVE STATUS).
+    - Read-your-writes: after a user's write request their reads stay on the primary for
+      READ_YOUR_WRITES_SECONDS, so replication lag never hides their own change.
+    - Sessions are tagged in session.info["db_route"] so shared in-flight queries never mix routes.
+    """
+
+    def __init__(self, urls: list[str]):
+        self.replicas = [_Replica(f"replica{i + 1}", url) for i, url in enumerate(urls)]
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+        self._recent_writers: dict[str, float] = {}
+        self.primary_reads = 0
+        self.sticky_reads = 0
+
+    def mark_write(self, subject: str | None) -> None:
+        if subject is None or not self.replicas:
+            return
+        now = time.monotonic()
+        self._recent_writers[subject] = now + float(settings.READ_YOUR_WRITES_SECONDS)
+        if len(self._recent_writers) > 10000:
+            self._recent_writers = {k: v for k, v in self._recent_writers.items() if v > now}
+
+    def _sticky(self, subject: str | None) -> bool:
+        until = self._recent_writers.get(subject) if subject is not None else None
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            self._recent_writers.pop(subject, None)
+            return False
+        return True
+
+    def pick(self, subject: str | None) -> _Replica | None:
+        if self._cycle is None:
+            return None
+        if self._sticky(subject):
+            self.sticky_reads += 1
+            return None
+        for _ in range(len(self.replicas)):
+            replica = next(self._cycle)
+            if replica.healthy:
+                replica.routed += 1
+                return replica
+        self.primary_reads += 1
+        return None
+
+    def session(self, subject: str | None) -> AsyncSession:
+        replica = self.pick(subject)
+        session = replica.sessionmaker() if replica else AsyncSessionLocal()
+        session.info["db_route"] = replica.name if replica else PRIMARY
+        return session
+
+    async def _check(self, replica: _Replica) -> None:
+        try:
+            async with replica.engine.connect() as conn:
+                await asyncio.wait_for(conn.execute(text("SELECT 1")), timeout=2)
+                lag = None
+                try:
+                    status = (await conn.execute(text("SHOW SLAVE STATUS"))).mappings().first()
+                    if status is not None:
+                        lag = status.get("Seconds_Behind_Master")
+                except Exception:
+                    pass  # no REPLICATION CLIENT privilege: liveness only
+            replica.lag_seconds = None if lag is None else int(lag)
+            max_lag = int(settings.REPLICA_MAX_LAG_SECONDS)
+            if replica.lag_seconds is not None and replica.lag_seconds > max_lag:
+                replica.healthy, replica.last_error = False, f"lag {replica.lag_seconds}s > {max_lag}s"
+            else:
+                replica.healthy, replica.last_error = True, None
+        except Exception as e:
+            if replica.healthy:
+                logger.warning("Read replica %s marked unhealthy: %s", replica.name, str(e))
+            replica.healthy, replica.last_error = False, str(e)[:200]
+
+    async def check_all(self) -> None:
+        await asyncio.gather(*(self._check(r) for r in self.replicas))
+
+    async def health_loop(self) -> None:
+        interval = float(settings.REPLICA_HEALTH_CHECK_SECONDS)
+        while True:
+            await self.check_all()
+            await asyncio.sleep(interval)
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def stats(self) -> dict:
+        return {
+            "replicas": [
+                {
+                    "name": r.name,
+                    "host": r.host,
+                    "healthy": r.healthy,
+                    "lag_seconds": r.lag_seconds,
+                    "routed": r.routed,
+                    "last_error": r.last_error,
+                }
+                for r in self.replicas
+            ],
+            "primary_fallback_reads": self.primary_reads,
+            "read_your_writes_reads": self.sticky_reads,
+        }
+
+
+read_replicas = ReadReplicaRouter([u.strip() for u in settings.DB_READ_REPLICA_URLS.split(",") if u.strip()])
+
+
+def db_route(session: AsyncSession) -> str:
+    return session.info.get("db_route", PRIMARY)
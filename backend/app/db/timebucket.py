@@ -0,0 +1,37 @@
+import math
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, literal_column
+
+from app.db.partitioning import as_db_time
+
+
+# NOTE:
+# - Buckets are aligned to a fixed epoch with integer second arithmetic, which is independent of the
+#   session time zone (unlike UNIX_TIMESTAMP/FROM_UNIXTIME) and works for any bucket width.
+EPOCH = datetime(2000, 1, 1)
+# NOTE:
+# - A typed TIMESTAMP literal makes TIMESTAMPADD return DATETIME rather than a string.
+_EPOCH_SQL = literal_column("TIMESTAMP '2000-01-01 00:00:00'")
+_SECOND = literal_column("SECOND")
+
+
+def floor_dt(dt: datetime, seconds: int) -> datetime:
+    offset = (as_db_time(dt) - EPOCH).total_seconds()
+    return EPOCH + timedelta(seconds=math.floor(offset / seconds) * seconds)
+
+
+def is_aligned(dt: datetime, seconds: int) -> bool:
+    return as_db_time(dt) == floor_dt(dt, seconds)
+
+
+def bucket_expr(column, seconds: int):
+    """SQL expression flooring a DATETIME column to a bucket of the given width."""
+    # NOTE:
+    # - The width is inlined so the SELECT and GROUP BY render the identical expression.
+    width = literal_column(str(int(seconds)))
+    return func.timestampadd(
+        _SECOND,
+        func.floor(func.timestampdiff(_SECOND, _EPOCH_SQL, column) / width) * width,
+        _EPOCH_SQL,
+    )
@@ -1,20 +1,41 @@
+import time
+
+# NOTE:
+# - Taken before the application imports so the startup report includes them.
+_IMPORT_STARTED = time.perf_counter()
+
 import asyncio
 from datetime import datetime, timezone
 
-from fastapi import FastAPI
+import orjson
+from fastapi import FastAPI, Request
 
 from app.core.logging import configure_logging
 from app.core.config import settings
+from app.core import metrics
 from app.api.routes import auth, records, analytics, admin, websocket
+from app.api.routes import metrics as metrics_route
 from app.services.realtime_service import (
     RealtimeBuffer,
     RealtimeGenerator,
     WebSocketBroadcaster,
     FlushStats,
 )
-from app.db.session import AsyncSessionLocal, db_ping
+from app.db.session import AsyncSessionLocal, db_ping, engine, warm_pool
+from app.db.replicas import read_replicas
+from app.db.query_stats import QueryTimingMiddleware, query_stats
+from app.api.deps import token_subject
 from app.services.record_service import RecordService
 from app.services.log_service import LogService
+from app.services.import_service import ImportService
+from app.services.partition_service import PartitionService
+from app.services.aggregate_service import aggregate_engine
+from app.services.cache_service import analytics_cache
+from app.services.singleflight_service import query_flights
+from app.services.dictionary_service import record_dictionary
+from app.services.archive_service import ArchiveService, cold_archive
+from app.services.anomaly_service import AnomalyService
+from app.services.rescore_service import RescoreService
 from app.models.user import User
 from sqlalchemy import select
 
@@ -28,6 +49,20 @@ app.include_router(records.router)
 app.include_router(analytics.router)
 app.include_router(admin.router)
 app.include_router(websocket.router)
+# NOTE:
+# - /metrics exposes route templates, traffic and pool figures on the public API port, so it is
+#   never served unauthenticated: enabling it without a token only logs a warning.
+METRICS_ON = bool(settings.METRICS_ENABLED and settings.METRICS_BEARER_TOKEN)
+if settings.METRICS_ENABLED and not METRICS_ON:
+    logger.warning("METRICS_ENABLED is set but METRICS_BEARER_TOKEN is empty; /metrics is not served")
+if METRICS_ON:
+    app.include_router(metrics_route.router)
+if settings.PROFILING_ENABLED:
+    # NOTE:
+    # - Imported only when enabled, so a disabled profiler costs nothing, not even import time.
+    from app.api.routes import profiling
+
+    app.include_router(profiling.router)
 
 broadcaster = WebSocketBroadcaster()
 buffer = RealtimeBuffer(max_size=int(settings.BUFFER_MAX_SIZE))
@@ -36,6 +71,38 @@ flush_stats = FlushStats()
 
 websocket.set_broadcaster(broadcaster)
 
+startup_phases: dict[str, float] = {"imports": round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1)}
+
+
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    """Starts the caller's read-your-writes window once a write request has completed."""
+    response = await call_next(request)
+    if read_replicas.replicas and request.method not in ("GET", "HEAD", "OPTIONS"):
+        auth_header = request.headers.get("authorization", "")
+        if auth_header.lower().startswith("bearer "):
+            read_replicas.mark_write(token_subject(auth_header[7:]))
+    return response
+
+
+if settings.SQL_STATS_ENABLED:
+    query_stats.install()
+    app.add_middleware(QueryTimingMiddleware, n_plus_one=int(settings.N_PLUS_ONE_THRESHOLD))
+
+# NOTE:
+# - Added last so it is the outermost middleware and its latency covers the whole stack.
+# - Gauges are read at scrape time; nothing is updated per event for them.
+if METRICS_ON:
+    app.add_middleware(metrics.MetricsMiddleware)
+metrics.buffer_depth.read = lambda: buffer.depth
+metrics.ws_clients.read = lambda: broadcaster.clients
+metrics.db_pool_checked_out.read = engine.pool.checkedout
+metrics.db_pool_overflow.read = lambda: max(engine.pool.overflow(), 0)
+
+RecordService.add_listener(aggregate_engine.apply)
+RecordService.add_listener(analytics_cache.on_write)
+RecordService.add_listener(query_flights.on_write)
+
 
 async def _get_system_user_id() -> int:
     """
@@ -68,6 +135,14 @@ async def runtime_status_provider():
         "last_flush_count": flush_stats.last_flush_count,
         "last_flush_success": flush_stats.last_flush_success,
         "db_connected": await db_ping(),
+        "analytics_cache": analytics_cache.stats(),
+        "single_flight": query_flights.stats(),
+        "read_replicas": read_replicas.stats(),
+        "record_dictionary": record_dictionary.stats(),
+        "cold_archive": cold_archive.stats(),
+        "flush": flush_stats.snapshot(dropped=buffer.dropped),
+        "sql_stats": query_stats.stats(),
+        "startup_ms": startup_phases,
     }
 
 
@@ -83,17 +158,22 @@ async def batch_flush_loop(system_user_id: int):
     - Records flush outcomes in system logs for auditability.
     - On failure, re-queues the drained batch back to memory for retry.
       This approach is acceptable for MVP; production systems typically use durable queues.
+    - Batch size and duration (failed attempts included) feed the /metrics histograms; every
+      non-empty flush is also kept in flush_stats' history ring for /admin/system/status.
     """
     interval = int(settings.BATCH_INTERVAL_SECONDS)
     while True:
         await asyncio.sleep(interval)
         batch = await buffer.drain()
         if not batch:
-            flush_stats.last_flush_time = datetime.now(timezone.utc)
-            flush_stats.last_flush_count = 0
-            flush_stats.last_flush_success = True
+            now = datetime.now(timezone.utc)
+            flush_stats.record(now, now, 0, 0)
             continue
 
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        size_bytes = len(orjson.dumps(batch))
+        metrics.flush_batch_size.observe(len(batch))
         try:
             async with AsyncSessionLocal() as session:
                 record_rows = []
@@ -104,6 +184,7 @@ async def batch_flush_loop(system_user_id: int):
                             "value": float(event["value"]),
                             "category": event["category"],
                             "timestamp": datetime.fromisoformat(event["timestamp"]),
+                            "is_anomaly": bool(event["is_anomaly"]),
                         }
                     )
                 inserted = await RecordService.batch_insert(
@@ -120,31 +201,177 @@ async def batch_flush_loop(system_user_id: int):
                     actor_user_id=None,
                 )
 
-            flush_stats.last_flush_time = datetime.now(timezone.utc)
-            flush_stats.last_flush_count = len(batch)
-            flush_stats.last_flush_success = True
+            metrics.flush_duration.observe(time.perf_counter() - started)
+            metrics.flush_persisted.inc(len(batch))
+            flush_stats.record(started_at, datetime.now(timezone.utc), len(batch), size_bytes)
         except Exception as e:
-            for item in batch:
-                await buffer.add(item)
-
-            flush_stats.last_flush_time = datetime.now(timezone.utc)
-            flush_stats.last_flush_count = len(batch)
-            flush_stats.last_flush_success = False
+            metrics.flush_duration.observe(time.perf_counter() - started)
+            metrics.flush_failures.inc()
+            metrics.flush_requeued.inc(len(batch))
+            await buffer.requeue(batch)
+            flush_stats.record(started_at, datetime.now(timezone.utc), len(batch), size_bytes, error=e)
             logger.exception("Batch flush failed: %s", str(e))
 
 
+async def partition_maintenance_loop():
+    """
+    Keeps data_records partitions ahead of the data, archives aged ones and applies retention.
+
+    Design considerations:
+    - Runs immediately at startup, then at a slow fixed interval; partition DDL is cheap but not free.
+    - Is a no-op on unpartitioned tables, so the loop is safe to run without the opt-in migration.
+    - Archiving runs first so retention never drops a partition that is due for the archive.
+    """
+    interval = int(settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS)
+    while True:
+        try:
+            async with AsyncSessionLocal() as session:
+                archived = await ArchiveService.archive(session, datetime.now(timezone.utc).date())
+                if archived["archived"] or archived["purged_days"]:
+                    await LogService.write(
+                        session,
+                        level="INFO",
+                        event_type="DB",
+                        message="Partition archive",
+                        detail=(
+                            f"archived={archived['archived']}, rows={archived['rows']}, "
+                            f"purged_days={archived['purged_days']}"
+                        ),
+                        actor_user_id=None,
+                    )
+                result = await PartitionService.maintain(session, datetime.now(timezone.utc))
+                if result["created"] or result["dropped"]:
+                    await LogService.write(
+                        session,
+                        level="INFO",
+                        event_type="DB",
+                        message="Partition maintenance",
+                        detail=f"created={result['created']}, dropped={result['dropped']}",
+                        actor_user_id=None,
+                    )
+        except Exception as e:
+            logger.exception("Partition maintenance failed: %s", str(e))
+        await asyncio.sleep(interval)
+
+
+async def aggregate_reconcile_loop():
+    """
+    Periodically reseeds the in-memory aggregates from the DB.
+
+    Design considerations:
+    - Incremental updates are exact on the normal paths; the full reseed bounds drift from rare races.
+    - The first run doubles as the startup seed, so unbounded analytics become O(1) once it completes.
+    """
+    interval = int(settings.AGGREGATE_RECONCILE_SECONDS)
+    while True:
+        try:
+            async with AsyncSessionLocal() as session:
+                await aggregate_engine.seed(session)
+        except Exception as e:
+            logger.exception("Aggregate reconcile failed: %s", str(e))
+        await asyncio.sleep(interval)
+
+
+async def detector_state_loop():
+    """
+    Periodically saves anomaly detector state so it survives restarts.
+
+    Design considerations:
+    - A crash loses at most one interval of state updates; detectors re-adapt from there.
+    """
+    interval = int(settings.ANOMALY_STATE_SAVE_SECONDS)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with AsyncSessionLocal() as session:
+                await AnomalyService.save_state(session)
+        except Exception as e:
+            logger.exception("Detector state save failed: %s", str(e))
+
+
+async def _timed(phase: str, coro):
+    started = time.perf_counter()
+    try:
+        return await coro
+    finally:
+        startup_phases[phase] = round((time.perf_counter() - started) * 1000, 1)
+
+
+async def _guarded(what: str, coro) -> None:
+    try:
+        await coro
+    except Exception as e:
+        logger.exception("%s failed: %s", what, str(e))
+
+
+async def _load_detector_state() -> None:
+    async with AsyncSessionLocal() as session:
+        await AnomalyService.load_state(session)
+
+
+async def _load_record_dictionary() -> None:
+    if record_dictionary.enabled:
+        await record_dictionary.load()
+
+
 @app.on_event("startup")
 async def on_startup():
+    """
+    Loads startup state and starts the background loops.
+
+    Design considerations:
+    - Independent DB round trips (pool warm-up, system user, detector state, record dictionary,
+      replica health) run concurrently, so readiness costs the slowest of them rather than the sum.
+    - Each phase is timed; the breakdown is logged once and kept under startup_ms in the runtime status.
+      `python -m scripts.check_import_time` breaks the imports phase down per module.
+    """
     logger.info("Starting realtime generator and batch flush loop...")
-    system_user_id = await _get_system_user_id()
+    started = time.perf_counter()
+    system_user_id, *_ = await asyncio.gather(
+        _timed("system_user", _get_system_user_id()),
+        _timed("pool_warmup", _guarded("Connection pool warm-up", warm_pool())),
+        _timed("detector_state", _guarded("Detector state load", _load_detector_state())),
+        _timed("record_dictionary", _guarded("Record dictionary load", _load_record_dictionary())),
+        _timed("replica_check", read_replicas.check_all()),
+    )
+    try:
+        resumed = await _timed("rescore_resume", RescoreService.resume_pending())
+        if resumed:
+            logger.info("Resuming anomaly rescore jobs: %s", resumed)
+    except Exception as e:
+        logger.exception("Rescore job resume failed: %s", str(e))
     app.state.generator_task = asyncio.create_task(generator.run(broadcaster))
     app.state.flush_task = asyncio.create_task(batch_flush_loop(system_user_id))
+    app.state.partition_task = asyncio.create_task(partition_maintenance_loop())
+    app.state.aggregate_task = asyncio.create_task(aggregate_reconcile_loop())
+    app.state.detector_task = asyncio.create_task(detector_state_loop())
+    if read_replicas.replicas:
+        app.state.replica_task = asyncio.create_task(read_replicas.health_loop())
+
+    startup_phases["startup"] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info("Startup timing (ms): %s", ", ".join(f"{k}={v}" for k, v in startup_phases.items()))
 
 
 @app.on_event("shutdown")
 async def on_shutdown():
     generator.stop()
-    for task_name in ["generator_task", "flush_task"]:
+    ImportService.shutdown()
+    RescoreService.shutdown()
+    for task_name in [
+        "generator_task",
+        "flush_task",
+        "partition_task",
+        "aggregate_task",
+        "detector_task",
+        "replica_task",
+    ]:
         task = getattr(app.state, task_name, None)
         if task:
             task.cancel()
+    try:
+        async with AsyncSessionLocal() as session:
+            await AnomalyService.save_state(session)
+    except Exception as e:
+        logger.exception("Detector state save failed: %s", str(e))
+    await read_replicas.dispose()
+    cold_archive.shutdown()
@@ -1,4 +1,9 @@
 from app.models.role import Role  # noqa: F401
 from app.models.user import User  # noqa: F401
-from app.models.record import DataRecord  # noqa: F401
+from app.models.record import DataRecord, RecordCategory, RecordTitle, EncodedRecord  # noqa: F401
 from app.models.system_log import SystemLog  # noqa: F401
+from app.models.rollup import RecordRollupMinute, RecordRollupHour  # noqa: F401
+from app.models.sketch import RecordSketchHour  # noqa: F401
+from app.models.detector_state import DetectorState  # noqa: F401
+from app.models.rescore_job import RescoreJob  # noqa: F401
+from app.models.anomaly_event import AnomalyEvent  # noqa: F401
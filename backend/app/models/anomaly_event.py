@@ -0,0 +1,21 @@
+from sqlalchemy import String, Integer, Float, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class AnomalyEvent(Base):
+    __tablename__ = "anomaly_events"
+
+    # NOTE:
+    # - One row per data_records row with is_anomaly = true, copying only what anomaly
+    #   listings filter and sort on; other columns are joined back by record_id.
+    # - No foreign key, so the table also works next to a partitioned data_records.
+    record_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    category: Mapped[str] = mapped_column(String(64), nullable=False)
+    timestamp: Mapped[str] = mapped_column(DateTime, nullable=False)
+    value: Mapped[float] = mapped_column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_anomaly_events_timestamp", "timestamp"),
+        Index("ix_anomaly_events_category_timestamp", "category", "timestamp"),
+    )
@@ -0,0 +1,15 @@
+from sqlalchemy import String, JSON, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class DetectorState(Base):
+    __tablename__ = "anomaly_detector_state"
+
+    # NOTE:
+    # - One row per (detector, key); the state layout is owned by the detector class.
+    detector: Mapped[str] = mapped_column(String(32), primary_key=True)
+    key: Mapped[str] = mapped_column(String(128), primary_key=True)
+    state: Mapped[dict] = mapped_column(JSON, nullable=False)
+
+    updated_at: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
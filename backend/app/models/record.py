@@ -1,10 +1,19 @@
-from sqlalchemy import String, Integer, Float, Boolean, DateTime, ForeignKey, func
+from sqlalchemy import String, Integer, SmallInteger, Float, Boolean, DateTime, ForeignKey, MetaData, Table, Column, func
 from sqlalchemy.orm import Mapped, mapped_column
+from app.core.config import settings
 from app.db.base import Base
 
 
+# NOTE:
+# - With the opt-in "dictionary" migration, data_records stores title_id/category_id and the
+#   data_records_decoded view joins the names back. DataRecord then maps the view, so every read
+#   keeps its columns; writes go to EncodedRecord through RecordDictionary.
+DICTIONARY_ENCODED = bool(settings.RECORD_DICTIONARY_ENCODING)
+DECODED_VIEW = "data_records_decoded"
+
+
 class DataRecord(Base):
-    __tablename__ = "data_records"
+    __tablename__ = DECODED_VIEW if DICTIONARY_ENCODED else "data_records"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
@@ -23,3 +32,39 @@ class DataRecord(Base):
 
     created_at: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class RecordCategory(Base):
+    __tablename__ = "record_categories"
+
+    id: Mapped[int] = mapped_column(SmallInteger, primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)
+
+
+class RecordTitle(Base):
+    __tablename__ = "record_titles"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(128), nullable=False, unique=True)
+
+
+# NOTE:
+# - Physical layout of data_records after the "dictionary" migration. Kept on its own MetaData so
+#   it never collides with DataRecord's table and autogenerate ignores it on unencoded schemas.
+encoded_records = Table(
+    "data_records",
+    MetaData(),
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("title_id", Integer, nullable=False),
+    Column("value", Float, nullable=False),
+    Column("category_id", SmallInteger, nullable=False),
+    Column("timestamp", DateTime(timezone=True), nullable=False),
+    Column("is_anomaly", Boolean, default=False, nullable=False),
+    Column("created_by", Integer, nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True), server_default=func.now(), onupdate=func.now()),
+)
+
+
+class EncodedRecord(Base):
+    __table__ = encoded_records
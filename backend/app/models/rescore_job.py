@@ -0,0 +1,29 @@
+from sqlalchemy import String, Integer, BigInteger, JSON, DateTime, ForeignKey, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class RescoreJob(Base):
+    __tablename__ = "anomaly_rescore_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    status: Mapped[str] = mapped_column(String(16), nullable=False)  # running/completed/failed/cancelled
+    detector: Mapped[str] = mapped_column(String(32), nullable=False)
+
+    # NOTE:
+    # - The keyset cursor and the replayed detector state are committed with each chunk's UPDATEs,
+    #   so a restarted job resumes exactly after the last applied chunk.
+    cursor_ts: Mapped[str] = mapped_column(DateTime, nullable=True)
+    cursor_id: Mapped[int] = mapped_column(Integer, nullable=True)
+    detector_state: Mapped[dict] = mapped_column(JSON, nullable=True)
+
+    rows_total: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    rows_scanned: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    rows_changed: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    chunks: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error: Mapped[str] = mapped_column(String(512), nullable=True)
+
+    created_by: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    created_at: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    finished_at: Mapped[str] = mapped_column(DateTime(timezone=True), nullable=True)
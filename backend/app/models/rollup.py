@@ -0,0 +1,27 @@
+from sqlalchemy import String, BigInteger, Integer, Float, Double, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class _RollupColumns:
+    # NOTE:
+    # - One row per (bucket, category, title); per-category figures are sums over titles.
+    # - sum_sq allows variance to be derived without revisiting raw rows.
+    bucket_start: Mapped[str] = mapped_column(DateTime, primary_key=True)
+    category: Mapped[str] = mapped_column(String(64), primary_key=True)
+    title: Mapped[str] = mapped_column(String(128), primary_key=True)
+
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    sum: Mapped[float] = mapped_column(Double, nullable=False, default=0.0)
+    sum_sq: Mapped[float] = mapped_column(Double, nullable=False, default=0.0)
+    min: Mapped[float] = mapped_column(Float, nullable=False)
+    max: Mapped[float] = mapped_column(Float, nullable=False)
+    anomaly_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class RecordRollupMinute(_RollupColumns, Base):
+    __tablename__ = "record_rollups_minute"
+
+
+class RecordRollupHour(_RollupColumns, Base):
+    __tablename__ = "record_rollups_hour"
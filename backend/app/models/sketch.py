@@ -0,0 +1,18 @@
+from sqlalchemy import String, BigInteger, Integer, SmallInteger, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class RecordSketchHour(Base):
+    __tablename__ = "record_sketches_hour"
+
+    # NOTE:
+    # - One row per non-empty DDSketch bin of an (hour, category); a bucket's sketch is its set of rows.
+    # - Storing bins as rows lets concurrent writers merge with an additive upsert and lets
+    #   queries merge sketches with SUM(count) ... GROUP BY bin.
+    bucket_start: Mapped[str] = mapped_column(DateTime, primary_key=True)
+    category: Mapped[str] = mapped_column(String(64), primary_key=True)
+    sign: Mapped[int] = mapped_column(SmallInteger, primary_key=True)  # -1, 0 or 1
+    bin: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
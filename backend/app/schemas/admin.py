@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel, EmailStr
 
 
@@ -11,3 +12,37 @@ class UserOut(BaseModel):
 
 class UpdateUserRoleRequest(BaseModel):
     role: str  # ADMIN/USER/VIEWER
+
+
+class RescoreJobOut(BaseModel):
+    job_id: int
+    status: str  # running/completed/failed/cancelled
+    detector: str
+    rows_total: int
+    rows_scanned: int
+    rows_changed: int
+    chunks: int
+    percent: float | None
+    cursor_ts: datetime | None
+    error: str | None
+    created_by: int
+    created_at: datetime | None
+    updated_at: datetime | None
+    finished_at: datetime | None
+
+
+class MemorySiteOut(BaseModel):
+    site: str
+    size_kb: float
+    count: int
+    size_diff_kb: float | None
+    count_diff: int | None
+
+
+class MemoryProfileOut(BaseModel):
+    tracing: bool
+    traceback_frames: int
+    traced_current_kb: float
+    traced_peak_kb: float
+    baseline_at: datetime | None
+    stats: list[MemorySiteOut] = []
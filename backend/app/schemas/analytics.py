@@ -1,5 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import Any, Literal
 
 
 class SummaryOut(BaseModel):
@@ -20,5 +21,128 @@ class CategoryAggItem(BaseModel):
 
 class TrendPoint(BaseModel):
     bucket_start: datetime
-    avg: float
+    avg: float | None  # None for gap-filled empty buckets
+    count: int
+
+
+class TrendSeries(BaseModel):
+    category: str | None
+    points: list[TrendPoint]
+
+
+class TrendOut(BaseModel):
+    interval_seconds: int
+    start_time: datetime
+    end_time: datetime
+    series: list[TrendSeries]
+
+
+class QuantileRow(BaseModel):
+    category: str | None
+    count: int
+    values: list[float | None]  # aligned with QuantilesOut.quantiles; None when count is 0
+
+
+class QuantilesOut(BaseModel):
+    relative_accuracy: float
+    quantiles: list[float]
+    start_time: datetime | None
+    end_time: datetime | None
+    overall: QuantileRow
+    by_category: list[QuantileRow]
+
+
+class HistogramSeries(BaseModel):
+    category: str
+    counts: list[int]
+
+
+class HistogramOut(BaseModel):
+    edges: list[float]  # len(counts) + 1; bins are [e_i, e_i+1), the last one closed
+    approximate: bool
+    relative_accuracy: float | None
+    total: list[int]
+    series: list[HistogramSeries]
+
+
+class LiveWindowStatsOut(BaseModel):
+    count: int
+    avg: float | None
+    min: float | None
+    max: float | None
+    anomaly_count: int
+    anomaly_rate: float
+
+
+class LiveWindowsOut(BaseModel):
+    as_of: datetime
+    overall: dict[str, LiveWindowStatsOut]  # keyed by window: 1m, 5m, 15m
+    categories: dict[str, dict[str, LiveWindowStatsOut]]
+
+
+class SeriesData(BaseModel):
+    category: str
+    source_count: int  # rows in range before downsampling
+    timestamps: list[datetime]
+    values: list[float]
+
+
+class SeriesOut(BaseModel):
+    method: str
+    points: int
+    start_time: datetime
+    end_time: datetime
+    series: list[SeriesData]
+
+
+class AnomalyCategoryRow(BaseModel):
+    category: str
     count: int
+    first_time: datetime | None
+    last_time: datetime | None
+
+
+class AnomalySummaryOut(BaseModel):
+    count: int
+    first_time: datetime | None
+    last_time: datetime | None
+    by_category: list[AnomalyCategoryRow]
+
+
+class AnalyticsBatchFilter(BaseModel):
+    start_time: datetime | None = None
+    end_time: datetime | None = None
+    category: str | None = None
+
+
+class QuantileParams(BaseModel):
+    q: list[float] = Field(default_factory=lambda: [0.5, 0.95, 0.99], max_length=20)
+
+
+class HistogramParams(BaseModel):
+    bins: int = 20
+    lo: float | None = None
+    hi: float | None = None
+    edges: list[float] | None = None
+    approximate: bool = False
+
+
+class TrendParams(BaseModel):
+    interval: Literal["1m", "5m", "1h", "1d"] = "1m"
+    group_by_category: bool = False
+
+
+class AnalyticsBatchItem(BaseModel):
+    name: str = Field(min_length=1, max_length=64)
+    kind: Literal["summary", "by_category", "quantiles", "histogram", "trend"]
+    params: dict[str, Any] = Field(default_factory=dict)
+
+
+class AnalyticsBatchRequest(BaseModel):
+    filter: AnalyticsBatchFilter = Field(default_factory=AnalyticsBatchFilter)
+    requests: list[AnalyticsBatchItem] = Field(min_length=1, max_length=20)
+
+
+class AnalyticsBatchOut(BaseModel):
+    results: dict[str, Any]  # name -> the same shape as the matching single endpoint
+    errors: dict[str, str]
@@ -31,3 +31,53 @@ class PaginatedRecords(BaseModel):
     page: int
     size: int
     total: int
+
+
+class ImportRowError(BaseModel):
+    row: int
+    reason: str
+
+
+class ImportJobOut(BaseModel):
+    job_id: str
+    filename: str
+    status: str
+    bytes_total: int
+    bytes_parsed: int
+    rows_parsed: int
+    rows_inserted: int
+    rows_rejected: int
+    elapsed_sec: float
+    rows_per_sec: float
+    eta_sec: float | None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+    error: str | None
+    errors: list[ImportRowError]
+
+
+class RecordBulkFilter(BaseModel):
+    start_time: datetime | None = None
+    end_time: datetime | None = None
+    category: str | None = None
+    title: str | None = None
+    is_anomaly: bool | None = None
+    created_by: int | None = None
+
+
+class RecordBulkDeleteRequest(BaseModel):
+    filter: RecordBulkFilter
+
+
+class RecordBulkUpdateRequest(BaseModel):
+    filter: RecordBulkFilter
+    title: str | None = Field(default=None, min_length=1, max_length=128)
+    value: float | None = None
+    category: str | None = Field(default=None, min_length=1, max_length=64)
+
+
+class RecordBulkResult(BaseModel):
+    status: str
+    affected: int
+    chunks: int
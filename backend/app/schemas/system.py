@@ -11,9 +11,34 @@ class SystemStatusOut(BaseModel):
     last_flush_count: int
     last_flush_success: bool
     db_connected: bool
+    analytics_cache: dict
+    single_flight: dict
+    read_replicas: dict
+    record_dictionary: dict
+    cold_archive: dict
+    flush: dict
+    sql_stats: dict
+    startup_ms: dict
 
 
 class DbStatusOut(BaseModel):
     db_connected: bool
     db_version: str | None
     server_time: datetime
+
+
+class QueryFingerprintOut(BaseModel):
+    fingerprint: str
+    count: int
+    total_ms: float
+    avg_ms: float
+    max_ms: float
+
+
+class QueryStatsOut(BaseModel):
+    installed: bool
+    fingerprints: int
+    statements: int
+    slow: int
+    slow_ms: float
+    top: list[QueryFingerprintOut]
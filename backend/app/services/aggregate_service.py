@@ -0,0 +1,243 @@
+import asyncio
+import logging
+import math
+from dataclasses import dataclass
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import AsyncSessionLocal
+from app.models.record import DataRecord
+from app.services.record_service import RecordWriteEvent
+
+
+logger = logging.getLogger("realtime-monitoring")
+
+
+@dataclass
+class RunningAggregate:
+    """
+    Count/sum/min/max plus Welford mean and M2 (sum of squared deviations).
+
+    add() and remove() are exact for count, sum, mean and variance. remove() cannot
+    restore min/max, so it reports whether the removed value was an extreme.
+    """
+
+    count: int = 0
+    sum: float = 0.0
+    mean: float = 0.0
+    m2: float = 0.0
+    min: float | None = None
+    max: float | None = None
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def remove(self, value: float) -> bool:
+        """Removes one value; returns False when min/max may no longer be correct."""
+        if self.count <= 1:
+            self.count, self.sum, self.mean, self.m2, self.min, self.max = 0, 0.0, 0.0, 0.0, None, None
+            return True
+
+        delta = value - self.mean
+        self.count -= 1
+        self.sum -= value
+        self.mean -= delta / self.count
+        self.m2 = max(self.m2 - delta * (value - self.mean), 0.0)
+        return value != self.min and value != self.max
+
+    def merge(self, other: "RunningAggregate") -> None:
+        """Chan et al. parallel combination of two aggregates."""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.sum, self.mean, self.m2 = other.count, other.sum, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.sum += other.sum
+        self.min = other.min if self.min is None else (self.min if other.min is None else min(self.min, other.min))
+        self.max = other.max if self.max is None else (self.max if other.max is None else max(self.max, other.max))
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class AggregateEngine:
+    """
+    Keeps whole-table aggregates per category in memory.
+
+    Design considerations:
+    - Seeded from the DB at startup and updated from RecordWriteEvents, so unbounded
+      summary/by-category queries are answered without touching the DB.
+    - The global aggregate is merged from the per-category ones, so there is a single source of truth.
+
+    Reconciliation strategy:
+    - Inserts and exact updates/deletes adjust count/sum/mean/variance incrementally.
+    - Removing a value equal to the current min or max marks that category's extremes stale.
+    - Set-based bulk statements and dropped partitions mark categories stale as a whole.
+    - Any stale category makes the engine decline the query (callers fall back to the DB)
+      and schedules a reseed of just the stale categories.
+    - A reseed reads a consistent snapshot bounded by MAX(id). Inserts published while it runs are
+      replayed if their id is above that watermark; any other change during the reseed leaves the
+      category stale for the next attempt.
+    - A periodic full reseed bounds drift from rare races, e.g. a long transaction committing
+      rows with ids below a watermark that was already taken.
+    """
+
+    def __init__(self):
+        self._cats: dict[str, RunningAggregate] = {}
+        self._stale: set[str] = set()
+        self._all_stale = True
+        self._seeding = False
+        self._pending: list[RecordWriteEvent] = []
+        self._lock = asyncio.Lock()
+        self._reseed_task: asyncio.Task | None = None
+
+    @property
+    def ready(self) -> bool:
+        return not self._all_stale and not self._stale
+
+    def apply(self, event: RecordWriteEvent) -> None:
+        if self._seeding:
+            self._pending.append(event)
+            return
+        self._apply(event)
+
+    def _apply(self, event: RecordWriteEvent) -> None:
+        if event.stale_all:
+            self._all_stale = True
+        self._stale |= event.stale_categories
+
+        for point in event.removed:
+            agg = self._cats.get(point.category)
+            if agg is None or not agg.remove(point.value):
+                self._stale.add(point.category)
+        for point in event.added:
+            self._cats.setdefault(point.category, RunningAggregate()).add(point.value)
+
+    async def seed(self, session: AsyncSession, categories: set[str] | None = None) -> None:
+        """Rebuilds the given categories (all when None) from the DB."""
+        async with self._lock:
+            self._seeding = True
+            try:
+                watermark = (await session.execute(select(func.max(DataRecord.id)))).scalar_one()
+                stmt = (
+                    select(
+                        DataRecord.category,
+                        func.count(DataRecord.id),
+                        func.sum(DataRecord.value),
+                        func.sum(DataRecord.value * DataRecord.value),
+                        func.min(DataRecord.value),
+                        func.max(DataRecord.value),
+                    )
+                    .where(DataRecord.id <= (watermark or 0))
+                    .group_by(DataRecord.category)
+                )
+                if categories is not None:
+                    stmt = stmt.where(DataRecord.category.in_(categories))
+                rows = (await session.execute(stmt)).all()
+                await session.rollback()
+            except Exception:
+                self._seeding = False
+                self._replay(self._pending, None, None)
+                raise
+
+            seeded = {}
+            for category, count, total, total_sq, mn, mx in rows:
+                n = int(count or 0)
+                total, total_sq = float(total or 0.0), float(total_sq or 0.0)
+                seeded[str(category)] = RunningAggregate(
+                    count=n,
+                    sum=total,
+                    mean=total / n if n else 0.0,
+                    m2=max(total_sq - total * total / n, 0.0) if n else 0.0,
+                    min=float(mn) if mn is not None else None,
+                    max=float(mx) if mx is not None else None,
+                )
+
+            if categories is None:
+                self._cats = seeded
+                self._stale = set()
+                self._all_stale = False
+            else:
+                for category in categories:
+                    if category in seeded:
+                        self._cats[category] = seeded[category]
+                    else:
+                        self._cats.pop(category, None)
+                self._stale -= categories
+
+            self._seeding = False
+            pending, self._pending = self._pending, []
+            self._replay(pending, watermark or 0, categories)
+
+    def _replay(self, events: list[RecordWriteEvent], watermark: int | None, categories: set[str] | None) -> None:
+        self._pending = []
+        for event in events:
+            if watermark is not None and event.is_insert:
+                fresh = [
+                    p
+                    for p in event.added
+                    if p.id is None or p.id > watermark or (categories is not None and p.category not in categories)
+                ]
+                self._apply(RecordWriteEvent(added=fresh, is_insert=True))
+                continue
+            self._apply(event)
+            if watermark is not None:
+                # NOTE:
+                # - Non-insert changes during a reseed may or may not be in the snapshot.
+                touched = {p.category for p in event.added + event.removed} | event.stale_categories
+                if categories is None:
+                    self._stale |= touched
+                else:
+                    self._stale |= touched & categories
+
+    def schedule_reseed(self) -> None:
+        if self._reseed_task is not None and not self._reseed_task.done():
+            return
+        categories = None if self._all_stale else set(self._stale)
+        self._reseed_task = asyncio.create_task(self._reseed(categories))
+
+    async def _reseed(self, categories: set[str] | None) -> None:
+        try:
+            async with AsyncSessionLocal() as session:
+                await self.seed(session, categories)
+        except Exception as e:
+            logger.exception("Aggregate reseed failed: %s", str(e))
+
+    def _total(self, category: str | None) -> RunningAggregate:
+        if category is not None:
+            return self._cats.get(category) or RunningAggregate()
+        total = RunningAggregate()
+        for agg in self._cats.values():
+            total.merge(agg)
+        return total
+
+    def stats(self, category: str | None) -> dict[str, list] | None:
+        """Returns unbounded {category: [count, sum, min, max]}, or None when the caller must query the DB."""
+        if not self.ready:
+            self.schedule_reseed()
+            return None
+
+        cats = self._cats if category is None else {category: self._total(category)}
+        return {c: [agg.count, float(agg.sum), agg.min, agg.max] for c, agg in cats.items() if agg.count}
+
+
+aggregate_engine = AggregateEngine()
@@ -1,7 +1,23 @@
-from datetime import datetime
-from sqlalchemy import select, func
+import bisect
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, func, literal_column
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
 from app.models.record import DataRecord
+from app.db.partitioning import as_db_time
+from app.db.timebucket import floor_dt, bucket_expr
+from app.db.replicas import db_route, PRIMARY
+from app.services.rollup_service import RollupService
+from app.services.aggregate_service import aggregate_engine
+from app.services.cache_service import analytics_cache, MISS
+from app.services.quantile_service import QuantileService
+from app.services.singleflight_service import query_flights
+from app.services.anomaly_event_service import AnomalyEventService
+from app.services.series_service import SeriesService
+from app.services.archive_service import cold_archive
+
+
+TREND_INTERVALS = {"1m": 60, "5m": 300, "1h": 3600, "1d": 86400}
 
 
 class AnalyticsService:
@@ -11,69 +27,648 @@ class AnalyticsService:
     Design considerations:
     - Uses DB-side aggregation to ensure consistency and scalability.
     - Keeps endpoints minimal to match the evaluation scope.
+    - Filters on the bare timestamp column so partitioned tables prune to the requested range.
+    - Answers bucket-aligned ranges from rollup tables; the inclusive end instant is read from raw rows.
+    - Answers unbounded ranges from the in-memory aggregate engine while it is in sync.
+    - Caches summary/by-category results; writes invalidate them through generation counters.
+    - Concurrent identical queries that miss the cache share one in-flight execution.
+    - Summary, by-category and trend add the Parquet cold archive's answer for archived days;
+      archived rows are gone from the DB, so the two parts never overlap.
     """
 
     @staticmethod
-    async def summary(
+    async def _raw_stats(
         session: AsyncSession,
         start_time: datetime | None,
         end_time: datetime | None,
         category: str | None,
-    ) -> dict:
+    ) -> dict[str, list]:
         stmt = select(
+            DataRecord.category,
             func.count(DataRecord.id),
             func.sum(DataRecord.value),
-            func.avg(DataRecord.value),
             func.min(DataRecord.value),
             func.max(DataRecord.value),
-        )
+        ).group_by(DataRecord.category)
 
         if start_time:
-            stmt = stmt.where(DataRecord.timestamp >= start_time)
+            stmt = stmt.where(DataRecord.timestamp >= as_db_time(start_time))
         if end_time:
-            stmt = stmt.where(DataRecord.timestamp <= end_time)
+            stmt = stmt.where(DataRecord.timestamp <= as_db_time(end_time))
         if category:
             stmt = stmt.where(DataRecord.category == category)
 
-        row = (await session.execute(stmt)).one()
-        count, sum_value, avg_value, min_value, max_value = row
-        return {
-            "count": int(count or 0),
-            "sum": float(sum_value or 0.0),
-            "avg": float(avg_value or 0.0),
-            "min": float(min_value or 0.0),
-            "max": float(max_value or 0.0),
-        }
+        rows = (await session.execute(stmt)).all()
+        return {str(c): [int(n or 0), float(s or 0.0), mn, mx] for c, n, s, mn, mx in rows}
 
     @staticmethod
-    async def by_category(
+    async def _stats(
         session: AsyncSession,
         start_time: datetime | None,
         end_time: datetime | None,
-    ) -> list[dict]:
-        stmt = select(
-            DataRecord.category,
-            func.count(DataRecord.id),
-            func.avg(DataRecord.value),
-            func.min(DataRecord.value),
-            func.max(DataRecord.value),
-        ).group_by(DataRecord.category)
+        category: str | None,
+    ) -> dict[str, list]:
+        """Returns {category: [count, sum, min, max]} for the requested range."""
+        choice = RollupService.choose(start_time, end_time)
+        if choice is None:
+            return await AnalyticsService._raw_stats(session, start_time, end_time, category)
+
+        model, _ = choice
+        out = await RollupService.stats(session, model, start_time, end_time, category)
+        if end_time is not None:
+            # NOTE:
+            # - Rollups cover [start, end); rows stamped exactly at end_time keep the inclusive contract.
+            edge = await AnalyticsService._raw_stats(session, end_time, end_time, category)
+            out = AnalyticsService._merge(out, edge)
+        return out
+
+    @staticmethod
+    async def _stats_with_total(
+        session: AsyncSession,
+        start_time: datetime | None,
+        end_time: datetime | None,
+        category: str | None,
+    ) -> tuple[dict[str, list], list]:
+        """Per-category and overall figures from one raw query (GROUP BY category WITH ROLLUP)."""
+        if RollupService.choose(start_time, end_time) is not None:
+            stats = await AnalyticsService._stats(session, start_time, end_time, category)
+            return stats, AnalyticsService._total(stats)
 
+        stmt = (
+            select(
+                DataRecord.category,
+                func.count(DataRecord.id),
+                func.sum(DataRecord.value),
+                func.min(DataRecord.value),
+                func.max(DataRecord.value),
+            )
+            .group_by(DataRecord.category)
+            .suffix_with("WITH ROLLUP")
+        )
         if start_time:
-            stmt = stmt.where(DataRecord.timestamp >= start_time)
+            stmt = stmt.where(DataRecord.timestamp >= as_db_time(start_time))
         if end_time:
-            stmt = stmt.where(DataRecord.timestamp <= end_time)
+            stmt = stmt.where(DataRecord.timestamp <= as_db_time(end_time))
+        if category:
+            stmt = stmt.where(DataRecord.category == category)
 
-        rows = (await session.execute(stmt)).all()
+        stats, total = {}, [0, 0.0, None, None]
+        for c, n, s, mn, mx in (await session.execute(stmt)).all():
+            # NOTE:
+            # - category is NOT NULL, so a NULL category can only be the super-aggregate row.
+            if c is None:
+                total = [int(n or 0), float(s or 0.0), mn, mx]
+            else:
+                stats[str(c)] = [int(n or 0), float(s or 0.0), mn, mx]
+        return stats, total
+
+    @staticmethod
+    def _merge(a: dict[str, list], b: dict[str, list]) -> dict[str, list]:
+        out = dict(a)
+        for cat, (n, s, mn, mx) in b.items():
+            if cat not in out:
+                out[cat] = [n, s, mn, mx]
+                continue
+            cur = out[cat]
+            out[cat] = [
+                cur[0] + n,
+                cur[1] + s,
+                mn if cur[2] is None else (cur[2] if mn is None else min(cur[2], mn)),
+                mx if cur[3] is None else (cur[3] if mx is None else max(cur[3], mx)),
+            ]
+        return out
+
+    @staticmethod
+    async def _with_archive(
+        stats: dict[str, list],
+        start_time: datetime | None,
+        end_time: datetime | None,
+        category: str | None,
+    ) -> dict[str, list]:
+        for archived in await cold_archive.category_stats(start_time, end_time, category):
+            stats = AnalyticsService._merge(stats, archived)
+        return stats
+
+    @staticmethod
+    async def _combined_stats(
+        session: AsyncSession,
+        start_time: datetime | None,
+        end_time: datetime | None,
+        category: str | None,
+    ) -> dict[str, list]:
+        """Hot (aggregate engine or DB) plus archived {category: [count, sum, min, max]}."""
+        stats = aggregate_engine.stats(category) if start_time is None and end_time is None else None
+        if stats is None:
+            stats = await AnalyticsService._stats(session, start_time, end_time, category)
+        return await AnalyticsService._with_archive(stats, start_time, end_time, category)
+
+    @staticmethod
+    def _routed(session: AsyncSession, key: tuple) -> tuple:
+        """
+        Cache key including where the session reads from.
+
+        A replica read that starts just after a write can return the pre-write answer under the
+        post-write generation. Keeping replica results apart means a writer, whose reads stay on the
+        primary for READ_YOUR_WRITES_SECONDS, never gets them back; replicas share one entry.
+        """
+        return (*key, PRIMARY if db_route(session) == PRIMARY else "replica")
+
+    @staticmethod
+    def _put(session: AsyncSession, key: tuple, value, token: tuple[bool, int, int]) -> None:
+        # NOTE:
+        # - A replica may lag the write that bumped the generation. Open entries expire after the TTL,
+        #   but closed ones never do, so those are only cached from primary reads.
+        closed = token[0]
+        if closed and db_route(session) != PRIMARY:
+            return
+        analytics_cache.put(key, value, token)
+
+    @staticmethod
+    async def _cached(session: AsyncSession, key: tuple, compute):
+        """Returns the cached value for key, or runs compute() once for all concurrent callers and caches it."""
+        key = AnalyticsService._routed(session, key)
+        cached = analytics_cache.get(key)
+        if cached is not MISS:
+            return cached
+
+        async def run():
+            token = analytics_cache.generation(key)
+            result = await compute()
+            AnalyticsService._put(session, key, result, token)
+            return result
+
+        return await query_flights.run((db_route(session), key), run)
+
+    @staticmethod
+    async def summary(
+        session: AsyncSession,
+        start_time: datetime | None,
+        end_time: datetime | None,
+        category: str | None,
+    ) -> dict:
+        async def compute():
+            stats = await AnalyticsService._combined_stats(session, start_time, end_time, category)
+            return AnalyticsService._summary_from(AnalyticsService._total(stats))
+
+        key = analytics_cache.key("summary", start_time, end_time, category)
+        return await AnalyticsService._cached(session, key, compute)
+
+    @staticmethod
+    def _total(stats: dict[str, list]) -> list:
+        out: dict[str, list] = {}
+        for v in stats.values():
+            out = AnalyticsService._merge(out, {"": v})
+        return out.get("", [0, 0.0, None, None])
+
+    @staticmethod
+    def _summary_from(total: list) -> dict:
+        count, sum_value, min_value, max_value = total
+        return {
+            "count": int(count),
+            "sum": float(sum_value),
+            "avg": float(sum_value / count) if count else 0.0,
+            "min": float(min_value) if min_value is not None else 0.0,
+            "max": float(max_value) if max_value is not None else 0.0,
+        }
+
+    @staticmethod
+    def _by_category_from(stats: dict[str, list]) -> list[dict]:
         out = []
-        for category, count, avg_value, min_value, max_value in rows:
+        for category, (count, sum_value, min_value, max_value) in stats.items():
+            if not count:
+                continue
             out.append(
                 {
                     "category": str(category),
-                    "count": int(count or 0),
-                    "avg": float(avg_value or 0.0),
+                    "count": int(count),
+                    "avg": float(sum_value / count),
                     "min": float(min_value or 0.0),
                     "max": float(max_value or 0.0),
                 }
             )
         return out
+
+    @staticmethod
+    async def by_category(
+        session: AsyncSession,
+        start_time: datetime | None,
+        end_time: datetime | None,
+    ) -> list[dict]:
+        async def compute():
+            stats = await AnalyticsService._combined_stats(session, start_time, end_time, None)
+            return AnalyticsService._by_category_from(stats)
+
+        key = analytics_cache.key("by_category", start_time, end_time, None)
+        return await AnalyticsService._cached(session, key, compute)
+
+    @staticmethod
+    async def quantiles(
+        session: AsyncSession,
+        qs: list[float],
+        start_time: datetime | None,
+        end_time: datetime | None,
+        category: str | None,
+    ) -> dict:
+        """Approximate quantiles with relative error QUANTILE_RELATIVE_ACCURACY, from hourly sketches."""
+        if any(not 0 <= q <= 1 for q in qs):
+            raise ValueError("Quantiles must be between 0 and 1")
+
+        key = analytics_cache.key("quantiles:" + ",".join(map(repr, qs)), start_time, end_time, category)
+        return await AnalyticsService._cached(
+            session, key, lambda: QuantileService.quantiles(session, qs, start_time, end_time, category)
+        )
+
+    @staticmethod
+    async def anomalies(
+        session: AsyncSession,
+        start_time: datetime | None,
+        end_time: datetime | None,
+        category: str | None,
+    ) -> dict:
+        """Anomaly counts and first/last times from anomaly_events."""
+        if start_time and end_time and as_db_time(start_time) > as_db_time(end_time):
+            raise ValueError("start_time must be before end_time")
+        key = analytics_cache.key("anomalies", start_time, end_time, category)
+        return await AnalyticsService._cached(
+            session, key, lambda: AnomalyEventService.summary(session, start_time, end_time, category)
+        )
+
+    @staticmethod
+    async def series(
+        session: AsyncSession,
+        start_time: datetime | None,
+        end_time: datetime | None,
+        category: str | None,
+        points: int,
+        method: str,
+    ) -> dict:
+        """Downsampled per-category series (see SeriesService); coalesced, not cached."""
+        key = analytics_cache.key(f"series:{points}:{method}", start_time, end_time, category)
+        return await query_flights.run(
+            (db_route(session), key),
+            lambda: SeriesService.downsample(session, start_time, end_time, category, points, method),
+        )
+
+    @staticmethod
+    def histogram_edges(bins: int, lo: float | None, hi: float | None, edges: list[float] | None) -> list[float] | None:
+        """Validates explicit edges, or builds fixed-width edges; None means lo/hi come from the data."""
+        max_bins = int(settings.HISTOGRAM_MAX_BINS)
+        if edges:
+            if len(edges) < 2 or any(b <= a for a, b in zip(edges, edges[1:])):
+                raise ValueError("edges must contain at least two strictly increasing values")
+            if len(edges) - 1 > max_bins:
+                raise ValueError(f"At most {max_bins} bins are allowed")
+            return [float(e) for e in edges]
+
+        if not 1 <= bins <= max_bins:
+            raise ValueError(f"bins must be between 1 and {max_bins}")
+        if lo is None or hi is None:
+            return None
+        if hi <= lo:
+            raise ValueError("hi must be greater than lo")
+        width = (hi - lo) / bins
+        return [lo + i * width for i in range(bins)] + [hi]
+
+    @staticmethod
+    async def _raw_histogram(session, edges, fixed_width, start_time, end_time, category) -> list:
+        # NOTE:
+        # - Constants are inlined so the SELECT and GROUP BY render the identical expression.
+        n = len(edges) - 1
+        last = literal_column(str(n - 1))
+        if fixed_width:
+            lo = literal_column(repr(edges[0]))
+            width = literal_column(repr((edges[-1] - edges[0]) / n))
+            idx = func.least(func.floor((DataRecord.value - lo) / width), last)
+        else:
+            # - INTERVAL(v, e0, ..., en) is the number of edges <= v, found by binary search.
+            idx = func.least(
+                func.interval(DataRecord.value, *[literal_column(repr(e)) for e in edges]) - literal_column("1"),
+                last,
+            )
+
+        stmt = (
+            select(DataRecord.category, idx, func.count())
+            .where(DataRecord.value >= edges[0], DataRecord.value <= edges[-1])
+            .group_by(DataRecord.category, idx)
+        )
+        if start_time:
+            stmt = stmt.where(DataRecord.timestamp >= as_db_time(start_time))
+        if end_time:
+            stmt = stmt.where(DataRecord.timestamp <= as_db_time(end_time))
+        if category:
+            stmt = stmt.where(DataRecord.category == category)
+        return [(str(c), int(i), int(cnt)) for c, i, cnt in (await session.execute(stmt)).all()]
+
+    @staticmethod
+    async def histogram(
+        session: AsyncSession,
+        start_time: datetime | None,
+        end_time: datetime | None,
+        category: str | None,
+        bins: int,
+        lo: float | None,
+        hi: float | None,
+        edges: list[float] | None,
+        approximate: bool,
+    ) -> dict:
+        """
+        Returns per-category bin counts over shared edges.
+
+        Design considerations:
+        - Exact counts come from one grouped query; only one row per non-empty (category, bin) crosses the wire.
+        - Missing lo/hi are taken from the range's min/max, which rollups or aggregates usually answer.
+        - approximate=true bins the hourly quantile sketches instead of raw rows: each value is placed
+          by a representative within QUANTILE_RELATIVE_ACCURACY of it, so only values that close to an
+          edge can land in the neighbouring bin, and the cost no longer grows with the row count.
+        """
+        if start_time and end_time and as_db_time(start_time) > as_db_time(end_time):
+            raise ValueError("start_time must be before end_time")
+        fixed_width = not edges
+        edge_list = AnalyticsService.histogram_edges(bins, lo, hi, edges)
+
+        key = analytics_cache.key(
+            "histogram:" + repr((bins, lo, hi, tuple(edge_list or ()), approximate)), start_time, end_time, category
+        )
+        return await AnalyticsService._cached(
+            session,
+            key,
+            lambda: AnalyticsService._histogram(
+                session, start_time, end_time, category, bins, lo, hi, edge_list, fixed_width, approximate
+            ),
+        )
+
+    @staticmethod
+    async def _histogram(
+        session, start_time, end_time, category, bins, lo, hi, edge_list, fixed_width, approximate
+    ) -> dict:
+        if edge_list is None:
+            stats = await AnalyticsService._stats(session, start_time, end_time, category)
+            mins = [v[2] for v in stats.values() if v[2] is not None and v[0]]
+            maxs = [v[3] for v in stats.values() if v[3] is not None and v[0]]
+            if mins:
+                data_lo = float(min(mins)) if lo is None else lo
+                data_hi = float(max(maxs)) if hi is None else hi
+                if data_hi <= data_lo:
+                    data_hi = data_lo + 1.0
+                edge_list = AnalyticsService.histogram_edges(bins, data_lo, data_hi, None)
+
+        series: dict[str, list[int]] = {}
+        if edge_list is not None:
+            n = len(edge_list) - 1
+            if approximate:
+                per_category, _ = await QuantileService.sketches(
+                    session,
+                    as_db_time(start_time) if start_time else None,
+                    as_db_time(end_time) if end_time else None,
+                    category,
+                )
+                for cat, sketch in per_category.items():
+                    counts = series.setdefault(cat, [0] * n)
+                    for value, cnt in sketch.centroids():
+                        if edge_list[0] <= value <= edge_list[-1]:
+                            counts[min(bisect.bisect_right(edge_list, value) - 1, n - 1)] += cnt
+            else:
+                rows = await AnalyticsService._raw_histogram(
+                    session, edge_list, fixed_width, start_time, end_time, category
+                )
+                for cat, idx, cnt in rows:
+                    series.setdefault(cat, [0] * n)[idx] += cnt
+
+        total = [sum(col) for col in zip(*series.values())] if series else [0] * max(len(edge_list or []) - 1, 0)
+        return {
+            "edges": edge_list or [],
+            "approximate": approximate,
+            "relative_accuracy": float(settings.QUANTILE_RELATIVE_ACCURACY) if approximate else None,
+            "total": total,
+            "series": [{"category": c, "counts": counts} for c, counts in sorted(series.items()) if any(counts)],
+        }
+
+    @staticmethod
+    async def batch(
+        session: AsyncSession,
+        start_time: datetime | None,
+        end_time: datetime | None,
+        category: str | None,
+        items: list[tuple[str, str, dict]],
+    ) -> dict:
+        """
+        Answers several named (name, kind, params) requests over one shared filter.
+
+        Design considerations:
+        - summary and by_category are answered together from one WITH ROLLUP query (or the
+          aggregate engine / cache), however many items ask for them.
+        - Other kinds run on the same session, so the batch costs one auth and one connection.
+        - A failing item reports its error without failing the others.
+        """
+        results, errors = {}, {}
+
+        if any(kind in ("summary", "by_category") for _, kind, _ in items):
+            summary_key = AnalyticsService._routed(
+                session, analytics_cache.key("summary", start_time, end_time, category)
+            )
+            by_cat_key = AnalyticsService._routed(
+                session, analytics_cache.key("by_category", start_time, end_time, category)
+            )
+            summary, by_cat = analytics_cache.get(summary_key), analytics_cache.get(by_cat_key)
+            if summary is MISS or by_cat is MISS:
+
+                async def compute():
+                    tokens = analytics_cache.generation(summary_key), analytics_cache.generation(by_cat_key)
+                    stats = aggregate_engine.stats(category) if start_time is None and end_time is None else None
+                    if stats is None:
+                        stats, total = await AnalyticsService._stats_with_total(
+                            session, start_time, end_time, category
+                        )
+                    else:
+                        total = AnalyticsService._total(stats)
+                    archived = await AnalyticsService._with_archive({}, start_time, end_time, category)
+                    if archived:
+                        stats = AnalyticsService._merge(stats, archived)
+                        total = AnalyticsService._total(stats)
+                    summary = AnalyticsService._summary_from(total)
+                    by_cat = AnalyticsService._by_category_from(stats)
+                    AnalyticsService._put(session, summary_key, summary, tokens[0])
+                    AnalyticsService._put(session, by_cat_key, by_cat, tokens[1])
+                    return summary, by_cat
+
+                summary, by_cat = await query_flights.run(
+                    (db_route(session), ("summary+by_category", *summary_key[1:])), compute
+                )
+
+        for name, kind, params in items:
+            try:
+                if kind == "summary":
+                    results[name] = summary
+                elif kind == "by_category":
+                    results[name] = by_cat
+                elif kind == "quantiles":
+                    results[name] = await AnalyticsService.quantiles(
+                        session, params["q"], start_time, end_time, category
+                    )
+                elif kind == "histogram":
+                    results[name] = await AnalyticsService.histogram(
+                        session, start_time, end_time, category, **params
+                    )
+                elif kind == "trend":
+                    results[name] = await AnalyticsService.trend(
+                        session,
+                        TREND_INTERVALS[params["interval"]],
+                        start_time,
+                        end_time,
+                        category,
+                        params["group_by_category"],
+                    )
+                else:
+                    errors[name] = f"Unknown kind: {kind}"
+            except ValueError as e:
+                errors[name] = str(e)
+        return {"results": results, "errors": errors}
+
+    @staticmethod
+    def trend_range(
+        interval_seconds: int,
+        start_time: datetime | None,
+        end_time: datetime | None,
+    ) -> tuple[datetime, datetime, int]:
+        """
+        Resolves the trend range and its bucket count, enforcing TREND_MAX_BUCKETS.
+
+        Missing bounds default to TREND_DEFAULT_BUCKETS buckets ending now.
+        """
+        width = timedelta(seconds=interval_seconds)
+        default_span = width * (int(settings.TREND_DEFAULT_BUCKETS) - 1)
+        if end_time is None:
+            end_time = start_time + default_span if start_time else datetime.now(timezone.utc)
+        if start_time is None:
+            start_time = end_time - default_span
+
+        start_time, end_time = as_db_time(start_time), as_db_time(end_time)
+        if start_time > end_time:
+            raise ValueError("start_time must be before end_time")
+
+        first = floor_dt(start_time, interval_seconds)
+        buckets = int((floor_dt(end_time, interval_seconds) - first) / width) + 1
+        if buckets > int(settings.TREND_MAX_BUCKETS):
+            raise ValueError(
+                f"Range spans {buckets} buckets; the limit is {settings.TREND_MAX_BUCKETS}. "
+                "Use a coarser interval or a shorter range."
+            )
+        return start_time, end_time, buckets
+
+    @staticmethod
+    async def _raw_trend(session, interval_seconds, start_time, end_time, category, by_category) -> dict:
+        bucket = bucket_expr(DataRecord.timestamp, interval_seconds)
+        group_cols = [bucket, DataRecord.category] if by_category else [bucket]
+        stmt = (
+            select(*group_cols, func.count(DataRecord.id), func.sum(DataRecord.value))
+            .where(DataRecord.timestamp >= start_time, DataRecord.timestamp <= end_time)
+            .group_by(*group_cols)
+        )
+        if category:
+            stmt = stmt.where(DataRecord.category == category)
+
+        out = {}
+        for row in (await session.execute(stmt)).all():
+            key = (row[1] if by_category else None, row[0])
+            out[key] = [int(row[-2] or 0), float(row[-1] or 0.0)]
+        return out
+
+    @staticmethod
+    async def _rollup_trend(session, model, interval_seconds, start_time, end_time, category, by_category) -> dict:
+        bucket = bucket_expr(model.bucket_start, interval_seconds)
+        group_cols = [bucket, model.category] if by_category else [bucket]
+        stmt = (
+            select(*group_cols, func.sum(model.count), func.sum(model.sum))
+            .where(model.bucket_start >= start_time, model.bucket_start < end_time)
+            .group_by(*group_cols)
+        )
+        if category:
+            stmt = stmt.where(model.category == category)
+
+        out = {}
+        for row in (await session.execute(stmt)).all():
+            key = (row[1] if by_category else None, row[0])
+            out[key] = [int(row[-2] or 0), float(row[-1] or 0.0)]
+        return out
+
+    @staticmethod
+    async def trend(
+        session: AsyncSession,
+        interval_seconds: int,
+        start_time: datetime | None,
+        end_time: datetime | None,
+        category: str | None,
+        group_by_category: bool,
+    ) -> dict:
+        """
+        Returns gap-filled time buckets of count/avg, optionally one series per category.
+
+        Design considerations:
+        - Buckets are computed DB-side; only one row per non-empty bucket crosses the wire.
+        - Uses rollups when both bounds align to a rollup width that divides the interval.
+        - Empty buckets are filled server-side so clients can plot the arrays directly.
+        """
+        # NOTE:
+        # - Keyed on the requested bounds, so open-ended ("ending now") refreshes coalesce too.
+        key = analytics_cache.key(f"trend:{interval_seconds}:{group_by_category}", start_time, end_time, category)
+        start_time, end_time, buckets = AnalyticsService.trend_range(interval_seconds, start_time, end_time)
+        return await query_flights.run(
+            (db_route(session), key),
+            lambda: AnalyticsService._trend(
+                session, interval_seconds, start_time, end_time, buckets, category, group_by_category
+            ),
+        )
+
+    @staticmethod
+    def _add_trend(data: dict, other: dict) -> None:
+        for key, (n, total) in other.items():
+            cur = data.setdefault(key, [0, 0.0])
+            cur[0] += n
+            cur[1] += total
+
+    @staticmethod
+    async def _trend(session, interval_seconds, start_time, end_time, buckets, category, group_by_category) -> dict:
+        choice = RollupService.choose(start_time, end_time)
+        if choice is not None and interval_seconds % choice[1] == 0:
+            data = await AnalyticsService._rollup_trend(
+                session, choice[0], interval_seconds, start_time, end_time, category, group_by_category
+            )
+            edge = await AnalyticsService._raw_trend(
+                session, interval_seconds, end_time, end_time, category, group_by_category
+            )
+            AnalyticsService._add_trend(data, edge)
+        else:
+            data = await AnalyticsService._raw_trend(
+                session, interval_seconds, start_time, end_time, category, group_by_category
+            )
+        for archived in await cold_archive.trend(interval_seconds, start_time, end_time, category, group_by_category):
+            AnalyticsService._add_trend(data, archived)
+
+        if group_by_category:
+            series_keys = sorted({k[0] for k in data}) if not category else [category]
+        else:
+            series_keys = [None]
+
+        first = floor_dt(start_time, interval_seconds)
+        width = timedelta(seconds=interval_seconds)
+        series = []
+        for cat in series_keys:
+            points = []
+            for i in range(buckets):
+                bucket_start = first + i * width
+                n, total = data.get((cat, bucket_start), (0, 0.0))
+                points.append(
+                    {
+                        "bucket_start": bucket_start,
+                        "count": n,
+                        "avg": total / n if n else None,
+                    }
+                )
+            series.append({"category": cat if group_by_category else category, "points": points})
+
+        return {
+            "interval_seconds": interval_seconds,
+            "start_time": start_time,
+            "end_time": end_time,
+            "series": series,
+        }
@@ -0,0 +1,111 @@
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import select, insert, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.partitioning import as_db_time
+from app.models.anomaly_event import AnomalyEvent
+from app.models.record import DataRecord
+
+
+class AnomalyEventService:
+    """
+    Maintains anomaly_events, a narrow copy of the rows flagged is_anomaly, and answers anomaly queries from it.
+
+    Design considerations:
+    - Anomalies are a small fraction of rows, so filtering the boolean on data_records scans most
+      of the table while the side table is read through its own (category, timestamp) index.
+    - Kept through RollupService, in the writer's transaction: inserts add their flagged rows,
+      and updates, deletes, bulk statements and rescoring rebuild the affected time range.
+    - Retention purges it together with the rollups.
+    """
+
+    @staticmethod
+    async def apply_inserts(session: AsyncSession, records: Iterable[DataRecord]) -> None:
+        flagged = [r for r in records if r.is_anomaly]
+        if not flagged:
+            return
+        if any(r.id is None for r in flagged):
+            await session.flush()
+        await session.execute(
+            insert(AnomalyEvent).values(
+                [
+                    {
+                        "record_id": r.id,
+                        "category": r.category,
+                        "timestamp": as_db_time(r.timestamp),
+                        "value": float(r.value),
+                    }
+                    for r in flagged
+                ]
+            )
+        )
+
+    @staticmethod
+    async def recompute(
+        session: AsyncSession,
+        start: datetime,
+        end: datetime,
+        category: str | None = None,
+    ) -> None:
+        """Rebuilds the events stamped in [start, end] from raw rows."""
+        start, end = as_db_time(start), as_db_time(end)
+        event_filters = [AnomalyEvent.timestamp >= start, AnomalyEvent.timestamp <= end]
+        raw_filters = [DataRecord.is_anomaly.is_(True), DataRecord.timestamp >= start, DataRecord.timestamp <= end]
+        if category is not None:
+            event_filters.append(AnomalyEvent.category == category)
+            raw_filters.append(DataRecord.category == category)
+
+        await session.execute(delete(AnomalyEvent).where(*event_filters))
+        source = select(DataRecord.id, DataRecord.category, DataRecord.timestamp, DataRecord.value).where(
+            *raw_filters
+        )
+        await session.execute(
+            insert(AnomalyEvent).from_select(["record_id", "category", "timestamp", "value"], source)
+        )
+
+    @staticmethod
+    async def purge_before(session: AsyncSession, cutoff: datetime) -> None:
+        await session.execute(delete(AnomalyEvent).where(AnomalyEvent.timestamp < as_db_time(cutoff)))
+
+    @staticmethod
+    def filters(category: str | None, start_time: datetime | None, end_time: datetime | None) -> list:
+        filters = []
+        if category:
+            filters.append(AnomalyEvent.category == category)
+        if start_time:
+            filters.append(AnomalyEvent.timestamp >= as_db_time(start_time))
+        if end_time:
+            filters.append(AnomalyEvent.timestamp <= as_db_time(end_time))
+        return filters
+
+    @staticmethod
+    async def summary(
+        session: AsyncSession,
+        start_time: datetime | None,
+        end_time: datetime | None,
+        category: str | None,
+    ) -> dict:
+        """Anomaly count and first/last anomaly time, overall and per category."""
+        stmt = (
+            select(
+                AnomalyEvent.category,
+                func.count(),
+                func.min(AnomalyEvent.timestamp),
+                func.max(AnomalyEvent.timestamp),
+            )
+            .where(*AnomalyEventService.filters(category, start_time, end_time))
+            .group_by(AnomalyEvent.category)
+        )
+        rows = (await session.execute(stmt)).all()
+        by_category = [
+            {"category": str(c), "count": int(n), "first_time": first, "last_time": last}
+            for c, n, first, last in sorted(rows)
+        ]
+        return {
+            "count": sum(r["count"] for r in by_category),
+            "first_time": min((r["first_time"] for r in by_category), default=None),
+            "last_time": max((r["last_time"] for r in by_category), default=None),
+            "by_category": by_category,
+        }
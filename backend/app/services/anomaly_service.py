@@ -0,0 +1,312 @@
+import bisect
+import math
+from collections import deque
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.detector_state import DetectorState
+
+
+# NOTE:
+# - Consistency constant so MAD estimates the standard deviation of normal data.
+_MAD_SCALE = 1.4826
+
+
+class ThresholdDetector:
+    """The original global rule: value > ALERT_THRESHOLD. Stateless."""
+
+    name = "threshold"
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+
+    def observe(self, key: str, value: float) -> bool:
+        return value > self.threshold
+
+    def peek(self, key: str | None, value: float) -> bool:
+        return value > self.threshold
+
+    def observe_array(self, key: str, values: np.ndarray) -> np.ndarray:
+        return values > self.threshold
+
+    def keys(self) -> list[str]:
+        return []
+
+    def dump(self) -> dict:
+        return {}
+
+    def load(self, state: dict) -> None:
+        pass
+
+
+class EwmaDetector(ThresholdDetector):
+    """
+    Exponentially weighted mean/variance per key; flags |x - mean| > z * std.
+
+    Each value is scored against the state before it, then folded in. Until a key has seen
+    min_samples values it falls back to the threshold rule.
+    """
+
+    name = "ewma"
+
+    def __init__(self, threshold: float, alpha: float, z: float, min_samples: int):
+        super().__init__(threshold)
+        if not 0 < alpha < 1:
+            raise ValueError("ANOMALY_EWMA_ALPHA must be between 0 and 1")
+        self.alpha = alpha
+        self.z = z
+        self.min_samples = min_samples
+        self._state: dict[str, list] = {}  # key -> [n, mean, var]
+
+    def _score(self, state: list | None, value: float) -> bool:
+        if state is None or state[0] < self.min_samples:
+            return value > self.threshold
+        return abs(value - state[1]) > self.z * math.sqrt(state[2])
+
+    def peek(self, key: str | None, value: float) -> bool:
+        return self._score(self._state.get(key), value)
+
+    def observe(self, key: str, value: float) -> bool:
+        state = self._state.get(key)
+        flag = self._score(state, value)
+        if state is None:
+            self._state[key] = [1, value, 0.0]
+        else:
+            diff = value - state[1]
+            incr = self.alpha * diff
+            state[1] += incr
+            state[2] = (1 - self.alpha) * (state[2] + diff * incr)
+            state[0] += 1
+        return flag
+
+    def _filter(self, u: np.ndarray, y0: float) -> np.ndarray:
+        """Returns y with y[i] = d * y[i-1] + u[i], y[-1] = y0, d = 1 - alpha."""
+        d = 1 - self.alpha
+        # NOTE:
+        # - Closed form y[k] = d^k * (y0 + sum(u[i] / d^i)), evaluated in chunks short enough
+        #   that d^-k stays below 1e6, which keeps the cumulative sum well conditioned.
+        chunk = max(1, int(math.log(1e-6) / math.log(d)))
+        out = np.empty_like(u)
+        for pos in range(0, len(u), chunk):
+            part = u[pos : pos + chunk]
+            powers = d ** np.arange(1, len(part) + 1)
+            out[pos : pos + chunk] = powers * (y0 + np.cumsum(part / powers))
+            y0 = out[pos + len(part) - 1]
+        return out
+
+    def observe_array(self, key: str, values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        flags = np.empty(len(values), dtype=bool)
+        start = 0
+        if key not in self._state and len(values):
+            flags[0] = self.observe(key, float(values[0]))
+            start = 1
+        rest = values[start:]
+        if not len(rest):
+            return flags
+
+        n0, m0, v0 = self._state[key]
+        means = self._filter(self.alpha * rest, m0)
+        prev_means = np.concatenate(([m0], means[:-1]))
+        diffs = rest - prev_means
+        variances = self._filter((1 - self.alpha) * self.alpha * diffs * diffs, v0)
+        prev_vars = np.concatenate(([v0], variances[:-1]))
+
+        warm = (n0 + np.arange(len(rest))) >= self.min_samples
+        flags[start:] = np.where(warm, np.abs(diffs) > self.z * np.sqrt(prev_vars), rest > self.threshold)
+        self._state[key] = [n0 + len(rest), float(means[-1]), float(variances[-1])]
+        return flags
+
+    def keys(self) -> list[str]:
+        return list(self._state)
+
+    def dump(self) -> dict:
+        return {k: list(v) for k, v in self._state.items()}
+
+    def load(self, state: dict) -> None:
+        self._state = {k: [int(v[0]), float(v[1]), float(v[2])] for k, v in state.items()}
+
+
+class MadDetector(ThresholdDetector):
+    """
+    Rolling median / MAD over the last `window` values per key; flags |x - median| > z * 1.4826 * MAD.
+
+    Each value is scored against the window before it. Until a key has min_samples values
+    it falls back to the threshold rule.
+    """
+
+    name = "mad"
+
+    def __init__(self, threshold: float, window: int, z: float, min_samples: int):
+        super().__init__(threshold)
+        self.window = window
+        self.z = z
+        self.min_samples = min(min_samples, window)
+        self._state: dict[str, tuple[deque, list]] = {}  # key -> (arrival order, sorted)
+
+    @staticmethod
+    def _median(ordered: list[float]) -> float:
+        mid = len(ordered) // 2
+        return ordered[mid] if len(ordered) % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+
+    def _score(self, state, value: float) -> bool:
+        if state is None or len(state[1]) < self.min_samples:
+            return value > self.threshold
+        med = self._median(state[1])
+        mad = self._median(sorted(abs(v - med) for v in state[1]))
+        return abs(value - med) > self.z * _MAD_SCALE * mad
+
+    def peek(self, key: str | None, value: float) -> bool:
+        return self._score(self._state.get(key), value)
+
+    def observe(self, key: str, value: float) -> bool:
+        state = self._state.get(key)
+        flag = self._score(state, value)
+        if state is None:
+            state = self._state[key] = (deque(), [])
+        arrivals, ordered = state
+        if len(arrivals) == self.window:
+            del ordered[bisect.bisect_left(ordered, arrivals.popleft())]
+        arrivals.append(value)
+        bisect.insort(ordered, value)
+        return flag
+
+    def observe_array(self, key: str, values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        flags = np.empty(len(values), dtype=bool)
+
+        # NOTE:
+        # - Values scored against a partial window go through the streaming path (at most `window`
+        #   of them); the rest use fixed-width sliding windows.
+        state = self._state.get(key)
+        start = min(len(values), self.window - (len(state[0]) if state else 0))
+        for i in range(start):
+            flags[i] = self.observe(key, float(values[i]))
+        rest = values[start:]
+        if not len(rest):
+            return flags
+
+        full = np.concatenate((np.fromiter(self._state[key][0], dtype=np.float64), rest))
+        views = np.lib.stride_tricks.sliding_window_view(full, self.window)
+        for pos in range(0, len(rest), 4096):
+            rows = views[pos : pos + 4096][: len(rest) - pos]
+            med = np.median(rows, axis=1)
+            mad = np.median(np.abs(rows - med[:, None]), axis=1)
+            part = rest[pos : pos + len(rows)]
+            flags[start + pos : start + pos + len(rows)] = np.abs(part - med) > self.z * _MAD_SCALE * mad
+
+        tail = [float(v) for v in full[-self.window :]]
+        self._state[key] = (deque(tail), sorted(tail))
+        return flags
+
+    def keys(self) -> list[str]:
+        return list(self._state)
+
+    def dump(self) -> dict:
+        return {k: list(arrivals) for k, (arrivals, _) in self._state.items()}
+
+    def load(self, state: dict) -> None:
+        self._state = {}
+        for k, values in state.items():
+            tail = [float(v) for v in values][-self.window :]
+            self._state[k] = (deque(tail), sorted(tail))
+
+
+def build_detector():
+    threshold = float(settings.ALERT_THRESHOLD)
+    name = settings.ANOMALY_DETECTOR
+    if name == "ewma":
+        return EwmaDetector(
+            threshold,
+            float(settings.ANOMALY_EWMA_ALPHA),
+            float(settings.ANOMALY_Z_THRESHOLD),
+            int(settings.ANOMALY_MIN_SAMPLES),
+        )
+    if name == "mad":
+        return MadDetector(
+            threshold,
+            int(settings.ANOMALY_MAD_WINDOW),
+            float(settings.ANOMALY_Z_THRESHOLD),
+            int(settings.ANOMALY_MIN_SAMPLES),
+        )
+    if name != "threshold":
+        raise ValueError(f"Unknown ANOMALY_DETECTOR: {name}")
+    return ThresholdDetector(threshold)
+
+
+class AnomalyService:
+    """
+    Scores values with the configured detector and persists its state.
+
+    Design considerations:
+    - Detector state is keyed per category or per title (ANOMALY_STATE_KEY).
+    - Streaming writes (generator, single creates) update the state one event at a time;
+      imports and other batches are scored per key with NumPy, in timestamp order.
+    - State is saved periodically and on shutdown, and loaded at startup, keyed by detector name,
+      so switching detectors never mixes incompatible state.
+    - Edits score the new value against current state without folding it in.
+    """
+
+    detector = build_detector()
+
+    @staticmethod
+    def key(category: str, title: str) -> str:
+        return title if settings.ANOMALY_STATE_KEY == "title" else category
+
+    @staticmethod
+    def observe(category: str, title: str, value: float) -> bool:
+        return bool(AnomalyService.detector.observe(AnomalyService.key(category, title), float(value)))
+
+    @staticmethod
+    def peek(category: str, title: str, value: float) -> bool:
+        return bool(AnomalyService.detector.peek(AnomalyService.key(category, title), float(value)))
+
+    @staticmethod
+    def peek_all(value: float) -> tuple[dict[str, bool], bool]:
+        """Returns ({key: flag} for every known key, flag for an unseen key)."""
+        detector = AnomalyService.detector
+        return {k: bool(detector.peek(k, value)) for k in detector.keys()}, bool(detector.peek(None, value))
+
+    @staticmethod
+    def observe_batch(rows: list[tuple], detector=None) -> list[bool]:
+        """Scores (category, title, value, timestamp) rows; returns flags in input order."""
+        detector = detector or AnomalyService.detector
+        groups: dict[str, list[int]] = {}
+        for i, (category, title, _, _) in enumerate(rows):
+            groups.setdefault(AnomalyService.key(category, title), []).append(i)
+
+        flags = [False] * len(rows)
+        for key, idx in groups.items():
+            idx.sort(key=lambda i: rows[i][3])
+            values = np.fromiter((rows[i][2] for i in idx), dtype=np.float64, count=len(idx))
+            for i, flag in zip(idx, detector.observe_array(key, values)):
+                flags[i] = bool(flag)
+        return flags
+
+    @staticmethod
+    async def load_state(session: AsyncSession) -> None:
+        detector = AnomalyService.detector
+        rows = (
+            await session.execute(
+                select(DetectorState.key, DetectorState.state).where(DetectorState.detector == detector.name)
+            )
+        ).all()
+        detector.load({k: s for k, s in rows})
+
+    @staticmethod
+    async def save_state(session: AsyncSession) -> int:
+        detector = AnomalyService.detector
+        state = detector.dump()
+        if not state:
+            return 0
+        stmt = mysql_insert(DetectorState).values(
+            [{"detector": detector.name, "key": k, "state": s} for k, s in state.items()]
+        )
+        stmt = stmt.on_duplicate_key_update(state=stmt.inserted.state)
+        await session.execute(stmt)
+        await session.commit()
+        return len(state)
@@ -0,0 +1,343 @@
+import asyncio
+import json
+import logging
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db import partitioning as part
+from app.db.partitioning import as_db_time
+from app.db.timebucket import EPOCH
+from app.models.record import DataRecord
+from app.services.partition_service import PartitionService
+from app.services.record_service import RecordService, RecordWriteEvent
+from app.services.rollup_service import RollupService
+
+
+logger = logging.getLogger("realtime-monitoring")
+
+MANIFEST = "manifest.json"
+
+# NOTE:
+# - pyarrow is imported by the functions that use it: it adds ~75ms to every startup, while only
+#   deployments with archived data ever need it.
+_COLUMNS = ("id", "title", "value", "category", "timestamp", "is_anomaly", "created_by")
+_EPOCH_US = int((EPOCH - datetime(1970, 1, 1)) / timedelta(microseconds=1))
+
+
+def _range_filters(start: datetime | None, end: datetime | None, category: str | None) -> list | None:
+    filters = []
+    if start is not None:
+        filters.append(("timestamp", ">=", start))
+    if end is not None:
+        filters.append(("timestamp", "<=", end))
+    if category is not None:
+        filters.append(("category", "=", category))
+    return filters or None
+
+
+def _schema():
+    import pyarrow as pa
+
+    types = (pa.int64(), pa.string(), pa.float64(), pa.string(), pa.timestamp("us"), pa.bool_(), pa.int32())
+    return pa.schema(list(zip(_COLUMNS, types)))
+
+
+def _scan_stats(path: str, start, end, category) -> dict[str, list]:
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(path, columns=["category", "value"], filters=_range_filters(start, end, category))
+    grouped = table.group_by("category").aggregate(
+        [("value", "count"), ("value", "sum"), ("value", "min"), ("value", "max")]
+    )
+    out = {}
+    for row in grouped.to_pylist():
+        out[row["category"]] = [int(row["value_count"]), float(row["value_sum"]), row["value_min"], row["value_max"]]
+    return out
+
+
+def _scan_trend(path: str, interval_seconds: int, start, end, category, by_category: bool) -> dict:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    columns = ["timestamp", "value", "category"] if by_category else ["timestamp", "value"]
+    table = pq.read_table(path, columns=columns, filters=_range_filters(start, end, category))
+    # NOTE:
+    # - Same epoch-aligned integer bucketing as bucket_expr(); offsets are non-negative, so
+    #   truncating division floors.
+    offset = pc.subtract(table.column("timestamp").cast(pa.int64()), _EPOCH_US)
+    table = table.append_column("bucket", pc.divide(offset, interval_seconds * 1_000_000))
+    keys = ["bucket", "category"] if by_category else ["bucket"]
+    grouped = table.group_by(keys).aggregate([("value", "count"), ("value", "sum")])
+
+    width = timedelta(seconds=interval_seconds)
+    out = {}
+    for row in grouped.to_pylist():
+        key = (row["category"] if by_category else None, EPOCH + int(row["bucket"]) * width)
+        out[key] = [int(row["value_count"]), float(row["value_sum"])]
+    return out
+
+
+class ColdArchive:
+    """
+    Day-partitioned Parquet files holding rows moved out of data_records, with a JSON manifest.
+
+    Design considerations:
+    - One file per (day, source partition) under day=YYYY-MM-DD/, rows sorted by timestamp, zstd
+      compressed, in row groups of ARCHIVE_ROW_GROUP_ROWS so row-group statistics prune time ranges.
+    - The manifest keeps per-file row counts and min/max timestamp/value plus the categories present,
+      so a query opens only files overlapping its range and category.
+    - Scans read only the columns the query needs and aggregate inside Arrow, one file per worker
+      thread, so files are processed in parallel across cores without blocking the event loop.
+    - Archived rows no longer exist in data_records, so archive and DB answers are simply added.
+    """
+
+    def __init__(self, root: str, workers: int):
+        self.root = root
+        self.workers = workers or os.cpu_count() or 1
+        self._files: list[dict] | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self.scans = 0
+        self.files_scanned = 0
+
+    @property
+    def files(self) -> list[dict]:
+        if self._files is None:
+            path = os.path.join(self.root, MANIFEST)
+            self._files = []
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    self._files = json.load(f)["files"]
+        return self._files
+
+    def _publish(self, files: list[dict]) -> None:
+        """Atomically replaces the manifest; readers switch to the new file list at once."""
+        os.makedirs(self.root, exist_ok=True)
+        tmp = os.path.join(self.root, MANIFEST + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"files": files}, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(self.root, MANIFEST))
+        self._files = files
+
+    def add(self, entries: list[dict]) -> None:
+        paths = {e["path"] for e in entries}
+        files = [f for f in self.files if f["path"] not in paths] + entries
+        self._publish(sorted(files, key=lambda f: (f["day"], f["path"])))
+
+    def purge_before(self, day: date) -> int:
+        cutoff = day.isoformat()
+        keep = [f for f in self.files if f["day"] >= cutoff]
+        if len(keep) == len(self.files):
+            return 0
+        dropped = {f["day"] for f in self.files if f["day"] < cutoff}
+        self._publish(keep)
+        for d in dropped:
+            shutil.rmtree(os.path.join(self.root, f"day={d}"), ignore_errors=True)
+        return len(dropped)
+
+    def write_day(self, day: date, partition: str, columns: dict[str, list]) -> dict:
+        """Writes one day's rows (sorted by timestamp) and returns its manifest entry."""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+
+        table = pa.table(columns, schema=_schema())
+        rel = os.path.join(f"day={day.isoformat()}", f"{partition}.parquet")
+        path = os.path.join(self.root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        pq.write_table(
+            table,
+            path + ".tmp",
+            compression="zstd",
+            row_group_size=int(settings.ARCHIVE_ROW_GROUP_ROWS),
+            write_statistics=True,
+        )
+        os.replace(path + ".tmp", path)
+        values = table.column("value")
+        return {
+            "path": rel,
+            "day": day.isoformat(),
+            "partition": partition,
+            "rows": table.num_rows,
+            "bytes": os.path.getsize(path),
+            "timestamp_min": columns["timestamp"][0].isoformat(),
+            "timestamp_max": columns["timestamp"][-1].isoformat(),
+            "value_min": pc.min(values).as_py(),
+            "value_max": pc.max(values).as_py(),
+            "categories": sorted(set(columns["category"])),
+        }
+
+    def select(self, start: datetime | None, end: datetime | None, category: str | None) -> list[dict]:
+        lo = start.isoformat() if start is not None else None
+        hi = end.isoformat() if end is not None else None
+        return [
+            f
+            for f in self.files
+            if (lo is None or f["timestamp_max"] >= lo)
+            and (hi is None or f["timestamp_min"] <= hi)
+            and (category is None or category in f["categories"])
+        ]
+
+    async def _map(self, files: list[dict], fn, *args) -> list:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="archive-scan")
+        loop = asyncio.get_running_loop()
+        self.scans += 1
+        self.files_scanned += len(files)
+        return await asyncio.gather(
+            *(loop.run_in_executor(self._executor, fn, os.path.join(self.root, f["path"]), *args) for f in files)
+        )
+
+    async def category_stats(
+        self,
+        start_time: datetime | None,
+        end_time: datetime | None,
+        category: str | None,
+    ) -> list[dict[str, list]]:
+        """Per-file {category: [count, sum, min, max]} for archived rows in the range."""
+        start = as_db_time(start_time) if start_time else None
+        end = as_db_time(end_time) if end_time else None
+        files = self.select(start, end, category)
+        if not files:
+            return []
+        return await self._map(files, _scan_stats, start, end, category)
+
+    async def trend(
+        self,
+        interval_seconds: int,
+        start_time: datetime,
+        end_time: datetime,
+        category: str | None,
+        by_category: bool,
+    ) -> list[dict]:
+        """Per-file {(category | None, bucket_start): [count, sum]} for archived rows in the range."""
+        files = self.select(start_time, end_time, category)
+        if not files:
+            return []
+        return await self._map(files, _scan_trend, interval_seconds, start_time, end_time, category, by_category)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        files = self.files
+        return {
+            "files": len(files),
+            "rows": sum(f["rows"] for f in files),
+            "bytes": sum(f["bytes"] for f in files),
+            "first_day": files[0]["day"] if files else None,
+            "last_day": files[-1]["day"] if files else None,
+            "scans": self.scans,
+            "files_scanned": self.files_scanned,
+        }
+
+
+cold_archive = ColdArchive(settings.ARCHIVE_DIR, int(settings.ARCHIVE_SCAN_WORKERS))
+
+
+class ArchiveService:
+    """
+    Moves aged data_records partitions into the Parquet cold archive.
+
+    Design considerations:
+    - Requires the opt-in partitioning migration and ARCHIVE_AFTER_DAYS > 0; otherwise a no-op.
+    - Partitions whose upper bound is at least ARCHIVE_AFTER_DAYS old are handled oldest first.
+      A partition's rows are streamed in timestamp order and written one day at a time, so memory
+      stays bounded by one day of rows.
+    - The partition is dropped only after its row count still matches what was written and the
+      manifest naming the new files has been published. A crash in between leaves the partition in
+      place (briefly counted twice) and the next run rewrites the same file paths, so no row is lost.
+    - Rollups, sketches and anomaly events below the boundary are purged with the partition, as
+      retention does; summary, by-category and trend read archived ranges from the files instead.
+    """
+
+    @staticmethod
+    async def _export(session: AsyncSession, partition: str, upper: date) -> tuple[int, list[dict]]:
+        stmt = (
+            select(
+                DataRecord.id,
+                DataRecord.title,
+                DataRecord.value,
+                DataRecord.category,
+                DataRecord.timestamp,
+                DataRecord.is_anomaly,
+                DataRecord.created_by,
+            )
+            .where(DataRecord.timestamp < datetime.combine(upper, time.min))
+            .order_by(DataRecord.timestamp.asc(), DataRecord.id.asc())
+            .execution_options(yield_per=int(settings.SERIES_STREAM_CHUNK))
+        )
+
+        entries, written = [], 0
+        day, columns = None, None
+
+        async def flush():
+            nonlocal written
+            if columns and columns["id"]:
+                entries.append(await asyncio.to_thread(cold_archive.write_day, day, partition, columns))
+                written += len(columns["id"])
+
+        async for row in await session.stream(stmt):
+            ts = as_db_time(row.timestamp)
+            if ts.date() != day:
+                await flush()
+                day, columns = ts.date(), {name: [] for name in _COLUMNS}
+            columns["id"].append(row.id)
+            columns["title"].append(row.title)
+            columns["value"].append(float(row.value))
+            columns["category"].append(row.category)
+            columns["timestamp"].append(ts)
+            columns["is_anomaly"].append(bool(row.is_anomaly))
+            columns["created_by"].append(row.created_by)
+        await flush()
+        return written, entries
+
+    @staticmethod
+    async def archive(session: AsyncSession, today: date) -> dict:
+        after_days = int(settings.ARCHIVE_AFTER_DAYS)
+        if after_days <= 0:
+            return {"archived": [], "rows": 0, "purged_days": 0}
+
+        purged_days = 0
+        retention = int(settings.RETENTION_DAYS)
+        if retention > 0:
+            purged_days = cold_archive.purge_before(today - timedelta(days=retention))
+
+        partitions = await PartitionService.list_partitions(session)
+        cutoff = today - timedelta(days=after_days)
+        due = [p for p in partitions if p["upper_bound"] is not None and p["upper_bound"] <= cutoff]
+
+        archived, total = [], 0
+        for p in due:
+            written, entries = await ArchiveService._export(session, p["name"], p["upper_bound"])
+            await session.rollback()
+            count = (
+                await session.execute(text(f"SELECT COUNT(*) FROM {part.TABLE} PARTITION ({p['name']})"))
+            ).scalar_one()
+            if int(count) != written:
+                # NOTE:
+                # - Rows arrived while exporting; the rewritten files are not published and the
+                #   partition is retried on the next run.
+                logger.warning("Archive of %s skipped: %s rows now, %s exported", p["name"], count, written)
+                break
+
+            if entries:
+                cold_archive.add(entries)
+            await session.execute(text(part.drop_partitions_sql([p["name"]])))
+            await RollupService.purge_before(session, datetime.combine(p["upper_bound"], time.min))
+            await session.commit()
+            RecordService.notify(RecordWriteEvent(stale_all=True))
+            archived.append(p["name"])
+            total += written
+            logger.info("Archived partition %s: %s rows in %s file(s)", p["name"], written, len(entries))
+
+        return {"archived": archived, "rows": total, "purged_days": purged_days}
@@ -0,0 +1,173 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import orjson
+
+from app.core.config import settings
+from app.db.partitioning import as_db_time
+from app.services.record_service import RecordWriteEvent
+
+
+MISS = object()
+_ALL = "__all__"
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    expires_at: float | None  # None for closed ranges
+    closed: bool
+    epoch: int
+    generation: int
+
+
+class ResultCache:
+    """
+    LRU result cache for analytics queries, invalidated by write generations.
+
+    Design considerations:
+    - Keys are normalized (endpoint, start, end, category) tuples; bounds are converted to naive UTC.
+      Callers may append more parts (the analytics service appends the read route).
+    - Every category has two counters. `gen` is bumped by every write; `hist_gen` only by writes whose
+      timestamp is older than the hot window (imports of old data, edits, deletes, bulk statements).
+    - An entry whose end_time was already older than the hot window when it was stored is "closed":
+      it only depends on `hist_gen`, has no TTL and stays cached until evicted.
+      Open entries depend on `gen` and also expire after the TTL.
+    - Entries without a category filter depend on the global counters, which every write bumps.
+    - Every entry also records the cache-wide epoch; stale_all writes (dropped or archived partitions)
+      bump it, so they reach categories the counters have never seen.
+    - Size is estimated from the JSON encoding; LRU eviction keeps both entry count and bytes under caps.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float, hot_window_seconds: float):
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self._gen: dict[str, int] = {}
+        self._hist_gen: dict[str, int] = {}
+        self._epoch = 0
+        self._bytes = 0
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hot_window = timedelta(seconds=hot_window_seconds)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(endpoint: str, start_time: datetime | None, end_time: datetime | None, category: str | None) -> tuple:
+        return (
+            endpoint,
+            as_db_time(start_time) if start_time else None,
+            as_db_time(end_time) if end_time else None,
+            category or None,
+        )
+
+    def _now_db(self) -> datetime:
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+
+    def _is_closed(self, key: tuple) -> bool:
+        end_time = key[2]
+        return end_time is not None and end_time < self._now_db() - self.hot_window
+
+    def generation(self, key: tuple) -> tuple[bool, int, int]:
+        """Snapshot taken before running the query; a write during the query makes the result stale."""
+        closed = self._is_closed(key)
+        counters = self._hist_gen if closed else self._gen
+        return closed, self._epoch, counters.get(key[3] or _ALL, 0)
+
+    def get(self, key: tuple) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            scope = key[3] or _ALL
+            counters = self._hist_gen if entry.closed else self._gen
+            fresh = entry.epoch == self._epoch and counters.get(scope, 0) == entry.generation
+            alive = entry.expires_at is None or entry.expires_at > time.monotonic()
+            if fresh and alive:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.value
+
+            self._drop(key)
+            self.invalidations += 1
+
+        self.misses += 1
+        return MISS
+
+    def put(self, key: tuple, value: Any, token: tuple[bool, int, int]) -> None:
+        size = len(orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)) + 64
+        if size > self.max_bytes:
+            return
+
+        closed, epoch, generation = token
+        self._drop(key)
+        self._entries[key] = _Entry(
+            value=value,
+            size=size,
+            expires_at=None if closed else time.monotonic() + self.ttl_seconds,
+            closed=closed,
+            epoch=epoch,
+            generation=generation,
+        )
+        self._bytes += size
+
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, key: tuple) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _bump(self, scope: str, historical: bool) -> None:
+        self._gen[scope] = self._gen.get(scope, 0) + 1
+        if historical:
+            self._hist_gen[scope] = self._hist_gen.get(scope, 0) + 1
+
+    def on_write(self, event: RecordWriteEvent) -> None:
+        hot_since = self._now_db() - self.hot_window
+        touched: dict[str, bool] = {}
+
+        for point in event.added + event.removed:
+            historical = point.timestamp is None or as_db_time(point.timestamp) < hot_since
+            touched[point.category] = touched.get(point.category, False) or historical
+        for category in event.stale_categories:
+            touched[category] = True
+
+        # NOTE:
+        # - Per-scope counters only exist for scopes that were written to; a category-scoped entry
+        #   stored at generation 0 would survive a stale_all bump of the known scopes.
+        if event.stale_all:
+            self._epoch += 1
+
+        for category, historical in touched.items():
+            self._bump(category, historical)
+        if touched:
+            self._bump(_ALL, any(touched.values()))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+analytics_cache = ResultCache(
+    max_entries=int(settings.ANALYTICS_CACHE_MAX_ENTRIES),
+    max_bytes=int(settings.ANALYTICS_CACHE_MAX_BYTES),
+    ttl_seconds=float(settings.ANALYTICS_CACHE_TTL_SECONDS),
+    hot_window_seconds=float(settings.ANALYTICS_CACHE_HOT_WINDOW_SECONDS),
+)
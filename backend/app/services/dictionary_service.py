@@ -0,0 +1,119 @@
+import logging
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import AsyncSessionLocal
+from app.models.record import DICTIONARY_ENCODED, DataRecord, EncodedRecord, RecordCategory, RecordTitle
+
+
+logger = logging.getLogger("realtime-monitoring")
+
+_KINDS = {"category": RecordCategory, "title": RecordTitle}
+
+
+class RecordDictionary:
+    """
+    In-process bidirectional name <-> id dictionary for dictionary-encoded title/category.
+
+    Design considerations:
+    - Loaded once at startup; the flush and import paths encode from memory, so an insert only
+      pays a lookup round trip the first time a name is seen.
+    - New names are registered on their own short session and committed at once (INSERT IGNORE,
+      then read back), so a writer's rollback can never leave rows pointing at a missing name and
+      concurrent processes registering the same name agree on its id.
+    - A cache entry is only ever added, never changed: lookup rows are immutable.
+    - Inactive (and never touched) unless RECORD_DICTIONARY_ENCODING is set.
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self._ids: dict[str, dict[str, int]] = {kind: {} for kind in _KINDS}
+        self._names: dict[str, dict[int, str]] = {kind: {} for kind in _KINDS}
+        self.hits = 0
+        self.registered = 0
+
+    def _remember(self, kind: str, id_: int, requested: str, stored: str) -> None:
+        self._ids[kind][requested] = id_
+        self._ids[kind].setdefault(stored, id_)
+        self._names[kind].setdefault(id_, stored)
+
+    async def load(self) -> None:
+        async with AsyncSessionLocal() as session:
+            for kind, model in _KINDS.items():
+                for id_, name in (await session.execute(select(model.id, model.name))).all():
+                    self._remember(kind, int(id_), name, name)
+
+    async def _register(self, kind: str, names: set[str]) -> None:
+        model = _KINDS[kind]
+        async with AsyncSessionLocal() as session:
+            await session.execute(mysql_insert(model).prefix_with("IGNORE"), [{"name": n} for n in sorted(names)])
+            # NOTE:
+            # - Read back one name at a time: under the column collation a new spelling may resolve
+            #   to an existing entry whose stored name differs from the requested one.
+            for name in names:
+                id_, stored = (await session.execute(select(model.id, model.name).where(model.name == name))).one()
+                self._remember(kind, int(id_), name, stored)
+            await session.commit()
+        self.registered += len(names)
+        logger.info("Registered %d new record %s name(s)", len(names), kind)
+
+    async def ids(self, kind: str, names: Iterable[str]) -> dict[str, int]:
+        """Maps every name to its id, registering unseen names first."""
+        known = self._ids[kind]
+        wanted = set(names)
+        missing = {n for n in wanted if n not in known}
+        self.hits += len(wanted) - len(missing)
+        if missing:
+            await self._register(kind, missing)
+        return {n: known[n] for n in wanted}
+
+    def name(self, kind: str, id_: int) -> str | None:
+        return self._names[kind].get(id_)
+
+    async def encode(self, values: dict) -> dict:
+        """Rewrites title/category in a column->value dict to title_id/category_id."""
+        out = dict(values)
+        for kind in _KINDS:
+            if kind in out:
+                out[f"{kind}_id"] = (await self.ids(kind, [out[kind]]))[out.pop(kind)]
+        return out
+
+    async def insert(self, session: AsyncSession, records: list[DataRecord]) -> None:
+        """
+        Inserts DataRecord carriers as encoded rows and copies the generated ids back onto them.
+
+        The carriers never enter the session (DataRecord maps the read-only view); downstream write
+        steps (rollups, anomaly events, listeners) read their attributes as before.
+        """
+        categories = await self.ids("category", {r.category for r in records})
+        titles = await self.ids("title", {r.title for r in records})
+        rows = [
+            EncodedRecord(
+                title_id=titles[r.title],
+                value=r.value,
+                category_id=categories[r.category],
+                timestamp=r.timestamp,
+                is_anomaly=r.is_anomaly,
+                created_by=r.created_by,
+            )
+            for r in records
+        ]
+        session.add_all(rows)
+        await session.flush()
+        for record, row in zip(records, rows):
+            record.id = row.id
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "categories": len(self._names["category"]),
+            "titles": len(self._names["title"]),
+            "hits": self.hits,
+            "registered": self.registered,
+        }
+
+
+record_dictionary = RecordDictionary(DICTIONARY_ENCODED)
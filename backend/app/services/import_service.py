@@ -0,0 +1,363 @@
+import asyncio
+import csv
+import io
+import logging
+import os
+import shutil
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, BinaryIO
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.log_service import LogService
+from app.services.record_service import RecordService
+
+
+logger = logging.getLogger("realtime-monitoring")
+
+# NOTE:
+# - Errors are capped per job so a completely malformed file cannot grow job state without bound.
+MAX_REPORTED_ERRORS = 1000
+MAX_RETAINED_JOBS = 100
+_PLAN_BLOCK_BYTES = 1024 * 1024
+
+
+def _parse_row(row: dict, now: datetime) -> dict:
+    title = (row.get("title") or "").strip()
+    category = (row.get("category") or "").strip()
+    value = float(row.get("value") or "")
+
+    ts_raw = (row.get("timestamp") or "").strip()
+    ts = datetime.fromisoformat(ts_raw) if ts_raw else now
+
+    if not title or not category:
+        raise ValueError("title/category required")
+
+    return {"title": title, "value": value, "category": category, "timestamp": ts}
+
+
+def _plan_ranges(path: str, chunk_bytes: int) -> tuple[list[str], list[tuple[int, int]]]:
+    """
+    Reads the CSV header and splits the remaining bytes into record-aligned ranges.
+
+    Design considerations:
+    - A newline ends a record only outside quotes, i.e. after an even number of quote bytes
+      (an escaped "" adds two and keeps the parity). Boundaries are placed at the first such newline
+      after each chunk_bytes target, so a quoted field with embedded newlines is never split.
+    - Tracking the parity needs one sequential pass, but it is a bytes.count() per block; reading
+      the file is the dominant cost and the pass runs off the event loop.
+    - Boundaries fall right after a newline byte, so multi-byte characters are never split.
+    - The header is parsed with the csv module too; it is assumed not to contain newlines.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.readline()
+        fieldnames = next(csv.reader(io.StringIO(header.decode("utf-8-sig"), newline="")), [])
+        fieldnames = [name.strip() for name in fieldnames]
+
+        ranges = []
+        start = pos = f.tell()
+        target = start + chunk_bytes
+        quotes = 0  # quote bytes before `pos + offset`; only the parity matters
+        while pos < size:
+            block = f.read(_PLAN_BLOCK_BYTES)
+            if not block:
+                break
+            offset = 0
+            while pos + len(block) > target:
+                skip = max(target - pos, offset)
+                quotes += block.count(b'"', offset, skip)
+                offset = skip
+                nl = block.find(b"\n", offset)
+                while nl >= 0:
+                    quotes += block.count(b'"', offset, nl)
+                    offset = nl + 1
+                    if quotes % 2 == 0:
+                        break
+                    nl = block.find(b"\n", offset)
+                if nl < 0:
+                    # NOTE:
+                    # - No record end in the rest of this block; keep looking in the next one.
+                    break
+                end = pos + offset
+                ranges.append((start, end))
+                start = end
+                target = end + chunk_bytes
+            quotes += block.count(b'"', offset)
+            pos += len(block)
+        if start < size:
+            ranges.append((start, size))
+    return fieldnames, ranges
+
+
+def _parse_range(path: str, start: int, end: int, fieldnames: list[str], now: datetime) -> dict:
+    """
+    Parses one byte range of a CSV file. Runs inside a worker process.
+
+    Returns parsed rows, rejected rows (line number local to the range) and the
+    number of physical lines, so the parent can resolve absolute row numbers.
+    The text goes to the csv module unsplit (newline=""), so quoted fields keep their newlines.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    reader = csv.DictReader(io.StringIO(data.decode("utf-8"), newline=""), fieldnames=fieldnames)
+
+    rows = []
+    errors = []
+    for row in reader:
+        try:
+            rows.append(_parse_row(row, now))
+        except Exception as e:
+            errors.append((reader.line_num, str(e)))
+
+    return {"rows": rows, "errors": errors, "lines": reader.line_num, "bytes": end - start}
+
+
+@dataclass
+class ImportJob:
+    job_id: str
+    filename: str
+    created_by: int
+    path: str
+    status: str = "queued"  # queued/running/completed/partial/failed
+    bytes_total: int = 0
+    bytes_parsed: int = 0
+    rows_parsed: int = 0
+    rows_inserted: int = 0
+    rows_rejected: int = 0
+    errors: list[dict[str, Any]] = field(default_factory=list)
+    error: str | None = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    _started_mono: float | None = None
+    _finished_mono: float | None = None
+
+    def progress(self) -> dict[str, Any]:
+        elapsed = 0.0
+        if self._started_mono is not None:
+            elapsed = (self._finished_mono or time.monotonic()) - self._started_mono
+
+        rows_per_sec = self.rows_inserted / elapsed if elapsed > 0 else 0.0
+        bytes_per_sec = self.bytes_parsed / elapsed if elapsed > 0 else 0.0
+
+        eta = None
+        if self.status == "running" and bytes_per_sec > 0:
+            eta = max(self.bytes_total - self.bytes_parsed, 0) / bytes_per_sec
+        elif self.status == "completed":
+            eta = 0.0
+
+        return {
+            "job_id": self.job_id,
+            "filename": self.filename,
+            "status": self.status,
+            "bytes_total": self.bytes_total,
+            "bytes_parsed": self.bytes_parsed,
+            "rows_parsed": self.rows_parsed,
+            "rows_inserted": self.rows_inserted,
+            "rows_rejected": self.rows_rejected,
+            "elapsed_sec": round(elapsed, 3),
+            "rows_per_sec": round(rows_per_sec, 1),
+            "eta_sec": round(eta, 1) if eta is not None else None,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "errors": self.errors,
+        }
+
+
+class ImportService:
+    """
+    Runs CSV imports as background jobs.
+
+    Design considerations:
+    - Persists uploads to local disk so the HTTP request returns as soon as the file is stored.
+    - Parses record-aligned byte ranges in a process pool to keep CPU-bound work off the event loop.
+    - Rows are inserted as ranges finish; a job that fails after inserting ends as "partial" with
+      rows_inserted telling how much of the file was stored.
+    - Uses a single writer coroutine and session, so inserts stay ordered and pool usage stays flat.
+    - Job state is process-local; a multi-worker deployment would need a shared job store.
+    """
+
+    _jobs: dict[str, ImportJob] = {}
+    _tasks: set[asyncio.Task] = set()
+    _executor: ProcessPoolExecutor | None = None
+
+    @classmethod
+    def _get_executor(cls) -> ProcessPoolExecutor:
+        if cls._executor is None:
+            cls._executor = ProcessPoolExecutor(max_workers=max(int(settings.IMPORT_WORKERS), 1))
+        return cls._executor
+
+    @classmethod
+    def shutdown(cls) -> None:
+        for task in list(cls._tasks):
+            task.cancel()
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
+
+    @classmethod
+    def create_job(cls, created_by: int, filename: str) -> ImportJob:
+        os.makedirs(settings.IMPORT_DIR, exist_ok=True)
+        job_id = uuid.uuid4().hex
+        job = ImportJob(
+            job_id=job_id,
+            filename=filename,
+            created_by=created_by,
+            path=os.path.join(settings.IMPORT_DIR, f"{job_id}.csv"),
+        )
+        cls._jobs[job_id] = job
+        cls._evict_finished()
+        return job
+
+    @classmethod
+    def get_job(cls, job_id: str) -> ImportJob | None:
+        return cls._jobs.get(job_id)
+
+    @classmethod
+    def _evict_finished(cls) -> None:
+        finished = [j for j in cls._jobs.values() if j.status in ("completed", "partial", "failed")]
+        overflow = len(cls._jobs) - MAX_RETAINED_JOBS
+        for job in sorted(finished, key=lambda j: j.created_at)[: max(overflow, 0)]:
+            cls._jobs.pop(job.job_id, None)
+
+    @staticmethod
+    def persist_upload(src: BinaryIO, path: str) -> int:
+        with open(path, "wb") as out:
+            shutil.copyfileobj(src, out, length=1024 * 1024)
+        return os.path.getsize(path)
+
+    @classmethod
+    def start(cls, job: ImportJob) -> None:
+        task = asyncio.create_task(cls._run(job))
+        cls._tasks.add(task)
+        task.add_done_callback(cls._tasks.discard)
+
+    @classmethod
+    async def _run(cls, job: ImportJob) -> None:
+        loop = asyncio.get_running_loop()
+        job.status = "running"
+        job.started_at = datetime.now(timezone.utc)
+        job._started_mono = time.monotonic()
+        line_counts: list[int] = []
+        range_errors: dict[int, list[tuple[int, str]]] = {}
+
+        try:
+            job.bytes_total = os.path.getsize(job.path)
+            fieldnames, ranges = await loop.run_in_executor(
+                None, _plan_ranges, job.path, int(settings.IMPORT_CHUNK_BYTES)
+            )
+            job.bytes_parsed = ranges[0][0] if ranges else job.bytes_total
+
+            executor = cls._get_executor()
+            max_in_flight = max(int(settings.IMPORT_WORKERS), 1) * 2
+            insert_batch = max(int(settings.IMPORT_INSERT_BATCH), 1)
+            now = datetime.now(timezone.utc)
+
+            line_counts = [0] * len(ranges)
+            pending: dict[asyncio.Future, int] = {}
+            next_idx = 0
+
+            async with AsyncSessionLocal() as session:
+                while next_idx < len(ranges) or pending:
+                    # NOTE:
+                    # - In-flight ranges are bounded so parsed rows cannot pile up faster than the writer drains them.
+                    while next_idx < len(ranges) and len(pending) < max_in_flight:
+                        start, end = ranges[next_idx]
+                        fut = loop.run_in_executor(executor, _parse_range, job.path, start, end, fieldnames, now)
+                        pending[fut] = next_idx
+                        next_idx += 1
+
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for fut in done:
+                        idx = pending.pop(fut)
+                        result = fut.result()
+                        rows = result["rows"]
+
+                        line_counts[idx] = result["lines"]
+                        if result["errors"]:
+                            range_errors[idx] = result["errors"]
+
+                        job.bytes_parsed += result["bytes"]
+                        job.rows_parsed += len(rows) + len(result["errors"])
+                        job.rows_rejected += len(result["errors"])
+
+                        for i in range(0, len(rows), insert_batch):
+                            job.rows_inserted += await RecordService.batch_insert(
+                                session, job.created_by, rows[i : i + insert_batch]
+                            )
+
+                job.errors = cls._resolve_errors(line_counts, range_errors)
+
+                await LogService.write(
+                    session,
+                    "INFO",
+                    "DATA_IMPORT",
+                    "CSV import completed",
+                    detail=f"job={job.job_id}, inserted={job.rows_inserted}, errors={job.rows_rejected}",
+                    actor_user_id=job.created_by,
+                )
+
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = "cancelled"
+            raise
+        except Exception as e:
+            # NOTE:
+            # - Inserted batches are already committed; a job that stored rows before failing is
+            #   reported as partial with its rows_inserted, not as if nothing had been written.
+            job.status = "partial" if job.rows_inserted else "failed"
+            job.error = f"{e} (after {job.rows_inserted} rows were inserted)" if job.rows_inserted else str(e)
+            # - Row numbers are only known for the ranges before the first unfinished one.
+            finished = line_counts.index(0) if 0 in line_counts else len(line_counts)
+            job.errors = cls._resolve_errors(line_counts[:finished], range_errors)
+            logger.exception("CSV import job %s failed: %s", job.job_id, str(e))
+            await cls._log_failure(job)
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            job._finished_mono = time.monotonic()
+            try:
+                os.remove(job.path)
+            except OSError:
+                pass
+
+    @staticmethod
+    async def _log_failure(job: ImportJob) -> None:
+        try:
+            async with AsyncSessionLocal() as session:
+                await LogService.write(
+                    session,
+                    "WARN",
+                    "DATA_IMPORT",
+                    f"CSV import {job.status}",
+                    detail=f"job={job.job_id}, inserted={job.rows_inserted}, error={job.error}"[:1000],
+                    actor_user_id=job.created_by,
+                )
+        except Exception as e:
+            logger.exception("CSV import failure log for job %s failed: %s", job.job_id, str(e))
+
+    @staticmethod
+    def _resolve_errors(
+        line_counts: list[int],
+        range_errors: dict[int, list[tuple[int, str]]],
+    ) -> list[dict[str, Any]]:
+        # NOTE:
+        # - Row numbers follow the previous synchronous import: the header is row 1.
+        out = []
+        offset = 1
+        for idx, lines in enumerate(line_counts):
+            for local_line, reason in range_errors.get(idx, []):
+                if len(out) >= MAX_REPORTED_ERRORS:
+                    return out
+                out.append({"row": offset + local_line, "reason": reason})
+            offset += lines
+        return out
@@ -0,0 +1,98 @@
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db import partitioning as part
+from app.services.rollup_service import RollupService
+from app.services.record_service import RecordService, RecordWriteEvent
+
+
+class PartitionService:
+    """
+    Maintains time partitions of data_records.
+
+    Design considerations:
+    - Does nothing unless the opt-in partitioning migration has been applied.
+    - Pre-creates future partitions so inserts never land in p_future under normal operation.
+    - Applies retention by dropping whole partitions, which is a metadata operation instead of a large DELETE.
+    """
+
+    @staticmethod
+    async def list_partitions(session: AsyncSession) -> list[dict]:
+        rows = (
+            await session.execute(
+                text(
+                    "SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS "
+                    "FROM information_schema.PARTITIONS "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table "
+                    "AND PARTITION_NAME IS NOT NULL "
+                    "ORDER BY PARTITION_ORDINAL_POSITION"
+                ),
+                {"table": part.TABLE},
+            )
+        ).all()
+
+        out = []
+        for name, description, table_rows in rows:
+            upper = None if description == "MAXVALUE" else part.from_days(int(description))
+            out.append({"name": str(name), "upper_bound": upper, "rows": int(table_rows or 0)})
+        return out
+
+    @staticmethod
+    def plan(partitions: list[dict], today: date) -> tuple[list[date], list[str]]:
+        """
+        Returns (period starts to create, partition names to drop).
+
+        Kept free of I/O so the retention rule can be reasoned about on its own.
+        """
+        granularity = settings.PARTITION_GRANULARITY
+        bounded = [p for p in partitions if p["upper_bound"] is not None]
+
+        # NOTE:
+        # - New partitions continue from the last bounded one so the range stays contiguous.
+        horizon = part.next_period(part.period_start(today, granularity), granularity)
+        for _ in range(int(settings.PARTITION_PRECREATE)):
+            horizon = part.next_period(horizon, granularity)
+
+        to_create = []
+        cur = bounded[-1]["upper_bound"] if bounded else part.period_start(today, granularity)
+        while cur < horizon:
+            to_create.append(cur)
+            cur = part.next_period(cur, granularity)
+
+        to_drop = []
+        retention = int(settings.RETENTION_DAYS)
+        if retention > 0:
+            cutoff = today - timedelta(days=retention)
+            to_drop = [p["name"] for p in bounded if p["upper_bound"] <= cutoff]
+
+        return to_create, to_drop
+
+    @staticmethod
+    async def maintain(session: AsyncSession, now: datetime) -> dict:
+        partitions = await PartitionService.list_partitions(session)
+        if not partitions:
+            return {"partitioned": False, "created": [], "dropped": []}
+
+        to_create, to_drop = PartitionService.plan(partitions, now.date())
+        granularity = settings.PARTITION_GRANULARITY
+
+        if to_create:
+            await session.execute(text(part.reorganize_future_sql(to_create, granularity)))
+        if to_drop:
+            await session.execute(text(part.drop_partitions_sql(to_drop)))
+            # NOTE:
+            # - Rollups are purged up to the same boundary so rollup and raw answers keep agreeing.
+            upper = max(p["upper_bound"] for p in partitions if p["name"] in to_drop)
+            await RollupService.purge_before(session, datetime.combine(upper, time.min))
+        await session.commit()
+        if to_drop:
+            RecordService.notify(RecordWriteEvent(stale_all=True))
+
+        return {
+            "partitioned": True,
+            "created": [part.partition_name(s, granularity) for s in to_create],
+            "dropped": to_drop,
+        }
@@ -0,0 +1,163 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timezone
+
+
+# NOTE:
+# - A leaf frame in one of these files means the loop thread is waiting for I/O, i.e. idle:
+#   selectors.py for the stock asyncio loop; with uvloop the loop is native code, so the innermost
+#   Python frame left is the asyncio runner.
+_IDLE_FILES = ("selectors.py", os.path.join("asyncio", "runners.py"))
+_TRACEMALLOC_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _short_path(filename: str) -> str:
+    """site-packages/fastapi/routing.py -> fastapi/routing.py, /srv/app/main.py -> app/main.py."""
+    _, sep, tail = filename.rpartition("site-packages" + os.sep)
+    if sep:
+        return tail
+    _, sep, tail = filename.rpartition(os.sep + "app" + os.sep)
+    if sep:
+        return "app" + os.sep + tail
+    return os.path.basename(filename)
+
+
+class Profiler:
+    """
+    On-demand CPU sampling and tracemalloc snapshots of the running backend.
+
+    Design considerations:
+    - Nothing runs until an admin asks: the sampler thread only exists for the length of one CPU
+      profile and tracemalloc is started and stopped explicitly, so the inactive cost is zero.
+    - CPU samples come from sys._current_frames() for the event loop thread, taken by a helper thread
+      at a fixed interval; no tracing hooks are installed, so the loop itself is not slowed down beyond
+      the GIL hand-offs of the sampler. Awaiting coroutines are off-stack and therefore not sampled:
+      the profile shows where the loop spends CPU, not where requests wait.
+    - Output is the collapsed-stack format (one "root;...;leaf count" line per stack), which
+      flamegraph.pl, speedscope and inferno read directly.
+    - One CPU profile at a time; a second request is refused rather than skewing both results.
+    """
+
+    def __init__(self):
+        self._cpu_busy = False
+        self._baseline: tracemalloc.Snapshot | None = None
+        self._baseline_at: datetime | None = None
+
+    # ---- CPU ----
+
+    @staticmethod
+    def _stack(frame) -> tuple[str, ...]:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_qualname} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        names.reverse()
+        return tuple(names)
+
+    @staticmethod
+    def _sample(thread_id: int, seconds: float, interval: float, include_idle: bool) -> tuple[Counter, int, int]:
+        stacks: Counter = Counter()
+        samples = idle = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(thread_id)
+            if frame is not None:
+                samples += 1
+                if frame.f_code.co_filename.endswith(_IDLE_FILES):
+                    idle += 1
+                    if not include_idle:
+                        frame = None
+                if frame is not None:
+                    stacks[Profiler._stack(frame)] += 1
+            del frame
+            time.sleep(interval)
+        return stacks, samples, idle
+
+    async def cpu(self, seconds: float, interval_ms: float, include_idle: bool) -> dict:
+        """Samples the event loop thread for `seconds`; returns collapsed stacks and sample counts."""
+        if self._cpu_busy:
+            raise ValueError("A CPU profile is already running")
+        self._cpu_busy = True
+        try:
+            stacks, samples, idle = await asyncio.to_thread(
+                self._sample, threading.get_ident(), seconds, interval_ms / 1000, include_idle
+            )
+        finally:
+            self._cpu_busy = False
+        lines = [f"{';'.join(stack)} {count}" for stack, count in stacks.most_common()]
+        return {"collapsed": "\n".join(lines) + "\n", "samples": samples, "idle_samples": idle}
+
+    # ---- Memory ----
+
+    def memory_start(self, frames: int) -> dict:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self._baseline = tracemalloc.take_snapshot().filter_traces(_TRACEMALLOC_FILTERS)
+        self._baseline_at = datetime.now(timezone.utc)
+        return self.memory_status()
+
+    def memory_stop(self) -> dict:
+        tracemalloc.stop()
+        self._baseline = None
+        self._baseline_at = None
+        return self.memory_status()
+
+    def memory_status(self) -> dict:
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "traceback_frames": tracemalloc.get_traceback_limit() if tracemalloc.is_tracing() else 0,
+            "traced_current_kb": round(current / 1024, 1),
+            "traced_peak_kb": round(peak / 1024, 1),
+            "baseline_at": self._baseline_at,
+        }
+
+    def _memory_top(self, group_by: str, limit: int, diff: bool, rebase: bool) -> list[dict]:
+        snapshot = tracemalloc.take_snapshot().filter_traces(_TRACEMALLOC_FILTERS)
+        if diff and self._baseline is not None:
+            stats = snapshot.compare_to(self._baseline, group_by)
+        else:
+            stats = snapshot.statistics(group_by)
+        rows = []
+        for s in stats[:limit]:
+            size_diff = getattr(s, "size_diff", None)
+            rows.append(
+                {
+                    # NOTE:
+                    # - Tracebacks are stored oldest frame first; the allocating line is shown first.
+                    "site": " <- ".join(f"{_short_path(f.filename)}:{f.lineno}" for f in reversed(s.traceback)),
+                    "size_kb": round(s.size / 1024, 1),
+                    "count": s.count,
+                    "size_diff_kb": round(size_diff / 1024, 1) if size_diff is not None else None,
+                    "count_diff": getattr(s, "count_diff", None),
+                }
+            )
+        if rebase:
+            self._baseline = snapshot
+            self._baseline_at = datetime.now(timezone.utc)
+        return rows
+
+    async def memory_top(self, group_by: str, limit: int, diff: bool, rebase: bool) -> dict:
+        """
+        Top allocation sites of a fresh snapshot, optionally as growth since the baseline.
+
+        Snapshot and statistics are built in a worker thread; they take seconds on a large heap.
+        """
+        if not tracemalloc.is_tracing():
+            raise ValueError("Memory tracing is not running; start it first")
+        stats = await asyncio.to_thread(self._memory_top, group_by, limit, diff, rebase)
+        return {**self.memory_status(), "stats": stats}
+
+
+profiler = Profiler()
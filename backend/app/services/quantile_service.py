@@ -0,0 +1,259 @@
+import math
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from sqlalchemy import select, insert, delete, func, case, literal_column
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.partitioning import as_db_time
+from app.db.timebucket import floor_dt, bucket_expr
+from app.models.record import DataRecord
+from app.models.sketch import RecordSketchHour
+
+
+SKETCH_SECONDS = 3600
+
+
+class DDSketch:
+    """
+    DDSketch with relative accuracy alpha (Masson et al., VLDB 2019).
+
+    A value v != 0 falls in bin k = ceil(log_gamma |v|), gamma = (1 + alpha) / (1 - alpha), and is
+    reported as sign(v) * 2 * gamma^k / (gamma + 1). Every returned quantile x' therefore satisfies
+    |x' - x| <= alpha * |x|, where x is the exact value of rank floor(q * (n - 1)).
+
+    Sketches merge by adding bin counts, which is what the SQL side does with SUM(count).
+    """
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self.ln_gamma = math.log(self.gamma)
+        self.bins: dict[tuple[int, int], int] = {}
+        self.count = 0
+
+    def key(self, value: float) -> tuple[int, int]:
+        if value == 0:
+            return 0, 0
+        return (1 if value > 0 else -1), math.ceil(math.log(abs(value)) / self.ln_gamma)
+
+    def add(self, value: float, n: int = 1) -> None:
+        self.add_bin(*self.key(value), n)
+
+    def add_bin(self, sign: int, index: int, n: int) -> None:
+        if n <= 0:
+            return
+        self.bins[(sign, index)] = self.bins.get((sign, index), 0) + n
+        self.count += n
+
+    def merge(self, other: "DDSketch") -> None:
+        for (sign, index), n in other.bins.items():
+            self.add_bin(sign, index, n)
+
+    def _value(self, sign: int, index: int) -> float:
+        if sign == 0:
+            return 0.0
+        return sign * 2 * self.gamma**index / (self.gamma + 1)
+
+    def centroids(self) -> list[tuple[float, int]]:
+        """(representative value, count) per non-empty bin."""
+        return [(self._value(sign, index), n) for (sign, index), n in self.bins.items()]
+
+    def quantiles(self, qs: list[float]) -> list[float | None]:
+        if not self.count:
+            return [None for _ in qs]
+
+        # NOTE:
+        # - Ascending value order: negatives from the largest magnitude down, zero, then positives.
+        order = sorted(self.bins, key=lambda k: (k[0], k[1] * k[0]))
+        ranks = sorted((math.floor(q * (self.count - 1)), i) for i, q in enumerate(qs))
+
+        out: list[float | None] = [None] * len(qs)
+        seen = 0
+        pos = 0
+        for sign, index in order:
+            seen += self.bins[(sign, index)]
+            while pos < len(ranks) and ranks[pos][0] < seen:
+                out[ranks[pos][1]] = self._value(sign, index)
+                pos += 1
+        return out
+
+
+class QuantileService:
+    """
+    Maintains hourly DDSketches per category and answers quantile queries from them.
+
+    Design considerations:
+    - Sketch bins are kept in the same transaction as the rollups, through RollupService,
+      so every write path (flush, import, CRUD, bulk statements, retention) covers them too.
+    - Inserts upsert bin counts; updates and deletes rebuild the affected hours from raw rows.
+    - A query merges whole hours from the sketch table. The partial hours at either end are binned
+      DB-side from raw rows, so only bin counts cross the wire and the error bound is unchanged.
+    """
+
+    @staticmethod
+    def new_sketch() -> DDSketch:
+        return DDSketch(float(settings.QUANTILE_RELATIVE_ACCURACY))
+
+    @staticmethod
+    def _sql_keys(column, ln_gamma: float):
+        # NOTE:
+        # - Mirrors DDSketch.key(); a value on a bin boundary may land in the neighbouring bin
+        #   because of float rounding, and both representatives are within alpha of it.
+        # - Constants are inlined so the SELECT and GROUP BY render the identical expression.
+        zero = literal_column("0")
+        sign = func.sign(column)
+        index = case(
+            (column == zero, zero),
+            else_=func.ceil(func.ln(func.abs(column)) / literal_column(repr(ln_gamma))),
+        )
+        return sign, index
+
+    @staticmethod
+    async def apply_inserts(session: AsyncSession, items: Iterable[tuple]) -> None:
+        """Folds (timestamp, category, value) tuples into the hourly sketches."""
+        sketch = QuantileService.new_sketch()
+        counts: dict[tuple, int] = {}
+        for ts, category, value in items:
+            key = (floor_dt(ts, SKETCH_SECONDS), category, *sketch.key(value))
+            counts[key] = counts.get(key, 0) + 1
+        if not counts:
+            return
+
+        stmt = mysql_insert(RecordSketchHour).values(
+            [
+                {"bucket_start": b, "category": c, "sign": s, "bin": k, "count": n}
+                for (b, c, s, k), n in counts.items()
+            ]
+        )
+        stmt = stmt.on_duplicate_key_update(count=RecordSketchHour.count + stmt.inserted.count)
+        await session.execute(stmt)
+
+    @staticmethod
+    async def recompute(
+        session: AsyncSession,
+        start: datetime,
+        end: datetime,
+        category: str | None = None,
+    ) -> None:
+        """Rebuilds every hour containing an instant in [start, end] from raw rows."""
+        lo = floor_dt(start, SKETCH_SECONDS)
+        hi = floor_dt(end, SKETCH_SECONDS) + timedelta(seconds=SKETCH_SECONDS)
+
+        sketch_filters = [RecordSketchHour.bucket_start >= lo, RecordSketchHour.bucket_start < hi]
+        raw_filters = [DataRecord.timestamp >= lo, DataRecord.timestamp < hi]
+        if category is not None:
+            sketch_filters.append(RecordSketchHour.category == category)
+            raw_filters.append(DataRecord.category == category)
+
+        await session.execute(delete(RecordSketchHour).where(*sketch_filters))
+
+        bucket = bucket_expr(DataRecord.timestamp, SKETCH_SECONDS)
+        sign, index = QuantileService._sql_keys(DataRecord.value, QuantileService.new_sketch().ln_gamma)
+        source = (
+            select(bucket, DataRecord.category, sign, index, func.count())
+            .where(*raw_filters)
+            .group_by(bucket, DataRecord.category, sign, index)
+        )
+        await session.execute(
+            insert(RecordSketchHour).from_select(["bucket_start", "category", "sign", "bin", "count"], source)
+        )
+
+    @staticmethod
+    async def purge_before(session: AsyncSession, cutoff: datetime) -> None:
+        await session.execute(delete(RecordSketchHour).where(RecordSketchHour.bucket_start < as_db_time(cutoff)))
+
+    @staticmethod
+    async def _sketch_bins(session, lo, hi, category) -> list:
+        stmt = select(
+            RecordSketchHour.category,
+            RecordSketchHour.sign,
+            RecordSketchHour.bin,
+            func.sum(RecordSketchHour.count),
+        ).group_by(RecordSketchHour.category, RecordSketchHour.sign, RecordSketchHour.bin)
+        if lo is not None:
+            stmt = stmt.where(RecordSketchHour.bucket_start >= lo)
+        if hi is not None:
+            stmt = stmt.where(RecordSketchHour.bucket_start < hi)
+        if category:
+            stmt = stmt.where(RecordSketchHour.category == category)
+        return (await session.execute(stmt)).all()
+
+    @staticmethod
+    async def _raw_bins(session, lo, hi, category, inclusive: bool) -> list:
+        sign, index = QuantileService._sql_keys(DataRecord.value, QuantileService.new_sketch().ln_gamma)
+        upper = DataRecord.timestamp <= hi if inclusive else DataRecord.timestamp < hi
+        stmt = (
+            select(DataRecord.category, sign, index, func.count())
+            .where(DataRecord.timestamp >= lo, upper)
+            .group_by(DataRecord.category, sign, index)
+        )
+        if category:
+            stmt = stmt.where(DataRecord.category == category)
+        return (await session.execute(stmt)).all()
+
+    @staticmethod
+    async def quantiles(
+        session: AsyncSession,
+        qs: list[float],
+        start_time: datetime | None,
+        end_time: datetime | None,
+        category: str | None,
+    ) -> dict:
+        start = as_db_time(start_time) if start_time else None
+        end = as_db_time(end_time) if end_time else None
+        if start is not None and end is not None and start > end:
+            raise ValueError("start_time must be before end_time")
+
+        per_category, overall = await QuantileService.sketches(session, start, end, category)
+        return {
+            "relative_accuracy": overall.alpha,
+            "quantiles": qs,
+            "start_time": start,
+            "end_time": end,
+            "overall": {"category": category, "count": overall.count, "values": overall.quantiles(qs)},
+            "by_category": [
+                {"category": cat, "count": sketch.count, "values": sketch.quantiles(qs)}
+                for cat, sketch in sorted(per_category.items())
+                if sketch.count
+            ],
+        }
+
+    @staticmethod
+    async def sketches(
+        session: AsyncSession,
+        start: datetime | None,
+        end: datetime | None,
+        category: str | None,
+    ) -> tuple[dict[str, DDSketch], DDSketch]:
+        """Returns the merged sketch per category and overall for [start, end] (naive UTC bounds)."""
+        # NOTE:
+        # - Whole hours come from the sketch table; [start, first hour) and [last hour, end] from raw rows.
+        lo = None
+        if start is not None:
+            lo = floor_dt(start, SKETCH_SECONDS)
+            if lo < start:
+                lo += timedelta(seconds=SKETCH_SECONDS)
+        hi = floor_dt(end, SKETCH_SECONDS) if end is not None else None
+
+        rows = []
+        if lo is not None and hi is not None and lo >= hi:
+            rows += await QuantileService._raw_bins(session, start, end, category, inclusive=True)
+        else:
+            rows += await QuantileService._sketch_bins(session, lo, hi, category)
+            if start is not None and start < lo:
+                rows += await QuantileService._raw_bins(session, start, lo, category, inclusive=False)
+            if end is not None:
+                rows += await QuantileService._raw_bins(session, hi, end, category, inclusive=True)
+
+        per_category: dict[str, DDSketch] = {}
+        overall = QuantileService.new_sketch()
+        for cat, sign, index, n in rows:
+            sketch = per_category.get(str(cat))
+            if sketch is None:
+                sketch = per_category[str(cat)] = QuantileService.new_sketch()
+            sketch.add_bin(int(sign), int(index), int(n or 0))
+            overall.add_bin(int(sign), int(index), int(n or 0))
+        return per_category, overall
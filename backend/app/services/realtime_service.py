@@ -1,18 +1,72 @@
 import asyncio
 import random
-from dataclasses import dataclass
+import time
+from collections import deque
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any
 
+from app.core import metrics
 from app.core.config import settings
-from app.services.record_service import RecordService
+from app.services.anomaly_service import AnomalyService
+from app.services.window_service import live_windows
 
 
 @dataclass
 class FlushStats:
+    """
+    Outcome of the batch flush loop: the last flush, a bounded history ring and event counters.
+
+    Design considerations:
+    - The ring keeps non-empty flushes only; empty ticks would push real flushes out every interval.
+    - retry is the number of consecutive failed flushes before an attempt, so a run of failures
+      and the flush that finally drains the backlog are easy to spot.
+    - persisted/requeued only grow; buffer drops are counted by RealtimeBuffer, where they happen.
+    """
+
     last_flush_time: datetime | None = None
     last_flush_count: int = 0
     last_flush_success: bool = True
+    history: deque = field(default_factory=lambda: deque(maxlen=int(settings.FLUSH_HISTORY_SIZE)))
+    persisted: int = 0
+    requeued: int = 0
+    consecutive_failures: int = 0
+
+    def record(
+        self, started: datetime, ended: datetime, rows: int, size_bytes: int, error: Exception | None = None
+    ) -> None:
+        self.last_flush_time = ended
+        self.last_flush_count = rows
+        self.last_flush_success = error is None
+        if not rows:
+            return
+        self.history.append(
+            {
+                "started_at": started,
+                "ended_at": ended,
+                "rows": rows,
+                "bytes": size_bytes,
+                "duration_ms": round((ended - started).total_seconds() * 1000, 1),
+                "retry": self.consecutive_failures,
+                "success": error is None,
+                "error": type(error).__name__ if error is not None else None,
+            }
+        )
+        if error is None:
+            self.persisted += rows
+            self.consecutive_failures = 0
+        else:
+            self.requeued += rows
+            self.consecutive_failures += 1
+
+    def snapshot(self, dropped: int) -> dict:
+        return {
+            "persisted": self.persisted,
+            "requeued": self.requeued,
+            "dropped": dropped,
+            "consecutive_failures": self.consecutive_failures,
+            "history": list(self.history),
+        }
 
 
 class RealtimeBuffer:
@@ -22,21 +76,35 @@ class RealtimeBuffer:
     Design considerations:
     - Uses an asyncio Lock to protect concurrent access in async runtime.
     - Applies an upper bound to reduce memory risk under DB outages.
+    - Every dropped event is counted (dropped, buffer_dropped_total), so data loss is visible.
     """
 
     def __init__(self, max_size: int):
         self._items: list[dict[str, Any]] = []
         self._lock = asyncio.Lock()
         self._max_size = max_size
+        self.dropped = 0
+
+    def _trim(self) -> None:
+        # NOTE:
+        # - Drop strategy is used to prevent unbounded memory growth; the oldest events go first.
+        # - For production, consider persisting to a durable queue.
+        excess = len(self._items) - self._max_size
+        if excess > 0:
+            del self._items[:excess]
+            self.dropped += excess
+            metrics.buffer_dropped.inc(excess)
 
     async def add(self, item: dict[str, Any]) -> None:
         async with self._lock:
-            if len(self._items) >= self._max_size:
-                # NOTE:
-                # - Drop strategy is used to prevent unbounded memory growth.
-                # - For production, consider persisting to a durable queue.
-                self._items.pop(0)
             self._items.append(item)
+            self._trim()
+
+    async def requeue(self, items: list[dict[str, Any]]) -> None:
+        """Puts a failed batch back ahead of newer events, keeping arrival order for the retry."""
+        async with self._lock:
+            self._items[:0] = items
+            self._trim()
 
     async def drain(self) -> list[dict[str, Any]]:
         async with self._lock:
@@ -48,6 +116,11 @@ class RealtimeBuffer:
         async with self._lock:
             return len(self._items)
 
+    @property
+    def depth(self) -> int:
+        """Lock-free read for metrics scrapes; len() of a list is atomic on the event loop."""
+        return len(self._items)
+
 
 class WebSocketBroadcaster:
     """
@@ -68,22 +141,31 @@ class WebSocketBroadcaster:
 
     async def remove(self, websocket) -> None:
         async with self._lock:
-            self._connections.discard(websocket)
+            if websocket in self._connections:
+                self._connections.discard(websocket)
+                metrics.ws_disconnects.inc()
 
     async def count(self) -> int:
         async with self._lock:
             return len(self._connections)
 
-    async def broadcast(self, payload: dict) -> None:
+    @property
+    def clients(self) -> int:
+        return len(self._connections)
+
+    async def broadcast(self, payload: dict, event: str = "realtime_data") -> None:
         async with self._lock:
             conns = list(self._connections)
 
         dead = []
+        message = {"event": event, "data": payload}
         for ws in conns:
+            started = time.perf_counter()
             try:
-                await ws.send_json({"event": "realtime_data", "data": payload})
+                await ws.send_json(message)
             except Exception:
                 dead.append(ws)
+            metrics.ws_send_duration.observe(time.perf_counter() - started)
 
         for ws in dead:
             await self.remove(ws)
@@ -119,14 +201,18 @@ class RealtimeGenerator:
                 "value": value,
                 "category": cat,
                 "timestamp": ts.isoformat(),
-                "is_anomaly": RecordService.is_anomaly(value),
+                "is_anomaly": AnomalyService.observe(cat, "realtime_sensor", value),
                 "source": "generator",
             }
 
             # NOTE:
             # - Same event is sent to WS and buffered for batch persistence.
+            # - Sliding-window stats are updated from the same event and pushed alongside it.
             await broadcaster.broadcast(payload)
             await self._buffer.add(payload)
+            metrics.generator_events.inc()
+            live_windows.add(cat, value, payload["is_anomaly"], ts)
+            await broadcaster.broadcast(live_windows.snapshot(ts), event="window_stats")
 
             await asyncio.sleep(int(settings.GENERATOR_INTERVAL_SECONDS))
 
@@ -1,8 +1,60 @@
+import logging
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from sqlalchemy import select, func, and_, desc, asc
+from typing import Callable, NamedTuple
+
+from sqlalchemy import select, update, delete, func, case, and_, desc, asc, join, Row
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.record import DataRecord
+from app.models.record import DataRecord, EncodedRecord
+from app.models.anomaly_event import AnomalyEvent
 from app.core.config import settings
+from app.db.partitioning import as_db_time
+from app.db.replicas import db_route
+from app.services.rollup_service import RollupService
+from app.services.anomaly_service import AnomalyService
+from app.services.anomaly_event_service import AnomalyEventService
+from app.services.dictionary_service import record_dictionary
+from app.services.singleflight_service import query_flights
+
+
+# NOTE:
+# - Listing reads select these columns as plain rows instead of hydrating ORM instances.
+# - Order and names match RecordOut, so rows can be serialized without re-validation.
+RECORD_COLUMNS = (
+    DataRecord.id,
+    DataRecord.title,
+    DataRecord.value,
+    DataRecord.category,
+    DataRecord.timestamp,
+    DataRecord.is_anomaly,
+    DataRecord.created_by,
+)
+
+logger = logging.getLogger("realtime-monitoring")
+
+
+class RecordPoint(NamedTuple):
+    id: int | None
+    category: str
+    value: float
+    timestamp: datetime
+
+
+@dataclass
+class RecordWriteEvent:
+    """
+    Describes a committed change to data_records for in-process consumers.
+
+    - added/removed carry exact values when the write path knows them.
+    - stale_categories lists categories changed by set-based statements whose rows were not read back.
+    - stale_all marks changes that may touch any category, such as dropped partitions.
+    """
+
+    added: list[RecordPoint] = field(default_factory=list)
+    removed: list[RecordPoint] = field(default_factory=list)
+    stale_categories: set[str] = field(default_factory=set)
+    stale_all: bool = False
+    is_insert: bool = False
 
 
 class RecordService:
@@ -12,11 +64,37 @@ class RecordService:
     Design considerations:
     - Centralizes query construction to improve readability and testability.
     - Applies anomaly rule consistently across all write paths.
+    - Publishes a RecordWriteEvent after every commit so in-memory state can follow the table.
+    - With dictionary encoding, DataRecord maps the decoded view; writes target EncodedRecord
+      with names encoded by record_dictionary, reads are unchanged.
     """
 
+    _listeners: list[Callable[[RecordWriteEvent], None]] = []
+
+    @staticmethod
+    def add_listener(listener: Callable[[RecordWriteEvent], None]) -> None:
+        RecordService._listeners.append(listener)
+
+    @staticmethod
+    def notify(event: RecordWriteEvent) -> None:
+        # NOTE:
+        # - Listeners run after the commit; a failing listener must never fail the write itself.
+        for listener in RecordService._listeners:
+            try:
+                listener(event)
+            except Exception:
+                logger.exception("Record write listener failed")
+
     @staticmethod
-    def is_anomaly(value: float) -> bool:
-        return value > float(settings.ALERT_THRESHOLD)
+    def _point(record: DataRecord) -> RecordPoint:
+        return RecordPoint(record.id, record.category, float(record.value), record.timestamp)
+
+    @staticmethod
+    async def _add_all(session: AsyncSession, records: list[DataRecord]) -> None:
+        if record_dictionary.enabled:
+            await record_dictionary.insert(session, records)
+        else:
+            session.add_all(records)
 
     @staticmethod
     async def create(
@@ -33,12 +111,18 @@ class RecordService:
             value=value,
             category=category,
             timestamp=ts,
-            is_anomaly=RecordService.is_anomaly(value),
+            is_anomaly=AnomalyService.observe(category, title, value),
             created_by=created_by,
         )
-        session.add(record)
+        await RecordService._add_all(session, [record])
+        await session.flush()
+        await RollupService.apply_inserts(session, [record])
         await session.commit()
-        await session.refresh(record)
+        if record_dictionary.enabled:
+            record = await RecordService.get_by_id(session, record.id)
+        else:
+            await session.refresh(record)
+        RecordService.notify(RecordWriteEvent(added=[RecordService._point(record)], is_insert=True))
         return record
 
     @staticmethod
@@ -48,22 +132,72 @@ class RecordService:
 
     @staticmethod
     async def update(session: AsyncSession, record: DataRecord, **changes) -> DataRecord:
-        for k, v in changes.items():
-            if v is None:
-                continue
-            setattr(record, k, v)
-
-        if "value" in changes and changes["value"] is not None:
-            record.is_anomaly = RecordService.is_anomaly(float(changes["value"]))
+        old_key = (record.timestamp, record.category, record.title)
+        old_point = RecordService._point(record)
+        values = {k: v for k, v in changes.items() if v is not None}
+        new_key = (
+            values.get("timestamp", record.timestamp),
+            values.get("category", record.category),
+            values.get("title", record.title),
+        )
+        if "value" in values:
+            values["is_anomaly"] = AnomalyService.peek(new_key[1], new_key[2], float(values["value"]))
 
+        if record_dictionary.enabled:
+            await session.execute(
+                update(EncodedRecord)
+                .where(EncodedRecord.id == record.id)
+                .values(**await record_dictionary.encode(values))
+            )
+        else:
+            for k, v in values.items():
+                setattr(record, k, v)
+            await session.flush()
+        await RollupService.recompute(session, old_key[0], old_key[0], old_key[1], old_key[2])
+        if new_key != old_key:
+            await RollupService.recompute(session, new_key[0], new_key[0], new_key[1], new_key[2])
         await session.commit()
         await session.refresh(record)
+        RecordService.notify(RecordWriteEvent(added=[RecordService._point(record)], removed=[old_point]))
         return record
 
     @staticmethod
     async def delete(session: AsyncSession, record: DataRecord) -> None:
-        await session.delete(record)
+        ts, category, title = record.timestamp, record.category, record.title
+        point = RecordService._point(record)
+        if record_dictionary.enabled:
+            session.expunge(record)
+            await session.execute(delete(EncodedRecord).where(EncodedRecord.id == record.id))
+        else:
+            await session.delete(record)
+        await session.flush()
+        await RollupService.recompute(session, ts, ts, category, title)
         await session.commit()
+        RecordService.notify(RecordWriteEvent(removed=[point]))
+
+    @staticmethod
+    def build_filters(
+        category: str | None = None,
+        is_anomaly: bool | None = None,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        created_by: int | None = None,
+        title: str | None = None,
+    ) -> list:
+        filters = []
+        if category:
+            filters.append(DataRecord.category == category)
+        if title:
+            filters.append(DataRecord.title == title)
+        if is_anomaly is not None:
+            filters.append(DataRecord.is_anomaly == is_anomaly)
+        if start_time:
+            filters.append(DataRecord.timestamp >= as_db_time(start_time))
+        if end_time:
+            filters.append(DataRecord.timestamp <= as_db_time(end_time))
+        if created_by is not None:
+            filters.append(DataRecord.created_by == created_by)
+        return filters
 
     @staticmethod
     async def list_records(
@@ -77,18 +211,45 @@ class RecordService:
         sort_by: str,
         order: str,
         created_by: int | None = None,
-    ) -> tuple[list[DataRecord], int]:
-        filters = []
-        if category:
-            filters.append(DataRecord.category == category)
-        if is_anomaly is not None:
-            filters.append(DataRecord.is_anomaly == is_anomaly)
-        if start_time:
-            filters.append(DataRecord.timestamp >= start_time)
-        if end_time:
-            filters.append(DataRecord.timestamp <= end_time)
-        if created_by is not None:
-            filters.append(DataRecord.created_by == created_by)
+    ) -> tuple[list[Row], int]:
+        """
+        Returns one page of records as column rows plus the total match count.
+
+        Design considerations:
+        - Selects plain columns so no identity map or instance state is built per row.
+        - Rows keep attribute access (row.id, row.timestamp) for callers such as the Excel export.
+        - Identical concurrent listings share one count + page execution (rows are immutable).
+        - is_anomaly=true is answered from the anomaly_events side table.
+        """
+        key = (
+            "records",
+            page,
+            size,
+            category or None,
+            is_anomaly,
+            as_db_time(start_time) if start_time else None,
+            as_db_time(end_time) if end_time else None,
+            sort_by,
+            order.lower(),
+            created_by,
+        )
+        return await query_flights.run(
+            (db_route(session), key),
+            lambda: RecordService._list_records(
+                session, page, size, category, is_anomaly, start_time, end_time, sort_by, order, created_by
+            ),
+        )
+
+    @staticmethod
+    async def _list_records(
+        session, page, size, category, is_anomaly, start_time, end_time, sort_by, order, created_by
+    ) -> tuple[list[Row], int]:
+        if is_anomaly:
+            return await RecordService._list_anomalies(
+                session, page, size, category, start_time, end_time, sort_by, order, created_by
+            )
+
+        filters = RecordService.build_filters(category, is_anomaly, start_time, end_time, created_by)
 
         where_clause = and_(*filters) if filters else None
 
@@ -106,12 +267,47 @@ class RecordService:
             count_stmt = count_stmt.where(where_clause)
         total = (await session.execute(count_stmt)).scalar_one()
 
-        stmt = select(DataRecord)
+        stmt = select(*RECORD_COLUMNS)
         if where_clause is not None:
             stmt = stmt.where(where_clause)
         stmt = stmt.order_by(sort_expr).offset((page - 1) * size).limit(size)
 
-        items = (await session.execute(stmt)).scalars().all()
+        items = (await session.execute(stmt)).all()
+        return items, int(total)
+
+    @staticmethod
+    async def _list_anomalies(
+        session, page, size, category, start_time, end_time, sort_by, order, created_by
+    ) -> tuple[list[Row], int]:
+        # NOTE:
+        # - Filters, sorting and paging run on the narrow table and its indexes; only the page's rows
+        #   are joined back to data_records. created_by is the one filter that needs the join earlier.
+        filters = AnomalyEventService.filters(category, start_time, end_time)
+        if created_by is not None:
+            filters.append(DataRecord.created_by == created_by)
+        joined = join(AnomalyEvent, DataRecord, DataRecord.id == AnomalyEvent.record_id)
+
+        sort_map = {
+            "timestamp": AnomalyEvent.timestamp,
+            "value": AnomalyEvent.value,
+            "category": AnomalyEvent.category,
+            "id": AnomalyEvent.record_id,
+        }
+        sort_col = sort_map.get(sort_by, AnomalyEvent.timestamp)
+        sort_expr = desc(sort_col) if order.lower() == "desc" else asc(sort_col)
+
+        count_stmt = select(func.count()).select_from(joined if created_by is not None else AnomalyEvent)
+        total = (await session.execute(count_stmt.where(*filters))).scalar_one()
+
+        stmt = (
+            select(*RECORD_COLUMNS)
+            .select_from(joined)
+            .where(*filters)
+            .order_by(sort_expr)
+            .offset((page - 1) * size)
+            .limit(size)
+        )
+        items = (await session.execute(stmt)).all()
         return items, int(total)
 
     @staticmethod
@@ -122,23 +318,137 @@ class RecordService:
         Design considerations:
         - Avoids raw SQL to comply with requirements.
         - Uses a single transaction commit to reduce overhead.
+        - Folds the batch into the rollup tables inside the same transaction.
+        - Rows that already carry is_anomaly (scored upstream, e.g. by the generator) keep it;
+          the rest are scored together with the batch detector path.
         """
         now = datetime.now(timezone.utc)
         objects = []
         for row in rows:
-            ts = row.get("timestamp") or now
-            value = float(row["value"])
             objects.append(
                 DataRecord(
                     title=str(row["title"]),
-                    value=value,
+                    value=float(row["value"]),
                     category=str(row["category"]),
-                    timestamp=ts,
-                    is_anomaly=RecordService.is_anomaly(value),
+                    timestamp=row.get("timestamp") or now,
+                    is_anomaly=row.get("is_anomaly"),
                     created_by=created_by,
                 )
             )
 
-        session.add_all(objects)
+        unscored = [o for o in objects if o.is_anomaly is None]
+        if unscored:
+            flags = AnomalyService.observe_batch([(o.category, o.title, o.value, o.timestamp) for o in unscored])
+            for o, flag in zip(unscored, flags):
+                o.is_anomaly = flag
+
+        await RecordService._add_all(session, objects)
+        await RollupService.apply_inserts(session, objects)
         await session.commit()
+        RecordService.notify(RecordWriteEvent(added=[RecordService._point(o) for o in objects], is_insert=True))
         return len(objects)
+
+    @staticmethod
+    async def _run_chunked(
+        session: AsyncSession,
+        filters: list,
+        chunk_size: int,
+        make_stmt,
+        rekey: dict | None = None,
+    ) -> tuple[int, int]:
+        """
+        Runs a set-based statement over keyset chunks of the matching rows.
+
+        Design considerations:
+        - Each chunk is the next chunk_size matching ids after the previous chunk (id > last ORDER BY id
+          LIMIT n), so a selective filter over a sparse id range costs one query per non-empty chunk,
+          and rows an UPDATE moves out of or into the filter are neither skipped nor revisited.
+        - Each chunk touches a bounded slice and holds locks briefly.
+        - Commits per chunk; an interrupted run leaves a consistent prefix and can simply be re-issued.
+        - Rollup buckets touched by a chunk are rebuilt in the same transaction as the statement.
+        - make_stmt(table, where) gets the chunk's ids, on DataRecord or, when dictionary encoded,
+          on EncodedRecord (MariaDB cannot delete through a join view).
+        """
+        affected = 0
+        chunks = 0
+        last = None
+        while True:
+            stmt = select(DataRecord.id).where(*filters).order_by(DataRecord.id.asc()).limit(chunk_size)
+            if last is not None:
+                stmt = stmt.where(DataRecord.id > last)
+            ids = (await session.execute(stmt)).scalars().all()
+            if not ids:
+                break
+            last = ids[-1]
+
+            groups = await RollupService.affected_groups(session, [DataRecord.id.in_(ids)])
+            table = EncodedRecord if record_dictionary.enabled else DataRecord
+            stmt = make_stmt(table, [table.id.in_(ids)])
+            result = await session.execute(stmt.execution_options(synchronize_session=False))
+            stale = set()
+            for category, title, ts_min, ts_max in groups:
+                stale.add(category)
+                await RollupService.recompute(session, ts_min, ts_max, category, title)
+                if rekey:
+                    new_category = rekey.get("category") or category
+                    new_title = rekey.get("title") or title
+                    stale.add(new_category)
+                    if (new_category, new_title) != (category, title):
+                        await RollupService.recompute(session, ts_min, ts_max, new_category, new_title)
+
+            await session.commit()
+            RecordService.notify(RecordWriteEvent(stale_categories=stale))
+            affected += int(result.rowcount or 0)
+            chunks += 1
+            if len(ids) < chunk_size:
+                break
+        return affected, chunks
+
+    @staticmethod
+    async def _anomaly_expr(value: float, values: dict):
+        """is_anomaly for a set-based value change: a constant, or a CASE over the detector key."""
+        flags, default = AnomalyService.peek_all(value)
+        kind = "title" if settings.ANOMALY_STATE_KEY == "title" else "category"
+        new_key = values.get(kind)
+        if new_key is not None:
+            return flags.get(new_key, default)
+        if all(flag == default for flag in flags.values()):
+            return default
+        if record_dictionary.enabled:
+            codes = await record_dictionary.ids(kind, flags)
+            coded = {codes[k]: flag for k, flag in flags.items()}
+            return case(coded, value=getattr(EncodedRecord, f"{kind}_id"), else_=default)
+        return case(flags, value=getattr(DataRecord, kind), else_=default)
+
+    @staticmethod
+    async def bulk_update(session: AsyncSession, filters: list, values: dict, chunk_size: int) -> tuple[int, int]:
+        """
+        Applies the same column changes to every matching record.
+
+        Recomputes is_anomaly in the same statement when value changes, per detector key.
+        """
+        values = {k: v for k, v in values.items() if v is not None}
+        if "value" in values:
+            values["value"] = float(values["value"])
+            values["is_anomaly"] = await RecordService._anomaly_expr(values["value"], values)
+        if not values:
+            return 0, 0
+        stmt_values = await record_dictionary.encode(values) if record_dictionary.enabled else values
+
+        return await RecordService._run_chunked(
+            session,
+            filters,
+            chunk_size,
+            lambda table, where: update(table).where(*where).values(**stmt_values),
+            rekey=values,
+        )
+
+    @staticmethod
+    async def bulk_delete(session: AsyncSession, filters: list, chunk_size: int) -> tuple[int, int]:
+        """Deletes every matching record in keyset chunks of primary keys."""
+        return await RecordService._run_chunked(
+            session,
+            filters,
+            chunk_size,
+            lambda table, where: delete(table).where(*where),
+        )
@@ -0,0 +1,291 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update, func, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.db.timebucket import floor_dt
+from app.models.record import DICTIONARY_ENCODED, DataRecord, EncodedRecord
+from app.models.rescore_job import RescoreJob
+from app.services.anomaly_service import AnomalyService, build_detector
+from app.services.log_service import LogService
+from app.services.record_service import RecordService, RecordWriteEvent
+from app.services.rollup_service import RollupService
+
+
+logger = logging.getLogger("realtime-monitoring")
+
+# NOTE:
+# - Flags are written to the physical table; with dictionary encoding DataRecord maps a read-only view.
+_FLAG_TABLE = EncodedRecord if DICTIONARY_ENCODED else DataRecord
+# - Rollups of changed rows are rebuilt per hour, the coarsest rollup bucket; an hour's minute buckets
+#   are rebuilt with it.
+_REBUILD_SECONDS = 3600
+
+
+class RescoreService:
+    """
+    Recomputes is_anomaly across data_records as a background job.
+
+    Design considerations:
+    - Walks rows in (timestamp, id) keyset order, so stateful detectors replay history in event
+      order and each chunk is an index range scan regardless of how far the job has progressed.
+    - Only rows whose flag changes are written, with two set-based UPDATEs per chunk
+      (id IN ... set true / set false).
+    - Rollups are rebuilt once per (hour, category) holding changed rows, when the cursor has moved
+      past that hour or at the end of the job, instead of once per chunk; a resumed job also rebuilds
+      the hour it stopped in, whose pending rebuilds were lost with the process.
+    - Each chunk commits its UPDATEs together with the cursor and replayed detector state,
+      so a job interrupted by a restart resumes after the last applied chunk.
+    - Throttled to RESCORE_DUTY_CYCLE: after a chunk that took t seconds the job sleeps
+      t * (1 - duty) / duty, leaving the pool and the DB to the flush loop in between.
+    - Every commit that changes flags or rebuilds rollups publishes a RecordWriteEvent for the
+      categories involved, so caches and listeners follow the same contract as other write paths.
+    - One job runs at a time; job rows are the source of truth, so status survives restarts.
+    """
+
+    _tasks: dict[int, asyncio.Task] = {}
+    _cancelled: set[int] = set()
+    # NOTE:
+    # - Serializes the running check and the insert in create(); two requests could otherwise both see
+    #   no running job. Per process, like the task registry above.
+    _create_lock = asyncio.Lock()
+
+    @staticmethod
+    def to_dict(job: RescoreJob) -> dict:
+        percent = None
+        if job.rows_total:
+            percent = round(min(job.rows_scanned / job.rows_total, 1.0) * 100, 2)
+        elif job.status == "completed":
+            percent = 100.0
+        return {
+            "job_id": job.id,
+            "status": job.status,
+            "detector": job.detector,
+            "rows_total": job.rows_total,
+            "rows_scanned": job.rows_scanned,
+            "rows_changed": job.rows_changed,
+            "chunks": job.chunks,
+            "percent": percent,
+            "cursor_ts": job.cursor_ts,
+            "error": job.error,
+            "created_by": job.created_by,
+            "created_at": job.created_at,
+            "updated_at": job.updated_at,
+            "finished_at": job.finished_at,
+        }
+
+    @staticmethod
+    async def get(session: AsyncSession, job_id: int) -> RescoreJob | None:
+        return (await session.execute(select(RescoreJob).where(RescoreJob.id == job_id))).scalar_one_or_none()
+
+    @staticmethod
+    async def recent(session: AsyncSession, limit: int = 20) -> list[RescoreJob]:
+        stmt = select(RescoreJob).order_by(RescoreJob.id.desc()).limit(limit)
+        return list((await session.execute(stmt)).scalars().all())
+
+    @classmethod
+    async def create(cls, session: AsyncSession, created_by: int) -> RescoreJob:
+        async with cls._create_lock:
+            running = await session.execute(select(RescoreJob.id).where(RescoreJob.status == "running"))
+            if running.first() is not None:
+                raise ValueError("A rescore job is already running")
+
+            total = (await session.execute(select(func.count()).select_from(DataRecord))).scalar_one()
+            job = RescoreJob(
+                status="running",
+                detector=AnomalyService.detector.name,
+                rows_total=int(total),
+                rows_scanned=0,
+                rows_changed=0,
+                chunks=0,
+                created_by=created_by,
+            )
+            session.add(job)
+            await session.commit()
+            await session.refresh(job)
+        cls.start(job.id)
+        return job
+
+    @classmethod
+    async def cancel(cls, session: AsyncSession, job: RescoreJob) -> RescoreJob:
+        if job.status != "running":
+            raise ValueError(f"Job is {job.status}")
+        cls._cancelled.add(job.id)
+        if job.id not in cls._tasks:
+            # NOTE:
+            # - No task in this process (e.g. it never resumed); finalize the row directly.
+            job.status = "cancelled"
+            job.finished_at = datetime.now(timezone.utc)
+            await session.commit()
+        return job
+
+    @classmethod
+    def start(cls, job_id: int) -> None:
+        if job_id in cls._tasks:
+            return
+        task = asyncio.create_task(cls._run(job_id))
+        cls._tasks[job_id] = task
+        task.add_done_callback(lambda _: cls._tasks.pop(job_id, None))
+
+    @classmethod
+    async def resume_pending(cls) -> list[int]:
+        async with AsyncSessionLocal() as session:
+            ids = (await session.execute(select(RescoreJob.id).where(RescoreJob.status == "running"))).scalars().all()
+        for job_id in ids:
+            cls.start(job_id)
+        return list(ids)
+
+    @classmethod
+    def shutdown(cls) -> None:
+        # NOTE:
+        # - Cancelled tasks leave their rows "running", so they resume on the next start.
+        for task in list(cls._tasks.values()):
+            task.cancel()
+
+    @staticmethod
+    def _after_cursor(job: RescoreJob) -> list:
+        if job.cursor_ts is None:
+            return []
+        return [
+            or_(
+                DataRecord.timestamp > job.cursor_ts,
+                and_(DataRecord.timestamp == job.cursor_ts, DataRecord.id > job.cursor_id),
+            )
+        ]
+
+    @staticmethod
+    async def _rebuild(session: AsyncSession, pending: dict[tuple, set], before: datetime | None = None) -> list:
+        """
+        Rebuilds the pending (hour, category) rollups whose hour starts before `before` (all when None).
+
+        A None category stands for every category of that hour; the title filter is only used when a
+        single title changed in the hour. Returns the rebuilt keys; the caller drops them from pending
+        once the transaction commits, so a rolled-back rebuild is retried.
+        """
+        done = [k for k in pending if before is None or k[0] < before]
+        for hour, category in done:
+            titles = pending[(hour, category)]
+            end = hour + timedelta(seconds=_REBUILD_SECONDS) - timedelta(microseconds=1)
+            title = next(iter(titles)) if len(titles) == 1 else None
+            await RollupService.recompute(session, hour, end, category, title)
+        return done
+
+    @staticmethod
+    def _notify(categories: set) -> None:
+        """Publishes a committed change; a None category (a resumed job's first hour) means all of them."""
+        if categories:
+            RecordService.notify(RecordWriteEvent(stale_categories=categories - {None}, stale_all=None in categories))
+
+    @classmethod
+    async def _run(cls, job_id: int) -> None:
+        chunk_size = max(int(settings.RESCORE_CHUNK_SIZE), 1)
+        duty = min(max(float(settings.RESCORE_DUTY_CYCLE), 0.05), 1.0)
+
+        async with AsyncSessionLocal() as session:
+            job = await cls.get(session, job_id)
+            if job is None or job.status != "running":
+                return
+            pending: dict[tuple, set] = {}
+            if job.cursor_ts is not None:
+                pending[(floor_dt(job.cursor_ts, _REBUILD_SECONDS), None)] = set()
+            try:
+                if job.detector != AnomalyService.detector.name:
+                    raise ValueError(
+                        f"Detector changed from {job.detector} to {AnomalyService.detector.name}; start a new job"
+                    )
+                detector = build_detector()
+                detector.load(job.detector_state or {})
+
+                while job_id not in cls._cancelled:
+                    t0 = time.monotonic()
+                    rows = (
+                        await session.execute(
+                            select(
+                                DataRecord.id,
+                                DataRecord.category,
+                                DataRecord.title,
+                                DataRecord.value,
+                                DataRecord.timestamp,
+                                DataRecord.is_anomaly,
+                            )
+                            .where(*cls._after_cursor(job))
+                            .order_by(DataRecord.timestamp.asc(), DataRecord.id.asc())
+                            .limit(chunk_size)
+                        )
+                    ).all()
+                    if not rows:
+                        break
+
+                    flags = AnomalyService.observe_batch(
+                        [(r.category, r.title, float(r.value), r.timestamp) for r in rows], detector
+                    )
+                    changed = [(r, flag) for r, flag in zip(rows, flags) if flag != bool(r.is_anomaly)]
+                    for flag in (True, False):
+                        ids = [r.id for r, f in changed if f is flag]
+                        if ids:
+                            await session.execute(
+                                update(_FLAG_TABLE).where(_FLAG_TABLE.id.in_(ids)).values(is_anomaly=flag)
+                            )
+                    for r, _ in changed:
+                        hour = floor_dt(r.timestamp, _REBUILD_SECONDS)
+                        if (hour, None) not in pending:
+                            pending.setdefault((hour, r.category), set()).add(r.title)
+
+                    job.cursor_ts, job.cursor_id = rows[-1].timestamp, rows[-1].id
+                    # NOTE:
+                    # - Rows come in timestamp order, so hours before the cursor's cannot change again.
+                    rebuilt = await cls._rebuild(session, pending, floor_dt(job.cursor_ts, _REBUILD_SECONDS))
+                    job.detector_state = detector.dump()
+                    job.rows_scanned += len(rows)
+                    job.rows_changed += len(changed)
+                    job.chunks += 1
+                    await session.commit()
+                    for key in rebuilt:
+                        del pending[key]
+                    cls._notify({r.category for r, _ in changed} | {category for _, category in rebuilt})
+
+                    if len(rows) < chunk_size:
+                        break
+                    elapsed = time.monotonic() - t0
+                    await asyncio.sleep(elapsed * (1 - duty) / duty)
+
+                rebuilt = await cls._rebuild(session, pending)
+                job.status = "cancelled" if job_id in cls._cancelled else "completed"
+                job.finished_at = datetime.now(timezone.utc)
+                await session.commit()
+                cls._notify({category for _, category in rebuilt})
+                await LogService.write(
+                    session,
+                    "INFO",
+                    "DB",
+                    f"Anomaly rescore {job.status}",
+                    detail=f"job={job.id}, scanned={job.rows_scanned}, changed={job.rows_changed}",
+                    actor_user_id=job.created_by,
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Anomaly rescore job %s failed: %s", job_id, str(e))
+                await session.rollback()
+                try:
+                    # NOTE:
+                    # - Flags of committed chunks stay changed; their unfinished hours must not keep
+                    #   stale rollups. Rebuilding from raw rows is also correct for the rolled-back chunk.
+                    rebuilt = await cls._rebuild(session, pending)
+                    await session.commit()
+                    cls._notify({category for _, category in rebuilt})
+                except Exception:
+                    logger.exception("Rollup rebuild after failed rescore job %s failed", job_id)
+                    await session.rollback()
+                job = await cls.get(session, job_id)
+                job.status = "failed"
+                job.error = str(e)[:512]
+                job.finished_at = datetime.now(timezone.utc)
+                await session.commit()
+            finally:
+                cls._cancelled.discard(job_id)
@@ -0,0 +1,189 @@
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from sqlalchemy import select, insert, delete, func, case
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.partitioning import as_db_time
+from app.db.timebucket import floor_dt, is_aligned, bucket_expr
+from app.models.record import DataRecord
+from app.models.rollup import RecordRollupMinute, RecordRollupHour
+from app.services.quantile_service import QuantileService
+from app.services.anomaly_event_service import AnomalyEventService
+
+
+# NOTE:
+# - Ordered coarsest first so queries use the smallest table the range alignment allows.
+ROLLUP_TABLES = ((RecordRollupHour, 3600), (RecordRollupMinute, 60))
+
+_STAT_COLUMNS = ("count", "sum", "sum_sq", "min", "max", "anomaly_count")
+
+
+class RollupService:
+    """
+    Maintains per-minute and per-hour rollups of data_records.
+
+    Design considerations:
+    - Inserts are folded in incrementally with an upsert inside the writer's transaction.
+    - Updates and deletes rebuild the affected buckets from raw rows, because min/max cannot be
+      decremented; a bucket is one (minute or hour, category, title), so rebuilds stay small.
+    - Rollups never outlive raw rows: partition retention purges them too, so rollup and raw
+      answers always agree.
+    - Hourly quantile sketches and the anomaly_events side table are maintained alongside,
+      in the same transaction.
+    """
+
+    @staticmethod
+    async def apply_inserts(session: AsyncSession, records: Iterable[DataRecord]) -> None:
+        records = list(records)
+        items = [
+            (as_db_time(r.timestamp), r.category, r.title, float(r.value), bool(r.is_anomaly))
+            for r in records
+        ]
+        if not items:
+            return
+
+        await QuantileService.apply_inserts(session, ((ts, c, v) for ts, c, _, v, _ in items))
+        await AnomalyEventService.apply_inserts(session, records)
+        for model, seconds in ROLLUP_TABLES:
+            agg: dict[tuple, list] = {}
+            for ts, category, title, value, anomaly in items:
+                key = (floor_dt(ts, seconds), category, title)
+                cur = agg.get(key)
+                if cur is None:
+                    agg[key] = [1, value, value * value, value, value, int(anomaly)]
+                else:
+                    cur[0] += 1
+                    cur[1] += value
+                    cur[2] += value * value
+                    cur[3] = min(cur[3], value)
+                    cur[4] = max(cur[4], value)
+                    cur[5] += int(anomaly)
+
+            stmt = mysql_insert(model).values(
+                [
+                    {"bucket_start": b, "category": c, "title": t, **dict(zip(_STAT_COLUMNS, stats))}
+                    for (b, c, t), stats in agg.items()
+                ]
+            )
+            stmt = stmt.on_duplicate_key_update(
+                count=model.count + stmt.inserted.count,
+                sum=model.sum + stmt.inserted.sum,
+                sum_sq=model.sum_sq + stmt.inserted.sum_sq,
+                min=func.least(model.min, stmt.inserted.min),
+                max=func.greatest(model.max, stmt.inserted.max),
+                anomaly_count=model.anomaly_count + stmt.inserted.anomaly_count,
+            )
+            await session.execute(stmt)
+
+    @staticmethod
+    async def recompute(
+        session: AsyncSession,
+        start: datetime,
+        end: datetime,
+        category: str | None = None,
+        title: str | None = None,
+    ) -> None:
+        """
+        Rebuilds every bucket containing an instant in [start, end] from raw rows.
+
+        Buckets that no longer have rows are removed by the preceding DELETE.
+        """
+        await QuantileService.recompute(session, start, end, category)
+        await AnomalyEventService.recompute(session, start, end, category)
+        for model, seconds in ROLLUP_TABLES:
+            lo = floor_dt(start, seconds)
+            hi = floor_dt(end, seconds) + timedelta(seconds=seconds)
+
+            rollup_filters = [model.bucket_start >= lo, model.bucket_start < hi]
+            raw_filters = [DataRecord.timestamp >= lo, DataRecord.timestamp < hi]
+            if category is not None:
+                rollup_filters.append(model.category == category)
+                raw_filters.append(DataRecord.category == category)
+            if title is not None:
+                rollup_filters.append(model.title == title)
+                raw_filters.append(DataRecord.title == title)
+
+            await session.execute(delete(model).where(*rollup_filters))
+
+            bucket = bucket_expr(DataRecord.timestamp, seconds)
+            source = (
+                select(
+                    bucket,
+                    DataRecord.category,
+                    DataRecord.title,
+                    func.count(),
+                    func.sum(DataRecord.value),
+                    func.sum(DataRecord.value * DataRecord.value),
+                    func.min(DataRecord.value),
+                    func.max(DataRecord.value),
+                    func.sum(case((DataRecord.is_anomaly, 1), else_=0)),
+                )
+                .where(*raw_filters)
+                .group_by(bucket, DataRecord.category, DataRecord.title)
+            )
+            await session.execute(
+                insert(model).from_select(["bucket_start", "category", "title", *_STAT_COLUMNS], source)
+            )
+
+    @staticmethod
+    async def affected_groups(session: AsyncSession, filters: list) -> list[tuple]:
+        """Returns (category, title, min_ts, max_ts) for the rows a set-based statement will touch."""
+        stmt = (
+            select(
+                DataRecord.category,
+                DataRecord.title,
+                func.min(DataRecord.timestamp),
+                func.max(DataRecord.timestamp),
+            )
+            .where(*filters)
+            .group_by(DataRecord.category, DataRecord.title)
+        )
+        return [tuple(r) for r in (await session.execute(stmt)).all()]
+
+    @staticmethod
+    async def purge_before(session: AsyncSession, cutoff: datetime) -> None:
+        await QuantileService.purge_before(session, cutoff)
+        await AnomalyEventService.purge_before(session, cutoff)
+        for model, _ in ROLLUP_TABLES:
+            await session.execute(delete(model).where(model.bucket_start < as_db_time(cutoff)))
+
+    @staticmethod
+    def choose(start_time: datetime | None, end_time: datetime | None):
+        """Returns the coarsest (model, seconds) both bounds align to, or None for the raw path."""
+        for model, seconds in ROLLUP_TABLES:
+            if all(t is None or is_aligned(t, seconds) for t in (start_time, end_time)):
+                return model, seconds
+        return None
+
+    @staticmethod
+    async def stats(
+        session: AsyncSession,
+        model,
+        start_time: datetime | None,
+        end_time: datetime | None,
+        category: str | None,
+    ) -> dict[str, list]:
+        """
+        Aggregates whole buckets in [start_time, end_time) per category.
+
+        Returns {category: [count, sum, min, max]}, the same shape as the raw path.
+        """
+        stmt = select(
+            model.category,
+            func.sum(model.count),
+            func.sum(model.sum),
+            func.min(model.min),
+            func.max(model.max),
+        ).group_by(model.category)
+
+        if start_time:
+            stmt = stmt.where(model.bucket_start >= as_db_time(start_time))
+        if end_time:
+            stmt = stmt.where(model.bucket_start < as_db_time(end_time))
+        if category:
+            stmt = stmt.where(model.category == category)
+
+        rows = (await session.execute(stmt)).all()
+        return {str(c): [int(n or 0), float(s or 0.0), mn, mx] for c, n, s, mn, mx in rows}
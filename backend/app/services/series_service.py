@@ -0,0 +1,247 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, func, literal_column
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.partitioning import as_db_time
+from app.db.timebucket import EPOCH
+from app.models.record import DataRecord
+
+
+SERIES_METHODS = ("lttb", "minmax")
+
+_EPOCH_SQL = literal_column("TIMESTAMP '2000-01-01 00:00:00'")
+_MICROSECOND = literal_column("MICROSECOND")
+
+
+class _Lttb:
+    """
+    Streaming Largest-Triangle-Three-Buckets for one category.
+
+    Bucket averages come from a preceding GROUP BY, so each row is scored against the previously
+    selected point and the next non-empty bucket's average as it arrives; only the best row of the
+    current bucket is held, never the bucket itself.
+    """
+
+    def __init__(self, averages: dict[int, tuple[float, float]]):
+        order = sorted(averages)
+        self.next_avg = {b: averages[n] for b, n in zip(order, order[1:])}
+        self.last_avg = averages[order[-1]] if order else None
+        self.xs: list[float] = []
+        self.ys: list[float] = []
+        self.a = None
+        self.bucket = None
+        self.best = None  # (area, x, y)
+        self.last = None
+        self.count = 0
+
+    def _close(self) -> None:
+        if self.best is not None:
+            _, x, y = self.best
+            self.xs.append(x)
+            self.ys.append(y)
+            self.a = (x, y)
+        self.best = None
+
+    def add(self, bucket: int, x: float, y: float) -> None:
+        self.count += 1
+        self.last = (x, y)
+        if self.a is None:
+            self.xs.append(x)
+            self.ys.append(y)
+            self.a = (x, y)
+            return
+        if bucket != self.bucket:
+            self._close()
+            self.bucket = bucket
+        cx, cy = self.next_avg.get(bucket, self.last_avg)
+        ax, ay = self.a
+        area = abs((ax - cx) * (y - ay) - (ax - x) * (cy - ay))
+        if self.best is None or area > self.best[0]:
+            self.best = (area, x, y)
+
+    def finish(self) -> None:
+        self._close()
+        if self.last is not None and (not self.xs or self.xs[-1] != self.last[0]):
+            self.xs.append(self.last[0])
+            self.ys.append(self.last[1])
+
+
+class _MinMax:
+    """Keeps the minimum and maximum row of every bucket (in time order), plus the first and last row."""
+
+    def __init__(self):
+        self.buckets: dict[int, list] = {}  # bucket -> [(x, y) of min, (x, y) of max]
+        self.first = None
+        self.last = None
+        self.count = 0
+
+    def add(self, bucket: int, x: float, y: float) -> None:
+        self.count += 1
+        if self.first is None:
+            self.first = (x, y)
+        self.last = (x, y)
+        cur = self.buckets.get(bucket)
+        if cur is None:
+            self.buckets[bucket] = [(x, y), (x, y)]
+            return
+        if y < cur[0][1]:
+            cur[0] = (x, y)
+        if y > cur[1][1]:
+            cur[1] = (x, y)
+
+    def finish(self) -> None:
+        points = {self.first, self.last} if self.first else set()
+        for lo, hi in self.buckets.values():
+            points.update((lo, hi))
+        ordered = sorted(points)
+        self.xs = [p[0] for p in ordered]
+        self.ys = [p[1] for p in ordered]
+
+
+class SeriesService:
+    """
+    Chart-ready downsampled series per category.
+
+    Design considerations:
+    - Rows are streamed from a server-side cursor in timestamp order and reduced on the fly, so memory
+      is O(categories x points) regardless of how many rows the range holds.
+    - The range is split into equal time buckets. lttb first fetches per-bucket averages with one
+      grouped query, then keeps the row forming the largest triangle with the previous pick and the
+      next bucket's average. minmax keeps each bucket's extremes, so spikes always survive.
+    - With lttb, categories with at most `points` rows are returned unreduced.
+    - x is microseconds since the bucketing epoch, so timestamps round-trip exactly.
+    - Arrays are columnar (timestamps, values) so clients can plot them without reshaping.
+    """
+
+    @staticmethod
+    def resolve_range(start_time: datetime | None, end_time: datetime | None) -> tuple[datetime, datetime]:
+        """Missing bounds default to SERIES_DEFAULT_SPAN_SECONDS ending now."""
+        span = timedelta(seconds=int(settings.SERIES_DEFAULT_SPAN_SECONDS))
+        if end_time is None:
+            end_time = start_time + span if start_time else datetime.now(timezone.utc)
+        if start_time is None:
+            start_time = end_time - span
+        start_time, end_time = as_db_time(start_time), as_db_time(end_time)
+        if start_time > end_time:
+            raise ValueError("start_time must be before end_time")
+        return start_time, end_time
+
+    @staticmethod
+    def _offset_us(column):
+        return func.timestampdiff(_MICROSECOND, _EPOCH_SQL, column)
+
+    @staticmethod
+    def _bucket_sql(start: datetime, width_us: int, buckets: int):
+        # NOTE:
+        # - Mirrors the Python bucketing in downsample(); constants are inlined so the SELECT and
+        #   GROUP BY render the identical expression.
+        start_us = literal_column(str(SeriesService._us(start)))
+        return func.least(
+            func.floor((SeriesService._offset_us(DataRecord.timestamp) - start_us) / literal_column(str(width_us))),
+            literal_column(str(buckets - 1)),
+        )
+
+    @staticmethod
+    def _us(ts: datetime) -> int:
+        return (ts - EPOCH) // timedelta(microseconds=1)
+
+    @staticmethod
+    async def _bucket_averages(session, start, end, category, width_us, buckets) -> dict:
+        idx = SeriesService._bucket_sql(start, width_us, buckets)
+        stmt = (
+            select(
+                DataRecord.category,
+                idx,
+                func.count(),
+                func.avg(SeriesService._offset_us(DataRecord.timestamp)),
+                func.avg(DataRecord.value),
+            )
+            .where(DataRecord.timestamp >= start, DataRecord.timestamp <= end)
+            .group_by(DataRecord.category, idx)
+        )
+        if category:
+            stmt = stmt.where(DataRecord.category == category)
+
+        out: dict[str, dict] = {}
+        for cat, b, n, avg_us, avg_value in (await session.execute(stmt)).all():
+            counts, averages = out.setdefault(str(cat), ({}, {}))
+            counts[int(b)] = int(n)
+            averages[int(b)] = (float(avg_us), float(avg_value))
+        return out
+
+    @staticmethod
+    async def downsample(
+        session: AsyncSession,
+        start_time: datetime | None,
+        end_time: datetime | None,
+        category: str | None,
+        points: int,
+        method: str,
+    ) -> dict:
+        max_points = int(settings.SERIES_MAX_POINTS)
+        if not 3 <= points <= max_points:
+            raise ValueError(f"points must be between 3 and {max_points}")
+        if method not in SERIES_METHODS:
+            raise ValueError(f"method must be one of {', '.join(SERIES_METHODS)}")
+        start, end = SeriesService.resolve_range(start_time, end_time)
+
+        # NOTE:
+        # - lttb keeps first + last + one row per bucket; minmax first + last + up to two rows per bucket.
+        buckets = points - 2 if method == "lttb" else max((points - 2) // 2, 1)
+        start_us = SeriesService._us(start)
+        width_us = max(-(-(SeriesService._us(end) - start_us + 1) // buckets), 1)
+
+        reducers: dict[str, object] = {}
+        if method == "lttb":
+            for cat, (counts, averages) in (
+                await SeriesService._bucket_averages(session, start, end, category, width_us, buckets)
+            ).items():
+                # - Series that already fit are streamed through unreduced.
+                reducers[cat] = _Lttb(averages) if sum(counts.values()) > points else None
+
+        stmt = (
+            select(DataRecord.category, DataRecord.timestamp, DataRecord.value)
+            .where(DataRecord.timestamp >= start, DataRecord.timestamp <= end)
+            .order_by(DataRecord.timestamp.asc(), DataRecord.id.asc())
+            .execution_options(yield_per=int(settings.SERIES_STREAM_CHUNK))
+        )
+        if category:
+            stmt = stmt.where(DataRecord.category == category)
+
+        raw: dict[str, tuple[list, list]] = {}
+        rows = await session.stream(stmt)
+        async for cat, ts, value in rows:
+            cat = str(cat)
+            us = SeriesService._us(as_db_time(ts))
+            x, y = us, float(value)
+            reducer = reducers.get(cat)
+            if reducer is None and method == "minmax":
+                reducer = reducers[cat] = _MinMax()
+            if reducer is None:
+                xs, ys = raw.setdefault(cat, ([], []))
+                xs.append(x)
+                ys.append(y)
+                continue
+            reducer.add(min((us - start_us) // width_us, buckets - 1), x, y)
+
+        series = []
+        for cat in sorted(set(reducers) | set(raw)):
+            reducer = reducers.get(cat)
+            if reducer is not None:
+                reducer.finish()
+                xs, ys, count = reducer.xs, reducer.ys, reducer.count
+            else:
+                xs, ys = raw[cat]
+                count = len(xs)
+            series.append(
+                {
+                    "category": cat,
+                    "source_count": count,
+                    "timestamps": [EPOCH + timedelta(microseconds=x) for x in xs],
+                    "values": ys,
+                }
+            )
+
+        return {"method": method, "points": points, "start_time": start, "end_time": end, "series": series}
@@ -0,0 +1,81 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent executions of the same read query.
+
+    Design considerations:
+    - The first caller for a key (the leader) runs the query on its own session; callers arriving
+      while it is in flight await the same future instead of taking another pooled connection.
+    - Only in-flight work is shared; nothing is kept once the leader finishes (caching is separate).
+    - Any record write detaches the current flights, so a caller arriving after a write never
+      receives a result that may have been read before it.
+    - Followers are shielded from each other: a follower that is cancelled does not cancel the
+      flight, and if the leader is cancelled (e.g. its client disconnected) the next follower retries.
+    - Errors are shared too, so a failing query fails every caller once instead of N times.
+    """
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.retries = 0
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            fut = self._inflight.get(key)
+            if fut is None:
+                break
+            try:
+                result = await asyncio.shield(fut)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if not fut.cancelled() or (task is not None and task.cancelling()):
+                    raise
+                self.retries += 1
+                continue
+            except BaseException:
+                self.coalesced += 1
+                raise
+            self.coalesced += 1
+            return result
+
+        fut = asyncio.get_running_loop().create_future()
+        # NOTE:
+        # - Marks the exception as retrieved when no follower awaited it.
+        fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = fut
+        self.leaders += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            if self._inflight.get(key) is fut:
+                del self._inflight[key]
+
+    def on_write(self, event) -> None:
+        """RecordService listener: later callers start a fresh flight instead of joining one read before the write."""
+        self._inflight.clear()
+
+    def stats(self) -> dict:
+        calls = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._inflight),
+            "executions": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesced_ratio": round(self.coalesced / calls, 4) if calls else 0.0,
+            "leader_retries": self.retries,
+        }
+
+
+query_flights = SingleFlight()
@@ -0,0 +1,153 @@
+from collections import deque
+from datetime import datetime, timezone
+
+
+# NOTE:
+# - Window lengths in seconds; the ring covers the longest one.
+LIVE_WINDOWS = {"1m": 60, "5m": 300, "15m": 900}
+
+
+class _Window:
+    """Running count/sum/anomalies over the last `seconds`, with monotonic deques for min/max."""
+
+    def __init__(self, seconds: int):
+        self.seconds = seconds
+        self.tail = None  # oldest second still counted
+        self.count = 0
+        self.sum = 0.0
+        self.anomalies = 0
+        self.mins: deque[tuple[int, float]] = deque()
+        self.maxs: deque[tuple[int, float]] = deque()
+
+    def reset(self, now: int) -> None:
+        self.tail = now - self.seconds + 1
+        self.count, self.sum, self.anomalies = 0, 0.0, 0
+        self.mins.clear()
+        self.maxs.clear()
+
+    def add(self, second: int, value: float, anomaly: bool) -> None:
+        self.count += 1
+        self.sum += value
+        self.anomalies += int(anomaly)
+        while self.mins and self.mins[-1][1] >= value:
+            self.mins.pop()
+        self.mins.append((second, value))
+        while self.maxs and self.maxs[-1][1] <= value:
+            self.maxs.pop()
+        self.maxs.append((second, value))
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "avg": self.sum / self.count if self.count else None,
+            "min": self.mins[0][1] if self.mins else None,
+            "max": self.maxs[0][1] if self.maxs else None,
+            "anomaly_count": self.anomalies,
+            "anomaly_rate": self.anomalies / self.count if self.count else 0.0,
+        }
+
+
+class _CategoryWindows:
+    """
+    Per-second ring buckets for one category, shared by all of its windows.
+
+    Advancing the clock subtracts the buckets leaving each window, so every event and every
+    elapsed second costs O(1) amortized regardless of window length.
+    """
+
+    def __init__(self, ring_seconds: int):
+        self.ring = [[None, 0, 0.0, 0] for _ in range(ring_seconds)]  # [second, count, sum, anomalies]
+        self.head = None
+        self.windows = {name: _Window(seconds) for name, seconds in LIVE_WINDOWS.items()}
+
+    def advance(self, now: int) -> None:
+        if self.head is not None and now <= self.head:
+            return
+        if self.head is None or now - self.head >= len(self.ring):
+            for bucket in self.ring:
+                bucket[:] = [None, 0, 0.0, 0]
+            for window in self.windows.values():
+                window.reset(now)
+            self.head = now
+            return
+
+        self.head = now
+        for window in self.windows.values():
+            while window.tail <= now - window.seconds:
+                bucket = self.ring[window.tail % len(self.ring)]
+                if bucket[0] == window.tail:
+                    window.count -= bucket[1]
+                    window.sum -= bucket[2]
+                    window.anomalies -= bucket[3]
+                    if window.count == 0:
+                        window.sum = 0.0  # drop accumulated float error
+                window.tail += 1
+            while window.mins and window.mins[0][0] < window.tail:
+                window.mins.popleft()
+            while window.maxs and window.maxs[0][0] < window.tail:
+                window.maxs.popleft()
+
+    def add(self, second: int, value: float, anomaly: bool) -> None:
+        self.advance(second)
+        # NOTE:
+        # - A late event is counted in the current second, so expiry order stays monotonic.
+        second = self.head
+        bucket = self.ring[second % len(self.ring)]
+        if bucket[0] != second:
+            bucket[:] = [second, 0, 0.0, 0]
+        bucket[1] += 1
+        bucket[2] += value
+        bucket[3] += int(anomaly)
+        for window in self.windows.values():
+            window.add(second, value, anomaly)
+
+
+class LiveWindowStats:
+    """
+    Sliding-window statistics (last 1m/5m/15m per category) over the live generator stream.
+
+    Design considerations:
+    - Fed directly by the generator, so operators get consistent figures without DB queries
+      and browsers do not need the raw points to compute them.
+    - Windows are bucketed per second in a ring; count/sum/anomalies are subtracted as buckets
+      expire and min/max come from monotonic deques, all O(1) amortized.
+    - Reads never re-sum buckets, so a snapshot costs O(categories x windows).
+    """
+
+    def __init__(self):
+        self._cats: dict[str, _CategoryWindows] = {}
+        self._ring_seconds = max(LIVE_WINDOWS.values())
+
+    def add(self, category: str, value: float, is_anomaly: bool, timestamp: datetime) -> None:
+        cat = self._cats.get(category)
+        if cat is None:
+            cat = self._cats[category] = _CategoryWindows(self._ring_seconds)
+        cat.add(int(timestamp.timestamp()), float(value), bool(is_anomaly))
+
+    def snapshot(self, now: datetime | None = None) -> dict:
+        now = now or datetime.now(timezone.utc)
+        second = int(now.timestamp())
+
+        categories = {}
+        for name, cat in sorted(self._cats.items()):
+            cat.advance(second)
+            categories[name] = {w: window.snapshot() for w, window in cat.windows.items()}
+
+        overall = {}
+        for w in LIVE_WINDOWS:
+            parts = [c[w] for c in categories.values() if c[w]["count"]]
+            count = sum(p["count"] for p in parts)
+            anomalies = sum(p["anomaly_count"] for p in parts)
+            overall[w] = {
+                "count": count,
+                "avg": sum(p["avg"] * p["count"] for p in parts) / count if count else None,
+                "min": min((p["min"] for p in parts), default=None),
+                "max": max((p["max"] for p in parts), default=None),
+                "anomaly_count": anomalies,
+                "anomaly_rate": anomalies / count if count else 0.0,
+            }
+
+        return {"as_of": now.isoformat(), "overall": overall, "categories": categories}
+
+
+live_windows = LiveWindowStats()
@@ -0,0 +1,62 @@
+"""
+Benchmarks anomaly detectors: events scored per second, streaming vs NumPy batch.
+
+Usage (from backend/):
+    python -m scripts.bench_anomaly
+
+Design considerations:
+- Streaming calls observe() per event, as the generator and single creates do; batch calls
+  observe_array() once per key, as imports do.
+- Both paths start from the same state, and the report includes how often their flags agree.
+"""
+
+import random
+import time
+
+import numpy as np
+
+from app.services.anomaly_service import ThresholdDetector, EwmaDetector, MadDetector
+
+EVENTS = 200_000
+KEYS = ("A", "B", "C")
+
+
+def _detectors():
+    return {
+        "threshold": lambda: ThresholdDetector(80.0),
+        "ewma": lambda: EwmaDetector(80.0, alpha=0.05, z=3.0, min_samples=30),
+        "mad": lambda: MadDetector(80.0, window=300, z=3.0, min_samples=30),
+    }
+
+
+
+def main() -> None:
+    random.seed(11)
+    per_key = EVENTS // len(KEYS)
+    data = {k: np.array([random.gauss(60, 10) if random.random() > 0.01 else 200.0 for _ in range(per_key)]) for k in KEYS}
+    lists = {k: v.tolist() for k, v in data.items()}
+
+    print(f"events={per_key * len(KEYS)} keys={len(KEYS)}")
+    print(f"{'detector':>10} {'stream_ev/s':>12} {'batch_ev/s':>12} {'speedup':>8} {'agree':>8} {'flagged':>8}")
+    for name, make in _detectors().items():
+        streaming = make()
+        t0 = time.perf_counter()
+        stream_flags = {k: [streaming.observe(k, v) for v in vals] for k, vals in lists.items()}
+        stream_s = time.perf_counter() - t0
+
+        batch = make()
+        t0 = time.perf_counter()
+        batch_flags = {k: batch.observe_array(k, vals) for k, vals in data.items()}
+        batch_s = time.perf_counter() - t0
+
+        total = per_key * len(KEYS)
+        agree = sum(int(np.sum(np.array(stream_flags[k]) == batch_flags[k])) for k in KEYS) / total
+        flagged = sum(int(np.sum(batch_flags[k])) for k in KEYS)
+        print(
+            f"{name:>10} {total / stream_s:>12,.0f} {total / batch_s:>12,.0f} "
+            f"{stream_s / batch_s:>7.1f}x {agree:>8.4%} {flagged:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
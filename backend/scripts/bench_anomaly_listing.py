@@ -0,0 +1,118 @@
+"""
+Benchmarks anomaly listing (count + first page, as /records?is_anomaly=true runs it) as data_records grows.
+
+Usage (from backend/):
+    python -m scripts.bench_anomaly_listing
+
+Design considerations:
+- "base" filters the is_anomaly flag on data_records; "side" reads anomaly_events and joins
+  only the page's rows back, mirroring RecordService._list_anomalies.
+- Uses an on-disk SQLite file so both paths pay real page reads; absolute numbers differ on
+  MariaDB, the growth with table size is what the comparison shows.
+- data_records gets the timestamp index migration 0003 creates, so the base path is not a strawman.
+"""
+
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import Index, create_engine, desc, func, insert, join, select
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models import AnomalyEvent, DataRecord, Role, User
+from app.services.record_service import RECORD_COLUMNS
+
+SIZES = (50_000, 200_000, 800_000)
+ANOMALY_RATE = 0.01
+PAGE = 50
+REPEAT = 10
+
+
+def _grow(session: Session, start: int, stop: int) -> None:
+    base = datetime(2026, 1, 1)
+    rows, events = [], []
+    for i in range(start, stop):
+        anomaly = random.random() < ANOMALY_RATE
+        value = round(random.uniform(100, 150) if anomaly else random.uniform(0, 80), 2)
+        category = random.choice("ABC")
+        ts = base + timedelta(seconds=i)
+        rows.append(
+            {
+                "id": i + 1,
+                "title": "realtime_sensor",
+                "value": value,
+                "category": category,
+                "timestamp": ts,
+                "is_anomaly": anomaly,
+                "created_by": 1,
+            }
+        )
+        if anomaly:
+            events.append({"record_id": i + 1, "category": category, "timestamp": ts, "value": value})
+    session.execute(insert(DataRecord), rows)
+    if events:
+        session.execute(insert(AnomalyEvent), events)
+    session.commit()
+
+
+def _base(session: Session) -> int:
+    filters = [DataRecord.is_anomaly.is_(True), DataRecord.category == "A"]
+    total = session.execute(select(func.count()).select_from(DataRecord).where(*filters)).scalar_one()
+    stmt = select(*RECORD_COLUMNS).where(*filters).order_by(desc(DataRecord.timestamp)).limit(PAGE)
+    session.execute(stmt).all()
+    return total
+
+
+def _side(session: Session) -> int:
+    filters = [AnomalyEvent.category == "A"]
+    total = session.execute(select(func.count()).select_from(AnomalyEvent).where(*filters)).scalar_one()
+    stmt = (
+        select(*RECORD_COLUMNS)
+        .select_from(join(AnomalyEvent, DataRecord, DataRecord.id == AnomalyEvent.record_id))
+        .where(*filters)
+        .order_by(desc(AnomalyEvent.timestamp))
+        .limit(PAGE)
+    )
+    session.execute(stmt).all()
+    return total
+
+
+def _measure(fn, session: Session) -> tuple[float, int]:
+    total = fn(session)
+    samples = []
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fn(session)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), total
+
+
+def main() -> None:
+    random.seed(5)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        Index("ix_data_records_timestamp", DataRecord.timestamp).create(engine)
+        with Session(engine) as session:
+            session.add(Role(id=1, name="ADMIN"))
+            session.add(User(id=1, email="system@example.com", username="system", password_hash="x", role_id=1))
+            session.commit()
+
+            print(f"{'rows':>9} {'anomalies':>10} {'base_ms':>9} {'side_ms':>9} {'speedup':>8}")
+            grown = 0
+            for size in SIZES:
+                _grow(session, grown, size)
+                grown = size
+                base_ms, total = _measure(_base, session)
+                side_ms, side_total = _measure(_side, session)
+                assert total == side_total
+                print(f"{size:>9} {total:>10} {base_ms:>9.2f} {side_ms:>9.2f} {base_ms / side_ms:>7.1f}x")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
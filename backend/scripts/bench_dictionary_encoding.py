@@ -0,0 +1,132 @@
+"""
+Compares data_records with inline title/category against the dictionary-encoded layout.
+
+Usage (from backend/):
+    python -m scripts.bench_dictionary_encoding
+
+Design considerations:
+- Builds both layouts in separate on-disk SQLite files with the same generator-shaped rows and
+  reports table and index bytes (dbstat) plus median scan times.
+- "encoded" is read through the same decoded view the backend maps DataRecord to, so the scan
+  timings include the lookup joins every API read pays.
+- Absolute numbers differ on MariaDB; there compare
+      SELECT data_length, index_length FROM information_schema.tables WHERE table_name = 'data_records'
+  before and after `alembic upgrade dictionary@head` (run OPTIMIZE TABLE first so both are compacted).
+"""
+
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROWS = 1_000_000
+REPEAT = 5
+CATEGORIES = ("A", "B", "C")
+TITLE = "realtime_sensor"
+
+_PLAIN = """
+CREATE TABLE data_records (
+    id INTEGER PRIMARY KEY, title VARCHAR(128) NOT NULL, value FLOAT NOT NULL, category VARCHAR(64) NOT NULL,
+    timestamp DATETIME NOT NULL, is_anomaly BOOLEAN NOT NULL, created_by INTEGER NOT NULL,
+    created_at DATETIME, updated_at DATETIME
+);
+CREATE INDEX ix_data_records_timestamp ON data_records (timestamp);
+"""
+
+_ENCODED = """
+CREATE TABLE record_categories (id INTEGER PRIMARY KEY, name VARCHAR(64) NOT NULL UNIQUE);
+CREATE TABLE record_titles (id INTEGER PRIMARY KEY, name VARCHAR(128) NOT NULL UNIQUE);
+CREATE TABLE data_records (
+    id INTEGER PRIMARY KEY, title_id INTEGER NOT NULL, value FLOAT NOT NULL, category_id INTEGER NOT NULL,
+    timestamp DATETIME NOT NULL, is_anomaly BOOLEAN NOT NULL, created_by INTEGER NOT NULL,
+    created_at DATETIME, updated_at DATETIME
+);
+CREATE INDEX ix_data_records_timestamp ON data_records (timestamp);
+CREATE VIEW data_records_decoded AS
+    SELECT r.id, t.name AS title, r.value, c.name AS category, r.timestamp, r.is_anomaly,
+           r.created_by, r.created_at, r.updated_at
+    FROM data_records r
+    JOIN record_categories c ON c.id = r.category_id
+    JOIN record_titles t ON t.id = r.title_id;
+"""
+
+QUERIES = {
+    "by_category": "SELECT category, COUNT(*), AVG(value) FROM {source} GROUP BY category",
+    "category_filter": "SELECT COUNT(*), MAX(value) FROM {source} WHERE category = 'B'",
+    "range_page": (
+        "SELECT id, title, value, category, timestamp FROM {source} "
+        "WHERE timestamp >= '2026-01-05 00:00:00' ORDER BY timestamp LIMIT 500"
+    ),
+}
+
+
+def _rows():
+    random.seed(7)
+    base = datetime(2026, 1, 1)
+    for i in range(ROWS):
+        ts = (base + timedelta(seconds=i)).isoformat(sep=" ")
+        yield i + 1, random.choice(CATEGORIES), round(random.uniform(0, 100), 2), ts
+
+
+def _build(path: str, encoded: bool) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.executescript(_ENCODED if encoded else _PLAIN)
+    if encoded:
+        conn.executemany("INSERT INTO record_categories (id, name) VALUES (?, ?)", list(enumerate(CATEGORIES, 1)))
+        conn.execute("INSERT INTO record_titles (id, name) VALUES (1, ?)", (TITLE,))
+        codes = {c: i for i, c in enumerate(CATEGORIES, 1)}
+        conn.executemany(
+            "INSERT INTO data_records VALUES (?, 1, ?, ?, ?, 0, 1, ?, ?)",
+            ((i, v, codes[c], ts, ts, ts) for i, c, v, ts in _rows()),
+        )
+    else:
+        conn.executemany(
+            "INSERT INTO data_records VALUES (?, ?, ?, ?, ?, 0, 1, ?, ?)",
+            ((i, TITLE, v, c, ts, ts, ts) for i, c, v, ts in _rows()),
+        )
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.execute("ANALYZE")
+    return conn
+
+
+def _sizes(conn: sqlite3.Connection) -> tuple[int, int]:
+    rows = dict(conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name").fetchall())
+    return rows.get("data_records", 0), rows.get("ix_data_records_timestamp", 0)
+
+
+def _measure(conn: sqlite3.Connection, sql: str) -> float:
+    conn.execute(sql).fetchall()
+    samples = []
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        conn.execute(sql).fetchall()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = _build(os.path.join(tmp, "plain.db"), encoded=False)
+        encoded = _build(os.path.join(tmp, "encoded.db"), encoded=True)
+
+        print(f"rows: {ROWS}")
+        print(f"{'':>18} {'plain':>12} {'encoded':>12} {'ratio':>7}")
+        for label, a, b in zip(("table_bytes", "index_bytes"), _sizes(plain), _sizes(encoded)):
+            print(f"{label:>18} {a:>12} {b:>12} {b / a:>7.2f}")
+        for name, sql in QUERIES.items():
+            a = _measure(plain, sql.format(source="data_records"))
+            b = _measure(encoded, sql.format(source="data_records_decoded"))
+            assert plain.execute(sql.format(source="data_records")).fetchall() == encoded.execute(
+                sql.format(source="data_records_decoded")
+            ).fetchall()
+            print(f"{name + '_ms':>18} {a:>12.1f} {b:>12.1f} {b / a:>7.2f}")
+        plain.close()
+        encoded.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmarks /analytics/quantiles sketches against exact computation: accuracy and speed.
+
+Usage (from backend/):
+    python -m scripts.bench_quantiles
+    python -m scripts.bench_quantiles --db [--hours 24 168 720]
+
+Design considerations:
+- Default (in-memory): builds one DDSketch per simulated hour, the way the sketch table holds them,
+  then merges them per query; "exact" sorts every raw value, the floor of what an exact answer costs.
+- --db measures the served path against the configured database instead: QuantileService.quantiles
+  (SQL over record_sketches_hour plus DB-side binning of the partial hours at either end) against
+  an exact query streaming every value in the range in value order. It only reads, over the last
+  N hours of existing data, with bounds that are deliberately not hour-aligned.
+- Values mix a sensor-like base signal with heavy-tailed spikes so the tail quantiles matter.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+
+from app.db.session import AsyncSessionLocal, engine
+from app.models.record import DataRecord
+from app.services.quantile_service import DDSketch, QuantileService
+
+ALPHA = 0.01
+HOURS = (24, 24 * 7, 24 * 30)
+PER_HOUR = 3600
+QS = [0.5, 0.9, 0.95, 0.99, 0.999]
+REPEAT = 5
+
+
+def _value() -> float:
+    if random.random() < 0.02:
+        return random.paretovariate(1.5) * 100
+    return max(random.gauss(60, 15), 0.01)
+
+
+def _exact(values: list[float], qs: list[float]) -> list[float]:
+    ordered = sorted(values)
+    return [ordered[int(q * (len(ordered) - 1))] for q in qs]
+
+
+def _merged(hourly: list[DDSketch], qs: list[float]) -> list[float]:
+    total = DDSketch(ALPHA)
+    for sketch in hourly:
+        total.merge(sketch)
+    return total.quantiles(qs)
+
+
+def _timed(fn, *args) -> tuple[float, list]:
+    samples = []
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), out
+
+
+def _in_memory() -> None:
+    random.seed(7)
+    print(f"alpha={ALPHA} quantiles={QS}")
+    print(f"{'hours':>6} {'rows':>9} {'bins':>7} {'exact_ms':>9} {'sketch_ms':>10} {'max_rel_err':>12}")
+    for hours in HOURS:
+        values, hourly = [], []
+        for _ in range(hours):
+            sketch = DDSketch(ALPHA)
+            for _ in range(PER_HOUR):
+                v = _value()
+                values.append(v)
+                sketch.add(v)
+            hourly.append(sketch)
+
+        exact_ms, exact = _timed(_exact, values, QS)
+        sketch_ms, approx = _timed(_merged, hourly, QS)
+        err = max(abs(a - e) / abs(e) for a, e in zip(approx, exact))
+        bins = sum(len(s.bins) for s in hourly)
+        print(f"{hours:>6} {len(values):>9} {bins:>7} {exact_ms:>9.1f} {sketch_ms:>10.2f} {err:>12.5f}")
+
+
+async def _exact_db(session, start: datetime, end: datetime, qs: list[float]) -> tuple[int, list]:
+    stmt = (
+        select(DataRecord.value)
+        .where(DataRecord.timestamp >= start, DataRecord.timestamp <= end)
+        .order_by(DataRecord.value.asc())
+    )
+    values = (await session.execute(stmt)).scalars().all()
+    if not values:
+        return 0, [None for _ in qs]
+    return len(values), [float(values[int(q * (len(values) - 1))]) for q in qs]
+
+
+async def _timed_db(fn, *args) -> tuple[float, object]:
+    samples = []
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        out = await fn(*args)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), out
+
+
+async def _db(hours_list: list[int]) -> None:
+    try:
+        async with AsyncSessionLocal() as session:
+            newest = (await session.execute(select(func.max(DataRecord.timestamp)))).scalar_one()
+            if newest is None:
+                print("data_records is empty; nothing to measure")
+                return
+            # NOTE:
+            # - Unaligned bounds, so both partial-hour raw queries are part of every measurement.
+            end = newest - timedelta(minutes=17)
+            print(f"quantiles={QS} end={end.isoformat()}")
+            print(f"{'hours':>6} {'rows':>9} {'exact_ms':>9} {'sketch_ms':>10} {'speedup':>8} {'max_rel_err':>12}")
+            for hours in hours_list:
+                start = end - timedelta(hours=hours, minutes=29)
+                exact_ms, (rows, exact) = await _timed_db(_exact_db, session, start, end, QS)
+                sketch_ms, result = await _timed_db(QuantileService.quantiles, session, QS, start, end, None)
+                approx = result["overall"]["values"]
+                errs = [abs(a - e) / abs(e) for a, e in zip(approx, exact) if a is not None and e]
+                err = max(errs) if errs else 0.0
+                print(
+                    f"{hours:>6} {rows:>9} {exact_ms:>9.1f} {sketch_ms:>10.2f} "
+                    f"{exact_ms / sketch_ms:>7.1f}x {err:>12.5f}"
+                )
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", action="store_true", help="measure the SQL path on the configured database")
+    parser.add_argument("--hours", type=int, nargs="+", default=list(HOURS))
+    args = parser.parse_args()
+    if args.db:
+        asyncio.run(_db(args.hours))
+    else:
+        _in_memory()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmarks the /records listing read path: ORM hydration vs column rows.
+
+Usage (from backend/):
+    python -m scripts.bench_record_listing
+
+Design considerations:
+- Uses an in-memory SQLite database so the comparison isolates hydration,
+  validation and JSON encoding cost from network and MariaDB variance.
+- The "before" path mirrors the previous route: ORM instances, RecordOut(**__dict__),
+  then FastAPI-style response_model validation and stdlib JSON encoding.
+"""
+
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models import DataRecord, Role, User
+from app.schemas.record import PaginatedRecords, RecordOut
+from app.services.record_service import RECORD_COLUMNS
+
+ROWS = 20000
+SIZES = (200, 5000)
+REPEAT = 20
+
+_page_adapter = TypeAdapter(PaginatedRecords)
+
+
+def _seed(session: Session) -> None:
+    session.add(Role(id=1, name="ADMIN"))
+    session.add(User(id=1, email="system@example.com", username="system", password_hash="x", role_id=1))
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    session.add_all(
+        DataRecord(
+            title="realtime_sensor",
+            value=round(random.uniform(0, 120), 2),
+            category=random.choice("ABC"),
+            timestamp=base + timedelta(seconds=i),
+            is_anomaly=False,
+            created_by=1,
+        )
+        for i in range(ROWS)
+    )
+    session.commit()
+
+
+def _before(session: Session, size: int) -> bytes:
+    items = session.execute(select(DataRecord).order_by(DataRecord.id.desc()).limit(size)).scalars().all()
+    out = PaginatedRecords(items=[RecordOut(**i.__dict__) for i in items], page=1, size=size, total=ROWS)
+    validated = _page_adapter.validate_python(out)
+    content = jsonable_encoder(_page_adapter.dump_python(validated, mode="json"))
+    session.expunge_all()
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _after(session: Session, size: int) -> bytes:
+    items = session.execute(select(*RECORD_COLUMNS).order_by(DataRecord.id.desc()).limit(size)).all()
+    return orjson.dumps({"items": [i._asdict() for i in items], "page": 1, "size": size, "total": ROWS})
+
+
+def _measure(fn, session: Session, size: int) -> float:
+    fn(session, size)
+    samples = []
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fn(session, size)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        _seed(session)
+        session.expunge_all()
+        print(f"{'size':>6} {'before_ms':>10} {'after_ms':>10} {'speedup':>8}")
+        for size in SIZES:
+            before = _measure(_before, session, size)
+            after = _measure(_after, session, size)
+            print(f"{size:>6} {before:>10.2f} {after:>10.2f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
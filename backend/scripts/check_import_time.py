@@ -0,0 +1,96 @@
+"""
+Cold import of app.main from `python -X importtime`: deferred packages must stay out of it.
+
+Usage (from backend/):
+    python -m scripts.check_import_time [--runs 5] [--top 15] [--budget-ms N]
+
+Exits 1 when a deferred package (openpyxl, passlib, bcrypt, pyarrow; together ~200 ms) is imported
+by `import app.main`, so CI fails on the regression deterministically, whatever the machine speed.
+The cold import time is reported too; a wall-clock budget is only enforced when --budget-ms or
+IMPORT_TIME_BUDGET_MS is given, and should then be calibrated on the machine that runs it.
+
+Design considerations:
+- Each run is a fresh interpreter, so nothing is cached in sys.modules; the first run also
+  compiles bytecode and is discarded.
+- -X importtime lists every module the import loads, so checking its rows is the same as checking
+  sys.modules after `import app.main`, without a second interpreter.
+- The best of several runs is reported, which filters scheduler noise without hiding a regression.
+- The report lists the modules with the largest cumulative time, filtered to top-level packages and
+  app modules, so a newly eager heavy import is easy to spot.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+TARGET = "app.main"
+# NOTE:
+# - Loaded on first use only: XLSX export, password hashing, Parquet archive access.
+DEFERRED = ("openpyxl", "passlib", "bcrypt", "pyarrow")
+DEFAULT_BUDGET_MS = float(os.environ["IMPORT_TIME_BUDGET_MS"]) if os.environ.get("IMPORT_TIME_BUDGET_MS") else None
+
+
+def _run() -> list[tuple[str, int, int]]:
+    """Returns (module, self_us, cumulative_us) rows from one -X importtime run."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {TARGET}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        if self_us.isdigit():
+            rows.append((name, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    _run()
+    best = None
+    for _ in range(args.runs):
+        rows = _run()
+        total = next(c for name, _, c in rows if name == TARGET)
+        if best is None or total < best[0]:
+            best = (total, rows)
+
+    total_us, rows = best
+    budget = f", budget {args.budget_ms:.0f} ms" if args.budget_ms is not None else ""
+    print(f"{TARGET} cold import: {total_us / 1000:.1f} ms (best of {args.runs}{budget})")
+    top = sorted(
+        ((name, c) for name, _, c in rows if "." not in name or name.startswith("app.")),
+        key=lambda r: -r[1],
+    )
+    for name, cumulative in top[: args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failed = False
+    eager: dict[str, int] = {}
+    for name, self_us, _ in rows:
+        package = name.split(".")[0]
+        if package in DEFERRED:
+            eager[package] = eager.get(package, 0) + self_us
+    for package, self_us in sorted(eager.items()):
+        print(f"FAIL: {package} is imported by {TARGET} ({self_us / 1000:.1f} ms self time); it must load on first use")
+        failed = True
+    if args.budget_ms is not None and total_us / 1000 > args.budget_ms:
+        print("FAIL: import time exceeds the budget")
+        failed = True
+    if failed:
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Statement budgets per endpoint against a running backend, read from the Server-Timing header.
+
+Usage (from backend/, backend running with SQL_STATS_ENABLED=true):
+    python -m scripts.check_query_counts [--base-url http://localhost:8000] [--max-repeat 2]
+
+Exits 1 when an endpoint issues more statements than its budget or repeats one statement shape more
+than --max-repeat times (the N+1 signature), so CI can run it after `docker compose up`.
+
+Design considerations:
+- Black-box: no test database or fixtures, just the seeded admin account and the same header
+  browsers show in their network panel. Each endpoint is requested twice and the second response
+  is checked, so one-off warm-ups (dictionary loads, replica health) do not count.
+- Budgets include the two statements of get_current_user (user + selectin role). They are upper
+  bounds, not exact counts: analytics answered from the cache or in-memory aggregates use fewer.
+- In-process code can use app.db.query_stats.query_budget() directly for the same two checks.
+"""
+
+import argparse
+import re
+import sys
+
+import httpx
+
+BUDGETS = {
+    "/records?page=1&size=20": 4,
+    "/records?page=1&size=20&is_anomaly=true": 4,
+    "/analytics/summary": 3,
+    "/analytics/by-category": 3,
+    "/analytics/trend": 3,
+    "/analytics/anomalies": 4,
+    "/admin/users": 3,
+    "/admin/logs?limit=50": 3,
+    "/admin/system/status": 3,
+}
+
+_DESC = re.compile(r'db;dur=([\d.]+);desc="statements=(\d+) max_repeat=(\d+)"')
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", default="admin@example.com")
+    parser.add_argument("--password", default="Password123!")
+    parser.add_argument("--max-repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    with httpx.Client(base_url=args.base_url, timeout=30) as client:
+        login = client.post("/auth/login", json={"email": args.email, "password": args.password})
+        login.raise_for_status()
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        failures = 0
+        print(f"{'endpoint':<48} {'stmts':>5} {'budget':>6} {'repeat':>6} {'db_ms':>8}")
+        for path, budget in BUDGETS.items():
+            client.get(path, headers=headers)
+            resp = client.get(path, headers=headers)
+            match = _DESC.search(resp.headers.get("server-timing", ""))
+            if resp.status_code != 200 or match is None:
+                print(f"{path:<48} HTTP {resp.status_code}, no db Server-Timing entry")
+                failures += 1
+                continue
+            db_ms, statements, repeat = float(match[1]), int(match[2]), int(match[3])
+            flag = ""
+            if statements > budget or repeat > args.max_repeat:
+                flag = "  FAIL"
+                failures += 1
+            print(f"{path:<48} {statements:>5} {budget:>6} {repeat:>6} {db_ms:>8.2f}{flag}")
+
+    if failures:
+        print(f"FAIL: {failures} endpoint(s) over budget")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
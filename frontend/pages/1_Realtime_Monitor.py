@@ -55,6 +55,10 @@ if "rt_category_labels" not in st.session_state:
 if "rt_queue" not in st.session_state:
     st.session_state["rt_queue"] = Queue(maxsize=2000)
 
+# Latest server-side window stats, written by the WS thread (plain dict, not session_state).
+if "rt_window_stats" not in st.session_state:
+    st.session_state["rt_window_stats"] = {}
+
 # Thread control objects.
 if "rt_stop_event" not in st.session_state:
     st.session_state["rt_stop_event"] = threading.Event()
@@ -66,9 +70,10 @@ if "rt_thread" not in st.session_state:
 # -----------------------
 # Background WebSocket receiver (NO session_state access inside)
 # -----------------------
-async def _ws_consumer(url: str, stop_event: threading.Event, out_q: Queue):
+async def _ws_consumer(url: str, stop_event: threading.Event, out_q: Queue, window_stats: dict):
     """
     Receives realtime data from WebSocket and pushes into out_q.
+    Keeps only the latest window_stats message in window_stats.
     IMPORTANT: Do NOT touch st/session_state inside this function.
     """
     while not stop_event.is_set():
@@ -77,6 +82,9 @@ async def _ws_consumer(url: str, stop_event: threading.Event, out_q: Queue):
                 while not stop_event.is_set():
                     msg = await ws.recv()
                     payload = json.loads(msg)
+                    if payload.get("event") == "window_stats":
+                        window_stats["data"] = payload["data"]
+                        continue
                     if payload.get("event") != "realtime_data":
                         continue
                     event = payload["data"]
@@ -108,13 +116,14 @@ def _ensure_ws_thread_running(url: str):
 
     stop_event = st.session_state["rt_stop_event"]
     out_q = st.session_state["rt_queue"]
+    window_stats = st.session_state["rt_window_stats"]
 
     stop_event.clear()
 
-    def runner(stop_event: threading.Event, out_q: Queue, url: str):
-        asyncio.run(_ws_consumer(url, stop_event, out_q))
+    def runner(stop_event: threading.Event, out_q: Queue, url: str, window_stats: dict):
+        asyncio.run(_ws_consumer(url, stop_event, out_q, window_stats))
 
-    t = threading.Thread(target=runner, args=(stop_event, out_q, url), daemon=True)
+    t = threading.Thread(target=runner, args=(stop_event, out_q, url, window_stats), daemon=True)
     st.session_state["rt_thread"] = t
     t.start()
 
@@ -185,6 +194,20 @@ if not st.session_state["rt_freeze_view"]:
 
 st.caption(f"WebSocket URL: {ws_url}")
 
+# -----------------------
+# Server-side sliding windows
+# -----------------------
+window_data = st.session_state["rt_window_stats"].get("data")
+if window_data:
+    st.subheader("Live window stats (server-side)")
+    rows = []
+    scopes = [("All", window_data["overall"])] + list(window_data["categories"].items())
+    for scope, windows in scopes:
+        for window, stats in windows.items():
+            rows.append({"scope": scope, "window": window, **stats})
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    st.caption(f"As of {window_data['as_of']}")
+
 # -----------------------
 # Render chart + table
 # -----------------------
@@ -1,5 +1,6 @@
 import streamlit as st
 import asyncio
+import time
 import pandas as pd
 from datetime import datetime
 
@@ -232,12 +233,54 @@ with tabs[4]:
                 return await upload_csv("/records/import", file_bytes, up.name, token=token)
 
             resp = asyncio.run(do_import())
-            if resp.status_code == 200:
-                st.success("Import done.")
-                st.json(resp.json())
+            if resp.status_code in (200, 202):
+                st.session_state["import_job_id"] = resp.json()["job_id"]
             else:
                 st.error(resp.text)
 
+    # The import runs as a background job on the backend; poll its progress endpoint.
+    job_id = st.session_state.get("import_job_id")
+    if job_id:
+        st.caption(f"Import job: {job_id}")
+        progress_bar = st.progress(0.0)
+        status_box = st.empty()
+
+        while True:
+            async def do_status():
+                return await get(f"/records/import/{job_id}", token=token)
+
+            resp = asyncio.run(do_status())
+            if resp.status_code != 200:
+                st.error(resp.text)
+                break
+
+            job = resp.json()
+            total = job["bytes_total"] or 1
+            progress_bar.progress(min(job["bytes_parsed"] / total, 1.0))
+
+            eta = job["eta_sec"]
+            status_box.write(
+                f'status: {job["status"]} | parsed: {job["rows_parsed"]} | '
+                f'inserted: {job["rows_inserted"]} | rejected: {job["rows_rejected"]} | '
+                f'{job["rows_per_sec"]} rows/s | ETA: {"-" if eta is None else f"{eta}s"}'
+            )
+
+            if job["status"] == "completed":
+                st.success("Import done.")
+                if job["errors"]:
+                    st.dataframe(pd.DataFrame(job["errors"]), use_container_width=True)
+                break
+            if job["status"] == "partial":
+                st.warning(f'Import stopped after {job["rows_inserted"]} rows were inserted: {job["error"]}')
+                if job["errors"]:
+                    st.dataframe(pd.DataFrame(job["errors"]), use_container_width=True)
+                break
+            if job["status"] == "failed":
+                st.error(job["error"] or "Import failed.")
+                break
+
+            time.sleep(1.0)
+
 # -------------------------
 # Export Excel
 # -------------------------
@@ -3,7 +3,7 @@ import asyncio
 import pandas as pd
 import plotly.express as px
 
-from ui.api_client import get
+from ui.api_client import get, post_json
 from ui.auth_state import is_logged_in
 
 
@@ -16,30 +16,125 @@ if not is_logged_in():
 
 token = st.session_state["token"]
 
-if st.button("Load Summary"):
-    async def do_summary():
-        return await get("/analytics/summary", token=token)
+if st.button("Load Summary & By Category"):
+    async def do_overview():
+        # NOTE:
+        # - One batch request; the backend answers both from a single grouped query.
+        body = {"requests": [{"name": "summary", "kind": "summary"}, {"name": "by_category", "kind": "by_category"}]}
+        return await post_json("/analytics/batch", json=body, token=token)
 
-    resp = asyncio.run(do_summary())
+    resp = asyncio.run(do_overview())
     if resp.status_code == 200:
-        s = resp.json()
-        st.metric("count", s["count"])
-        st.metric("avg", s["avg"])
-        st.metric("min", s["min"])
-        st.metric("max", s["max"])
+        results = resp.json()["results"]
+        s = results["summary"]
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("count", s["count"])
+        m2.metric("avg", s["avg"])
+        m3.metric("min", s["min"])
+        m4.metric("max", s["max"])
+
+        rows = results["by_category"]
+        if rows:
+            df = pd.DataFrame(rows)
+            st.dataframe(df, use_container_width=True)
+            fig = px.bar(df, x="category", y="avg")
+            st.plotly_chart(fig, use_container_width=True)
     else:
         st.error(resp.text)
 
-if st.button("Load By Category"):
-    async def do_cat():
-        return await get("/analytics/by-category", token=token)
+st.divider()
+st.subheader("Trend")
+t1, t2, t3 = st.columns(3)
+interval = t1.selectbox("interval", ["1m", "5m", "1h", "1d"], index=1)
+trend_category = t2.text_input("category (optional)", key="trend_category")
+group_by_category = t3.checkbox("group by category", value=True)
+
+if st.button("Load Trend"):
+    trend_params = {"interval": interval, "group_by_category": group_by_category}
+    if trend_category.strip():
+        trend_params["category"] = trend_category.strip()
+
+    async def do_trend():
+        return await get("/analytics/trend", token=token, params=trend_params)
+
+    resp = asyncio.run(do_trend())
+    if resp.status_code == 200:
+        data = resp.json()
+        frames = []
+        for s in data["series"]:
+            df = pd.DataFrame(s["points"])
+            df["category"] = s["category"] or "all"
+            frames.append(df)
+        if frames:
+            df = pd.concat(frames)
+            df["bucket_start"] = pd.to_datetime(df["bucket_start"])
+            fig = px.line(df, x="bucket_start", y="avg", color="category")
+            st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.error(resp.text)
+
+st.divider()
+st.subheader("Raw Series (last 24h, downsampled)")
+r1, r2, r3 = st.columns(3)
+series_points = r1.number_input("points", min_value=3, max_value=5000, value=1500, step=100)
+series_method = r2.selectbox("method", ["lttb", "minmax"])
+series_category = r3.text_input("category (optional)", key="series_category")
+
+if st.button("Load Series"):
+    series_params = {"points": int(series_points), "method": series_method}
+    if series_category.strip():
+        series_params["category"] = series_category.strip()
+
+    async def do_series():
+        return await get("/analytics/series", token=token, params=series_params)
+
+    resp = asyncio.run(do_series())
+    if resp.status_code == 200:
+        data = resp.json()
+        frames = [
+            pd.DataFrame({"timestamp": pd.to_datetime(s["timestamps"]), "value": s["values"], "category": s["category"]})
+            for s in data["series"]
+        ]
+        if frames:
+            fig = px.line(pd.concat(frames), x="timestamp", y="value", color="category")
+            st.plotly_chart(fig, use_container_width=True)
+            st.caption(
+                ", ".join(f"{s['category']}: {len(s['values'])} of {s['source_count']} rows" for s in data["series"])
+            )
+        else:
+            st.info("No data in range.")
+    else:
+        st.error(resp.text)
+
+st.divider()
+st.subheader("Histogram")
+h1, h2, h3 = st.columns(3)
+hist_bins = h1.number_input("bins", min_value=1, max_value=200, value=20, step=1)
+hist_category = h2.text_input("category (optional)", key="hist_category")
+hist_approx = h3.checkbox("approximate (from sketches)", value=False)
+
+if st.button("Load Histogram"):
+    hist_params = {"bins": int(hist_bins), "approximate": hist_approx}
+    if hist_category.strip():
+        hist_params["category"] = hist_category.strip()
+
+    async def do_hist():
+        return await get("/analytics/histogram", token=token, params=hist_params)
 
-    resp = asyncio.run(do_cat())
+    resp = asyncio.run(do_hist())
     if resp.status_code == 200:
-        rows = resp.json()
-        df = pd.DataFrame(rows)
-        st.dataframe(df, use_container_width=True)
-        fig = px.bar(df, x="category", y="avg")
-        st.plotly_chart(fig, use_container_width=True)
+        data = resp.json()
+        edges = data["edges"]
+        frames = []
+        for s in data["series"]:
+            frames.append(
+                pd.DataFrame({"bin_start": edges[:-1], "count": s["counts"], "category": s["category"]})
+            )
+        if frames:
+            df = pd.concat(frames)
+            fig = px.bar(df, x="bin_start", y="count", color="category", barmode="overlay", opacity=0.6)
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No data in range.")
     else:
         st.error(resp.text)
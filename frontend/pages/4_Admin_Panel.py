@@ -1,8 +1,9 @@
 import streamlit as st
 import asyncio
 import pandas as pd
+import plotly.express as px
 
-from ui.api_client import get, patch_json
+from ui.api_client import get, patch_json, post_json
 from ui.auth_state import is_logged_in
 
 
@@ -20,7 +21,7 @@ if role != "ADMIN":
     st.error("ADMIN role is required.")
     st.stop()
 
-tabs = st.tabs(["Users", "Role Management", "Logs", "System Status", "DB Status"])
+tabs = st.tabs(["Users", "Role Management", "Logs", "System Status", "DB Status", "Anomaly Rescore"])
 
 
 # -------------------------
@@ -160,7 +161,38 @@ with tabs[3]:
 
         resp = asyncio.run(do_status())
         if resp.status_code == 200:
-            st.json(resp.json())
+            status_data = resp.json()
+            flush = status_data.pop("flush", None) or {}
+
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("Persisted events", f"{flush.get('persisted', 0):,}")
+            c2.metric("Re-queued events", f"{flush.get('requeued', 0):,}")
+            c3.metric("Dropped events", f"{flush.get('dropped', 0):,}")
+            c4.metric("Consecutive failures", flush.get("consecutive_failures", 0))
+
+            history = flush.get("history") or []
+            if history:
+                df = pd.DataFrame(history)
+                df["ended_at"] = pd.to_datetime(df["ended_at"])
+                df["outcome"] = df["success"].map({True: "ok", False: "failed"})
+                st.plotly_chart(
+                    px.scatter(df, x="ended_at", y="rows", color="outcome", title="Flush rows"),
+                    use_container_width=True,
+                )
+                st.plotly_chart(
+                    px.line(df, x="ended_at", y="duration_ms", markers=True, title="Flush duration (ms)"),
+                    use_container_width=True,
+                )
+                failed = df[~df["success"]]
+                if not failed.empty:
+                    st.dataframe(
+                        failed[["started_at", "rows", "bytes", "duration_ms", "retry", "error"]],
+                        use_container_width=True,
+                    )
+            else:
+                st.info("No non-empty flushes recorded yet.")
+
+            st.json(status_data)
         else:
             st.error(resp.text)
 
@@ -180,3 +212,45 @@ with tabs[4]:
             st.json(resp.json())
         else:
             st.error(resp.text)
+
+
+# -------------------------
+# Anomaly Rescore
+# -------------------------
+with tabs[5]:
+    st.subheader("Recompute is_anomaly for stored records")
+    st.caption("Runs in the background with the current detector settings; resumes after a restart.")
+
+    col1, col2 = st.columns([1, 1])
+    if col1.button("Start Rescore", key="admin_start_rescore"):
+        async def do_start():
+            return await post_json("/admin/anomaly-rescore", {}, token=token)
+
+        resp = asyncio.run(do_start())
+        if resp.status_code == 202:
+            st.success(f"Rescore job {resp.json()['job_id']} started.")
+        else:
+            st.error(resp.text)
+
+    if col2.button("Refresh Jobs", key="admin_refresh_rescore") or "admin_rescore_jobs" not in st.session_state:
+        async def do_jobs():
+            return await get("/admin/anomaly-rescore", token=token)
+
+        resp = asyncio.run(do_jobs())
+        st.session_state["admin_rescore_jobs"] = resp.json() if resp.status_code == 200 else []
+
+    jobs = st.session_state.get("admin_rescore_jobs") or []
+    running = [j for j in jobs if j["status"] == "running"]
+    for job in running:
+        st.progress(min((job["percent"] or 0.0) / 100, 1.0), text=f"Job {job['job_id']}: {job['rows_scanned']:,} rows")
+        if st.button(f"Cancel job {job['job_id']}", key=f"admin_cancel_rescore_{job['job_id']}"):
+            async def do_cancel(job_id=job["job_id"]):
+                return await post_json(f"/admin/anomaly-rescore/{job_id}/cancel", {}, token=token)
+
+            resp = asyncio.run(do_cancel())
+            if resp.status_code == 200:
+                st.info("Cancellation requested.")
+            else:
+                st.error(resp.text)
+    if jobs:
+        st.dataframe(pd.DataFrame(jobs), use_container_width=True)
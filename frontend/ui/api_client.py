@@ -59,9 +59,12 @@ async def delete(path: str, token: str | None = None):
 async def upload_csv(path: str, file_bytes: bytes, filename: str, token: str | None = None):
     """
     Upload CSV as multipart/form-data to match FastAPI UploadFile.
+
+    NOTE:
+    - The backend only stores the file and returns a job id, but large uploads still need a generous timeout.
     """
     files = {"file": (filename, file_bytes, "text/csv")}
-    async with httpx.AsyncClient(timeout=30.0) as client:
+    async with httpx.AsyncClient(timeout=300.0) as client:
         return await client.post(
             f"{get_api_base_url()}{path}",
             files=files,